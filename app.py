@@ -20,10 +20,12 @@ if hasattr(sys.stdout, "reconfigure"):
     except Exception:
         pass
 
-from flask import Flask, render_template_string, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, render_template_string, request, redirect, url_for, flash, session, jsonify, send_file, abort
+from markupsafe import escape
 from flask_admin import Admin, AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
 from flask_admin.theme import Bootstrap4Theme
@@ -38,6 +40,11 @@ import io
 import base64
 import uuid
 import threading
+import time
+import hashlib
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+from functools import lru_cache
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -58,6 +65,7 @@ from reportlab.graphics.shapes import Drawing
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.offline import plot
+import numpy as np
 
 # ===== PROFESSIONAL LOGGING SETUP =====
 logging.basicConfig(
@@ -243,6 +251,21 @@ class ScannerModel(db.Model):
     software_version = db.Column(db.String(50))
     upgrade_path = db.Column(db.Text)
     maintenance_schedule = db.Column(db.String(100))
+    
+    # Parsed from the free-text specs above (SpecColumns)
+    power_voltage = db.Column(db.Float)
+    power_phases = db.Column(db.Integer)
+    power_kva = db.Column(db.Float)
+    cooling_kw = db.Column(db.Float)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
+    humidity_min = db.Column(db.Float)
+    humidity_max = db.Column(db.Float)
+    length_m = db.Column(db.Float)
+    width_m = db.Column(db.Float)
+    height_m = db.Column(db.Float)
+    specs_parsed_at = db.Column(db.DateTime)  # Last parse attempt, set even when nothing parsed
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -266,6 +289,10 @@ class ScannerModel(db.Model):
 
 class ManualRoomEntry(db.Model):
     """Comprehensive manual room constraints entry for engineers"""
+    __table_args__ = (
+        db.Index('ix_manual_room_entry_power', 'power_voltage', 'power_phases'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
     entered_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -307,6 +334,17 @@ class ManualRoomEntry(db.Model):
     current_temperature_range = db.Column(db.String(20))
     current_humidity_range = db.Column(db.String(20))
     air_changes_per_hour = db.Column(db.Float)
+    
+    # Parsed from the free-text electrical/HVAC fields (SpecColumns)
+    power_voltage = db.Column(db.Float)
+    power_phases = db.Column(db.Integer)
+    power_kva = db.Column(db.Float)
+    hvac_kw = db.Column(db.Float, index=True)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
+    humidity_min = db.Column(db.Float)
+    humidity_max = db.Column(db.Float)
+    specs_parsed_at = db.Column(db.DateTime)  # Last parse attempt, set even when nothing parsed
     filtration_system = db.Column(db.String(50))
     humidity_control = db.Column(db.Boolean, default=False)
     
@@ -373,13 +411,13 @@ class ManualRoomEntry(db.Model):
             for c in self.__table__.columns
             if c.name not in ("id", "created_at", "updated_at")
         ]
-
+        
         filled_fields = sum(
             1
             for col in valid_cols
             if (getattr(self, col) not in (None, ""))
         )
-
+        
         total_fields = len(valid_cols)
         return round((filled_fields / total_fields) * 100, 1) if total_fields else 0
     
@@ -390,7 +428,7 @@ class SiteSpecification(db.Model):
     """Enhanced site specification model"""
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
-    scanner_model_id = db.Column(db.Integer, db.ForeignKey('scanner_model.id'), nullable=False)
+    scanner_model_id = db.Column(db.Integer, db.ForeignKey('scanner_model.id'), nullable=False, index=True)
     manual_room_id = db.Column(db.Integer, db.ForeignKey('manual_room_entry.id'))
     site_name = db.Column(db.String(150), nullable=False)
     address = db.Column(db.Text)
@@ -411,12 +449,23 @@ class SiteSpecification(db.Model):
     network_infrastructure = db.Column(db.Boolean, default=False)
     accessibility_compliance = db.Column(db.Boolean, default=False)
     notes = db.Column(db.Text)
+    placement_layout = db.Column(db.Text)  # JSON string from PlacementSolver
+    power_voltage = db.Column(db.Float)  # Parsed from available_power / hvac_capacity (SpecColumns)
+    power_phases = db.Column(db.Integer)
+    power_kva = db.Column(db.Float)
+    hvac_kw = db.Column(db.Float)
+    specs_parsed_at = db.Column(db.DateTime)  # Last parse attempt, set even when nothing parsed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     project = db.relationship('Project', backref='site_specifications')
     scanner_model = db.relationship('ScannerModel', backref='site_specifications')
     manual_room = db.relationship('ManualRoomEntry', backref='site_specifications')
     
+    @property
+    def catalog_scanner(self):
+        """Scanner from the in-memory catalog snapshot (no lazy load)"""
+        return ScannerCatalog.get(self.scanner_model_id) or self.scanner_model
+    
     def __repr__(self):
         return f'<Site {self.site_name}>'
 
@@ -424,7 +473,7 @@ class ConformityReport(db.Model):
     """Enhanced conformity report with advanced analytics"""
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
-    site_specification_id = db.Column(db.Integer, db.ForeignKey('site_specification.id'), nullable=False)
+    site_specification_id = db.Column(db.Integer, db.ForeignKey('site_specification.id'), nullable=False, index=True)
     report_number = db.Column(db.String(50), unique=True, nullable=False)
     overall_status = db.Column(db.String(50), default='Pending')
     conformity_score = db.Column(db.Float)
@@ -433,6 +482,11 @@ class ConformityReport(db.Model):
     neuviz_specific_analysis = db.Column(db.Text)
     risk_assessment = db.Column(db.String(50))
     estimated_cost = db.Column(db.Float)
+    cost_table_version = db.Column(db.Integer, index=True)
+    deterministic_score = db.Column(db.Float)  # ScoreModel result, refreshed on catalog changes
+    deterministic_status = db.Column(db.String(50))
+    status_flipped = db.Column(db.Boolean, default=False, index=True)
+    rescored_at = db.Column(db.DateTime)
     cost_breakdown = db.Column(db.Text)  # JSON string
     modification_timeline = db.Column(db.Integer)
     compliance_items = db.Column(db.Text)  # JSON string
@@ -473,6 +527,102 @@ class ConformityReport(db.Model):
     def __repr__(self):
         return f'<Report {self.report_number} - {self.overall_status}>'
 
+class CostTable(db.Model):
+    """Versioned cost rates for the deterministic cost model (immutable once published)"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, unique=True, nullable=False)
+    label = db.Column(db.String(100))
+    rates = db.Column(db.Text, nullable=False)  # JSON string
+    is_active = db.Column(db.Boolean, default=False, index=True)
+    notes = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    author = db.relationship('User', foreign_keys=[created_by])
+    
+    @property
+    def rates_dict(self):
+        return json.loads(self.rates) if self.rates else {}
+    
+    def __repr__(self):
+        return f'<CostTable v{self.version}{" (active)" if self.is_active else ""}>'
+
+class HeatLoadAssessment(db.Model):
+    """Stored scan-room cooling load assessment, recomputed when its inputs change"""
+    id = db.Column(db.Integer, primary_key=True)
+    site_specification_id = db.Column(db.Integer, db.ForeignKey('site_specification.id'), unique=True, nullable=False)
+    input_fingerprint = db.Column(db.String(40), nullable=False)
+    equipment_kw = db.Column(db.Float)
+    occupant_kw = db.Column(db.Float)
+    lighting_kw = db.Column(db.Float)
+    ventilation_kw = db.Column(db.Float)
+    required_kw = db.Column(db.Float)
+    available_kw = db.Column(db.Float)
+    shortfall_kw = db.Column(db.Float)
+    adequate = db.Column(db.Boolean, index=True)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    site_specification = db.relationship('SiteSpecification', backref=db.backref('heat_load', uselist=False))
+    
+    def to_dict(self):
+        return {
+            'site_specification_id': self.site_specification_id,
+            'equipment_kw': self.equipment_kw,
+            'occupant_kw': self.occupant_kw,
+            'lighting_kw': self.lighting_kw,
+            'ventilation_kw': self.ventilation_kw,
+            'required_kw': self.required_kw,
+            'available_kw': self.available_kw,
+            'shortfall_kw': self.shortfall_kw,
+            'adequate': self.adequate,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+    
+    def __repr__(self):
+        return f'<HeatLoad site={self.site_specification_id} {self.required_kw}kW>'
+
+class ReportFactor(db.Model):
+    """Per-factor deterministic score and cost contribution of a conformity report"""
+    __table_args__ = (
+        db.Index('ix_report_factor_factor_passed', 'factor', 'passed', 'report_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    report_id = db.Column(db.Integer, db.ForeignKey('conformity_report.id'), nullable=False, index=True)
+    factor = db.Column(db.String(30), nullable=False)
+    passed = db.Column(db.Boolean)  # None for multipliers and informational factors
+    score_delta = db.Column(db.Float, default=0)
+    cost_delta = db.Column(db.Float, default=0)
+    multiplier = db.Column(db.Float)
+    
+    report = db.relationship('ConformityReport', backref=db.backref('factors', cascade='all, delete-orphan'))
+    
+    def __repr__(self):
+        return f'<ReportFactor {self.report_id}:{self.factor} {"pass" if self.passed else "fail"}>'
+
+class ScannerFeatureVector(db.Model):
+    """Precomputed raw and catalog-normalized comparison features of a scanner model"""
+    id = db.Column(db.Integer, primary_key=True)
+    scanner_model_id = db.Column(db.Integer, db.ForeignKey('scanner_model.id'), unique=True, nullable=False)
+    slice_count = db.Column(db.Float)
+    weight = db.Column(db.Float)
+    min_room_length = db.Column(db.Float)
+    min_room_width = db.Column(db.Float)
+    min_room_height = db.Column(db.Float)
+    power_kw = db.Column(db.Float)
+    heat_kw = db.Column(db.Float)
+    price = db.Column(db.Float)
+    complexity = db.Column(db.Float)
+    normalized = db.Column(db.Text)  # JSON list of z-scores in ScannerSimilarityIndex.FEATURES order
+    catalog_signature = db.Column(db.String(64), index=True)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    scanner_model = db.relationship('ScannerModel', backref=db.backref(
+        'feature_vector', uselist=False, cascade='all, delete-orphan'))
+    
+    def __repr__(self):
+        return f'<ScannerFeatureVector scanner={self.scanner_model_id}>'
+
 # ===== COMPREHENSIVE FORMS =====
 
 class LoginForm(FlaskForm):
@@ -744,7 +894,7 @@ class AdvancedCTScannerAI:
             logger.info(f"AI analysis completed for site {site_spec.site_name}: {analysis_result['status']} ({analysis_result['score']}%)")
             
             return analysis_result
-            
+        
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Enhanced AI analysis failed: {error_msg}")
@@ -764,7 +914,10 @@ class AdvancedCTScannerAI:
     @staticmethod
     def _build_comprehensive_prompt(site_spec, analysis_type, priority):
         """Build comprehensive analysis prompt for AI"""
-        scanner = site_spec.scanner_model
+        scanner = site_spec.catalog_scanner
+        shielding = ShieldingCalculator.for_site_spec(site_spec)
+        heat_load = HeatLoadCalculator.assess([site_spec], commit=False)[0]
+        shielding_summary = ', '.join(f"{w['wall'].replace('_', ' ')} {w['recommended_lead_mm']}mm Pb" for w in shielding['walls'])
         
         prompt = f"""
 COMPREHENSIVE CT SCANNER PREINSTALLATION CONFORMITY ANALYSIS
@@ -791,9 +944,11 @@ SITE CONDITIONS:
 - Electrical Power: {site_spec.available_power}
 - Panel Location: {site_spec.electrical_panel_location or 'Not specified'}
 - HVAC System: {'Yes - ' + site_spec.hvac_capacity if site_spec.has_hvac else 'No'}
+- Calculated Cooling Load: {heat_load.required_kw} kW required, {heat_load.available_kw} kW available, {heat_load.shortfall_kw} kW shortfall
 - Floor Type: {site_spec.floor_type or 'Not specified'}
 - Floor Capacity: {site_spec.floor_load_capacity or 'Not specified'} kg/m²
 - Existing Shielding: {'Yes' if site_spec.existing_shielding else 'No'}
+- Calculated Barriers (NCRP 147, {shielding['kvp']:.0f} kVp, {shielding['weekly_patients']} patients/week): {shielding_summary}
 - Utilities: Water: {'Yes' if site_spec.water_supply else 'No'}, Air: {'Yes' if site_spec.compressed_air else 'No'}, Network: {'Yes' if site_spec.network_infrastructure else 'No'}
 - ADA Compliance: {'Yes' if site_spec.accessibility_compliance else 'No'}
 - Notes: {site_spec.notes or 'None provided'}
@@ -829,7 +984,7 @@ SITE CONDITIONS:
 
 Provide highly technical, detailed, and actionable analysis using precise engineering terminology, specific measurements, and professional cost estimates.
 """
-        
+
         return prompt
     
     @staticmethod
@@ -907,7 +1062,8 @@ Provide highly technical, detailed, and actionable analysis using precise engine
             risk_level = 'Critical'
         
         # Enhanced cost and timeline estimation
-        estimated_cost = AdvancedCTScannerAI._calculate_advanced_cost(site_spec, ai_response, score, status)
+        cost_table_version, _ = CostTableStore.active()
+        estimated_cost = AdvancedCTScannerAI._calculate_advanced_cost(site_spec, ai_response, score, status, cost_table_version)
         timeline = AdvancedCTScannerAI._calculate_project_timeline(site_spec, ai_response, score, status)
         
         # Extract comprehensive recommendations
@@ -921,197 +1077,2175 @@ Provide highly technical, detailed, and actionable analysis using precise engine
             'recommendations': recommendations,
             'risk_level': risk_level,
             'estimated_cost': estimated_cost,
+            'cost_table_version': cost_table_version,
             'timeline': timeline
         }
     
     @staticmethod
     def _calculate_intelligent_score(site_spec, status, response_content):
         """Calculate conformity score using intelligent analysis"""
-        scanner = site_spec.scanner_model
-        base_score = 50
+        inputs = CostModel.site_inputs(site_spec, response_content, None, status)
+        _, score = ScoreModel.compute(inputs)
+        return float(score[0])
+    
+    @staticmethod
+    def _calculate_advanced_cost(site_spec, ai_response, score, status, cost_table_version=None):
+        """Calculate comprehensive project cost against a versioned cost table"""
+        _, rates = CostTableStore.resolve(cost_table_version)
+        inputs = CostModel.site_inputs(site_spec, ai_response, score, status)
+        return float(CostModel.compute(inputs, rates)[0])
+    
+    @staticmethod
+    def _calculate_project_timeline(site_spec, ai_response, score, status):
+        """Calculate comprehensive project timeline"""
+        scanner = site_spec.catalog_scanner
+        base_timeline = 45  # Enhanced base timeline
         
-        # Dimensional compliance
-        room_volume = site_spec.room_length * site_spec.room_width * site_spec.room_height
-        required_volume = scanner.min_room_length * scanner.min_room_width * scanner.min_room_height
+        # Score-based timeline
+        if score < 40:
+            base_timeline += 90  # Major reconstruction
+        elif score < 60:
+            base_timeline += 60  # Significant modifications
+        elif score < 80:
+            base_timeline += 30  # Moderate modifications
         
-        if room_volume >= required_volume * 1.2:
-            base_score += 20
-        elif room_volume >= required_volume:
-            base_score += 15
-        else:
-            base_score -= 20
+        # NeuViz additional coordination time
+        if scanner.is_neuviz:
+            base_timeline += 15  # Neusoft engineer coordination
+        
+        # System modifications
+        if not site_spec.has_hvac:
+            base_timeline += 25
+        
+        if not ElectricalEngine.power_match([site_spec.available_power], [scanner.required_power])[0]:
+            base_timeline += 20
+        
+        if not site_spec.existing_shielding:
+            base_timeline += 30
+        
+        # Regulatory timeline
+        base_timeline += 20  # Permits and approvals
+        
+        return base_timeline
+    
+    @staticmethod
+    def _extract_comprehensive_recommendations(ai_response):
+        """Extract detailed recommendations from AI response"""
+        lines = ai_response.split('\n')
+        recommendations = []
         
-        # Power compatibility
-        if site_spec.available_power == scanner.required_power:
-            base_score += 15
+        # Look for recommendation sections
+        in_recommendations = False
+        recommendation_keywords = [
+            'recommendation', 'action', 'required', 'should', 'must',
+            'immediate', 'infrastructure', 'regulatory', 'cost optimization'
+        ]
+        
+        for line in lines:
+            line_clean = line.strip()
+            line_lower = line_clean.lower()
+            
+            # Detect recommendation sections
+            if any(keyword in line_lower for keyword in recommendation_keywords):
+                if ':' in line_clean or line_clean.endswith(':'):
+                    in_recommendations = True
+                    continue
+            
+            # Extract recommendation items
+            if in_recommendations and line_clean:
+                if line_clean.startswith(('*', '-', '•', '1.', '2.', '3.')):
+                    recommendations.append(line_clean.lstrip('*-•123456789. '))
+                elif line_clean.startswith('**') and line_clean.endswith('**'):
+                    in_recommendations = False  # End of section
+                elif any(keyword in line_lower for keyword in ['immediate', 'priority', 'critical', 'must']):
+                    recommendations.append(line_clean)
+        
+        # Fallback: extract sentences with action words
+        if not recommendations:
+            action_words = ['should', 'must', 'recommend', 'install', 'upgrade', 'modify', 'ensure']
+            for line in lines:
+                if any(word in line.lower() for word in action_words):
+                    recommendations.append(line.strip())
+        
+        return '\n'.join(recommendations[:25]) if recommendations else 'Detailed recommendations provided in analysis above.'
+
+# ===== SCANNER CATALOG SNAPSHOT =====
+
+class CatalogScanner(namedtuple('CatalogScanner', [c.name for c in ScannerModel.__table__.columns])):
+    """Immutable plain copy of a ScannerModel row"""
+    __slots__ = ()
+    
+    price_range = ScannerModel.price_range
+    room_volume = ScannerModel.room_volume
+    complexity_score = ScannerModel.complexity_score
+    __repr__ = ScannerModel.__repr__
+
+CatalogSnapshot = namedtuple('CatalogSnapshot', ['version', 'loaded_at', 'scanners', 'by_id', 'db_stamp'])
+
+class ScannerCatalog:
+    """Process-wide read-only scanner catalog shared by every read path"""
+    
+    STAMP_TTL = 5.0  # Seconds between checks for catalog writes made by other processes
+    
+    _lock = threading.Lock()
+    _snapshot = None
+    _stale = True
+    _checked_at = 0.0
+    
+    @staticmethod
+    def db_stamp():
+        """Cheap catalog change marker: row count and latest updated_at"""
+        count, latest = db.session.query(db.func.count(ScannerModel.id), db.func.max(ScannerModel.updated_at)).one()
+        return count, latest
+    
+    @classmethod
+    def refresh(cls):
+        """Load the catalog in one query and publish a new snapshot"""
+        db_stamp = cls.db_stamp()
+        fields = CatalogScanner._fields
+        rows = db.session.query(*[getattr(ScannerModel, name) for name in fields]).order_by(ScannerModel.id).all()
+        scanners = tuple(CatalogScanner(*row) for row in rows)
+        
+        # Content stamp: stable across processes, changes on any insert, edit or delete
+        stamp = '|'.join(f"{s.id}:{s.updated_at.isoformat() if s.updated_at else ''}" for s in scanners)
+        snapshot = CatalogSnapshot(
+            version=hashlib.sha1(stamp.encode()).hexdigest()[:16],
+            loaded_at=datetime.utcnow(),
+            scanners=scanners,
+            by_id=MappingProxyType({s.id: s for s in scanners}),
+            db_stamp=db_stamp
+        )
+        with cls._lock:
+            cls._snapshot = snapshot
+            cls._stale = False
+            cls._checked_at = time.monotonic()
+        logger.info(f"Scanner catalog snapshot {snapshot.version}: {len(scanners)} models")
+        return snapshot
+    
+    @classmethod
+    def current(cls):
+        snapshot = cls._snapshot
+        if snapshot is None or cls._stale:
+            return cls.refresh()
+        
+        # Other processes only share the database: compare its stamp at most once per TTL
+        now = time.monotonic()
+        if now - cls._checked_at >= cls.STAMP_TTL:
+            cls._checked_at = now
+            if cls.db_stamp() != snapshot.db_stamp:
+                return cls.refresh()
+        return snapshot
+    
+    @classmethod
+    def mark_stale(cls):
+        cls._stale = True
+    
+    @classmethod
+    def version(cls):
+        return cls.current().version
+    
+    @classmethod
+    def all(cls):
+        return cls.current().scanners
+    
+    @classmethod
+    def get(cls, scanner_id):
+        try:
+            return cls.current().by_id.get(int(scanner_id))
+        except (TypeError, ValueError):
+            return None
+    
+    @classmethod
+    def get_or_404(cls, scanner_id):
+        scanner = cls.get(scanner_id)
+        if scanner is None:
+            abort(404)
+        return scanner
+
+@event.listens_for(ScannerModel, 'after_insert')
+@event.listens_for(ScannerModel, 'after_update')
+@event.listens_for(ScannerModel, 'after_delete')
+def flag_scanner_catalog_change(mapper, connection, target):
+    """Writes outside the admin views are picked up once their transaction commits"""
+    db.inspect(target).session.info['scanner_catalog_changed'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def mark_scanner_catalog_stale(session):
+    if session.info.pop('scanner_catalog_changed', False):
+        ScannerCatalog.mark_stale()
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_scanner_catalog_change(session, previous_transaction):
+    session.info.pop('scanner_catalog_changed', None)
+
+# ===== SITE ENGINEERING ENGINES =====
+
+class EngineResultCache:
+    """Small thread-safe LRU cache for engine results keyed by input fingerprints"""
+    
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SpecParser:
+    """Parse free-text scanner and site specifications into numbers"""
+    
+    BTU_PER_KW = 3412.14
+    KW_PER_REFRIGERATION_TON = 3.517
+    
+    @staticmethod
+    def cooling_kw(text):
+        """'150 kW cooling', '36000 BTU/h', '10 tons' -> kW (None when unparseable)"""
+        text = (text or '').lower().replace(',', '')
+        match = re.search(r'(\d+(?:\.\d+)?)\s*(kw|btu|tons?|tr)\b', text)
+        if not match:
+            return None
+        value, unit = float(match.group(1)), match.group(2)
+        if unit == 'btu':
+            return value / SpecParser.BTU_PER_KW
+        if unit in ('ton', 'tons', 'tr'):
+            return value * SpecParser.KW_PER_REFRIGERATION_TON
+        return value
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def power(text):
+        """'triphasé 380V', '3-phase 400 V 150 kVA', 'single phase 230V' -> (voltage, phases, kva)"""
+        text = (text or '').lower()
+        voltage = re.search(r'(\d{3})\s*v\b', text)
+        kva = re.search(r'(\d+(?:\.\d+)?)\s*kva\b', text)
+        voltage = float(voltage.group(1)) if voltage else None
+        
+        if re.search(r'\b(?:tri|three)[\s-]*phas[eé]\b|\b3[\s-]*(?:ph(?:ase)?|φ)\b', text):
+            phases = 3
+        elif re.search(r'\b(?:mono|single)[\s-]*phas[eé]\b|\b1[\s-]*(?:ph(?:ase)?|φ)\b', text):
+            phases = 1
+        elif voltage:
+            phases = 3 if voltage >= 380 else 1
         else:
-            base_score -= 10
+            phases = None
+        return voltage, phases, float(kva.group(1)) if kva else None
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def dimensions(text):
+        """'2.1m × 2.6m × 1.9m', '210 x 260 x 190 cm', '2100x2600x1900 mm' -> (length, width, height) in m"""
+        text = (text or '').lower().replace(',', '.')
+        values = [float(v) for v in re.findall(r'\d+(?:\.\d+)?', text)]
+        if len(values) < 3:
+            return None, None, None
+        values = values[:3]
+        # A stated unit wins over the magnitude guess (190 cm is not 190 mm)
+        if 'mm' in text or ('cm' not in text and min(values) > 100):
+            values = [v / 1000 for v in values]
+        elif 'cm' in text or min(values) > 10:
+            values = [v / 100 for v in values]
+        return tuple(values)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def bounds(text, unit, unit_required=True):
+        """'18-24°C, 30-70% RH' -> (18, 24) for unit 'c' and (30, 70) for '%'; (None, None) when absent"""
+        text = (text or '').lower().replace('–', '-').replace(' to ', '-')
+        unit_pattern = '(?:' + {'c': r'\s*°?\s*c\b', '%': r'\s*%'}[unit] + (')' if unit_required else ')?')
+        number = r'(-?\d+(?:\.\d+)?)'
+        match = re.search(number + r'\s*-\s*' + number + unit_pattern, text)
+        if match:
+            low, high = sorted((float(match.group(1)), float(match.group(2))))
+            return low, high
+        match = re.search(r'(?<![±\d.])' + number + unit_pattern, text)
+        if match and (unit_required or text.strip().startswith(match.group(1))):
+            return float(match.group(1)), float(match.group(1))
+        return None, None
+
+class SpecColumns:
+    """Numeric columns derived from free-text specification fields, refreshed on every write"""
+    
+    DERIVED = {
+        ScannerModel: (
+            (('power_voltage', 'power_phases', 'power_kva'), lambda s: SpecParser.power(s.required_power)),
+            (('cooling_kw',), lambda s: (SpecParser.cooling_kw(s.cooling_requirements) or s.heat_dissipation,)),
+            (('temperature_min', 'temperature_max'), lambda s: SpecParser.bounds(s.environmental_specs, 'c')),
+            (('humidity_min', 'humidity_max'), lambda s: SpecParser.bounds(s.environmental_specs, '%')),
+            (('length_m', 'width_m', 'height_m'), lambda s: SpecParser.dimensions(s.dimensions))
+        ),
+        ManualRoomEntry: (
+            (('power_voltage', 'power_phases', 'power_kva'), lambda r: SpecParser.power(r.available_power)),
+            (('hvac_kw',), lambda r: (SpecParser.cooling_kw(r.hvac_capacity),)),
+            (('temperature_min', 'temperature_max'),
+             lambda r: SpecParser.bounds(r.current_temperature_range, 'c', unit_required=False)),
+            (('humidity_min', 'humidity_max'),
+             lambda r: SpecParser.bounds(r.current_humidity_range, '%', unit_required=False))
+        ),
+        SiteSpecification: (
+            (('power_voltage', 'power_phases', 'power_kva'), lambda s: SpecParser.power(s.available_power)),
+            (('hvac_kw',), lambda s: (SpecParser.cooling_kw(s.hvac_capacity),))
+        )
+    }
+    
+    @classmethod
+    def values(cls, target):
+        """{column: parsed value} for one model instance"""
+        values = {}
+        for columns, parse in cls.DERIVED[type(target)]:
+            values.update(zip(columns, parse(target)))
+        if 'power_phases' in values and values['power_phases'] is not None:
+            values['power_phases'] = int(values['power_phases'])
+        return values
+    
+    @classmethod
+    def apply(cls, target):
+        for column, value in cls.values(target).items():
+            setattr(target, column, value)
+        target.specs_parsed_at = datetime.utcnow()
+    
+    @classmethod
+    def backfill(cls, chunk_size=1000):
+        """Populate derived columns on rows never parsed; returns rows whose values changed
+        
+        Every visited row gets specs_parsed_at, so text that does not parse is not retried on each startup.
+        """
+        updated = 0
+        for model, derived in cls.DERIVED.items():
+            last_id = 0
+            while True:
+                rows = model.query.filter(model.id > last_id, model.specs_parsed_at.is_(None)).order_by(
+                    model.id).limit(chunk_size).all()
+                if not rows:
+                    break
+                now = datetime.utcnow()
+                mappings = []
+                for row in rows:
+                    values = cls.values(row)
+                    mapping = dict(values, id=row.id, specs_parsed_at=now)
+                    if any(getattr(row, column) != value for column, value in values.items()):
+                        updated += 1
+                    elif hasattr(model, 'updated_at'):
+                        mapping['updated_at'] = row.updated_at  # Only the stamp is new: not an edit
+                    mappings.append(mapping)
+                db.session.bulk_update_mappings(model, mappings)
+                db.session.commit()
+                last_id = rows[-1].id
+        if updated:
+            logger.info(f"Spec columns backfilled on {updated} rows")
+        return updated
+    
+    @staticmethod
+    def compatible_rooms_query(scanner, hvac=False, climate=False):
+        """Rooms meeting a scanner's supply (and optionally cooling/climate) needs as indexed range predicates"""
+        query = ManualRoomEntry.query
+        tolerance = ElectricalEngine.VOLTAGE_TOLERANCE
+        if scanner.power_voltage:
+            query = query.filter(ManualRoomEntry.power_voltage.between(
+                scanner.power_voltage * (1 - tolerance), scanner.power_voltage * (1 + tolerance)))
+        if scanner.power_phases:
+            query = query.filter(ManualRoomEntry.power_phases >= scanner.power_phases)
+        if hvac and scanner.cooling_kw:
+            query = query.filter(ManualRoomEntry.hvac_kw >= scanner.cooling_kw)
+        if climate:
+            for low, high in (('temperature_min', 'temperature_max'), ('humidity_min', 'humidity_max')):
+                if getattr(scanner, low) is not None and getattr(scanner, high) is not None:
+                    query = query.filter(getattr(ManualRoomEntry, low) >= getattr(scanner, low),
+                                         getattr(ManualRoomEntry, high) <= getattr(scanner, high))
+        return query
+
+@event.listens_for(ScannerModel, 'before_insert')
+@event.listens_for(ScannerModel, 'before_update')
+@event.listens_for(ManualRoomEntry, 'before_insert')
+@event.listens_for(ManualRoomEntry, 'before_update')
+@event.listens_for(SiteSpecification, 'before_insert')
+@event.listens_for(SiteSpecification, 'before_update')
+def parse_spec_columns(mapper, connection, target):
+    """Keep the parsed numeric columns in step with their free-text sources"""
+    SpecColumns.apply(target)
+
+class ElectricalEngine:
+    """Feeder sizing, voltage drop and supply adequacy for room/scanner pairs"""
+    
+    VOLTAGE_TOLERANCE = 0.10        # Supply within ±10% of the rated scanner voltage
+    MAX_VOLTAGE_DROP_PCT = 3.0
+    CONTINUOUS_LOAD_FACTOR = 1.25
+    DEFAULT_POWER_FACTOR = 0.85
+    COPPER_RESISTIVITY = 0.0225     # Ω·mm²/m at conductor operating temperature
+    CABLE_REACTANCE = 0.00008       # Ω/m
+    
+    # Copper XLPE multi-core cable in free air: cross-section (mm²) -> ampacity (A)
+    FEEDER_SIZES = np.array([16, 25, 35, 50, 70, 95, 120, 150, 185, 240, 300])
+    FEEDER_AMPACITY = np.array([100, 127, 158, 192, 246, 298, 346, 399, 456, 538, 621])
+    
+    @classmethod
+    def parse_many(cls, texts):
+        """Parse power strings into (voltage, phases, kva) float arrays"""
+        parsed = [SpecParser.power(t) for t in texts]
+        return tuple(np.array([p[i] for p in parsed], dtype=float) for i in range(3))
+    
+    @classmethod
+    def compatible(cls, site_voltage, site_phases, scanner_voltage, scanner_phases, site_text=None, scanner_text=None):
+        """Exact supply compatibility; falls back to string equality when either side is unparseable"""
+        parsed = np.isfinite(site_voltage) & np.isfinite(scanner_voltage)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            voltage_ok = np.abs(site_voltage - scanner_voltage) <= scanner_voltage * cls.VOLTAGE_TOLERANCE
+        phases_ok = ~(np.nan_to_num(site_phases) < np.nan_to_num(scanner_phases))
+        if site_text is None:
+            return parsed & voltage_ok & phases_ok
+        text_equal = np.array([a == b for a, b in np.broadcast(np.asarray(site_text, dtype=object),
+                                                               np.asarray(scanner_text, dtype=object))])
+        return np.where(parsed, voltage_ok & phases_ok, text_equal.reshape(np.shape(parsed)))
+    
+    @classmethod
+    def power_match(cls, available_power, required_power):
+        """Element-wise compatibility of two equally long lists of power strings"""
+        site_v, site_ph, _ = cls.parse_many(available_power)
+        scanner_v, scanner_ph, _ = cls.parse_many(required_power)
+        return cls.compatible(site_v, site_ph, scanner_v, scanner_ph, list(available_power), list(required_power))
+    
+    @classmethod
+    def evaluate_matrix(cls, rooms, scanners):
+        """Evaluate every room × scanner pair; rooms and scanners are dicts of 1-D arrays
+        
+        rooms: available_power (text), panel_distance (m), panel_capacity (A), has_ups, ups_kva
+        scanners: required_power (text), power_kw, power_factor
+        """
+        site_v, site_ph, _ = cls.parse_many(rooms['available_power'])
+        scanner_v, scanner_ph, scanner_kva = cls.parse_many(scanners['required_power'])
+        
+        site_v, site_ph = site_v[:, None], site_ph[:, None]
+        distance = np.nan_to_num(np.asarray(rooms['panel_distance'], dtype=float), nan=0.0)[:, None]
+        panel_a = np.asarray(rooms['panel_capacity'], dtype=float)[:, None]
+        ups_kva = np.where(np.asarray(rooms['has_ups'], dtype=bool),
+                           np.nan_to_num(np.asarray(rooms['ups_kva'], dtype=float)), 0.0)[:, None]
+        
+        power_kw = np.asarray(scanners['power_kw'], dtype=float)[None, :]
+        pf = np.asarray(scanners['power_factor'], dtype=float)
+        pf = np.where(np.isfinite(pf) & (pf > 0), pf, cls.DEFAULT_POWER_FACTOR)[None, :]
+        required_kva = np.where(np.isfinite(power_kw), power_kw / pf, scanner_kva[None, :])
+        
+        # Evaluate at the site voltage, or the rated voltage when the site is unknown
+        voltage = np.where(np.isfinite(site_v), site_v, scanner_v[None, :])
+        three_phase = np.where(np.isfinite(site_ph), site_ph, scanner_ph[None, :]) != 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            current = np.where(three_phase, required_kva * 1000 / (np.sqrt(3) * voltage),
+                               required_kva * 1000 / voltage)
+        design_current = current * cls.CONTINUOUS_LOAD_FACTOR
+        
+        # Voltage drop for every standard size: shape (rooms, scanners, sizes)
+        sin_phi = np.sqrt(1 - pf ** 2)
+        resistance = cls.COPPER_RESISTIVITY / cls.FEEDER_SIZES
+        drop_factor = np.where(three_phase, np.sqrt(3), 2.0)[..., None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            drop_pct = (drop_factor * current[..., None] * distance[..., None] *
+                        (resistance * pf[..., None] + cls.CABLE_REACTANCE * sin_phi[..., None]) /
+                        voltage[..., None] * 100)
+        suitable = (cls.FEEDER_AMPACITY >= design_current[..., None]) & (drop_pct <= cls.MAX_VOLTAGE_DROP_PCT)
+        has_size = suitable.any(axis=-1)
+        size_index = np.where(has_size, suitable.argmax(axis=-1), len(cls.FEEDER_SIZES) - 1)
+        
+        return {
+            'compatible': cls.compatible(site_v, site_ph, scanner_v[None, :], scanner_ph[None, :],
+                                         np.asarray(rooms['available_power'], dtype=object)[:, None],
+                                         np.asarray(scanners['required_power'], dtype=object)[None, :]),
+            'site_voltage': np.broadcast_to(site_v, current.shape),
+            'required_voltage': np.broadcast_to(scanner_v[None, :], current.shape),
+            'required_kva': np.broadcast_to(required_kva, current.shape),
+            'current_a': current,
+            'feeder_mm2': np.where(has_size, cls.FEEDER_SIZES[size_index], np.nan),
+            'voltage_drop_pct': np.take_along_axis(drop_pct, size_index[..., None], axis=-1)[..., 0],
+            'panel_adequate': ~(panel_a < design_current),  # Unknown panel capacity is not flagged
+            'ups_adequate': ups_kva >= required_kva
+        }
+    
+    @staticmethod
+    def room_inputs(rooms):
+        """Engine room inputs from ManualRoomEntry rows"""
+        return {
+            'available_power': [r.available_power for r in rooms],
+            'panel_distance': [r.electrical_panel_distance for r in rooms],
+            'panel_capacity': [r.electrical_panel_capacity for r in rooms],
+            'has_ups': [r.has_ups for r in rooms],
+            'ups_kva': [r.ups_capacity for r in rooms]
+        }
+    
+    @staticmethod
+    def scanner_inputs(scanners):
+        """Engine scanner inputs from ScannerModel rows"""
+        return {
+            'required_power': [s.required_power for s in scanners],
+            'power_kw': [s.power_consumption for s in scanners],
+            'power_factor': [s.power_factor_requirement for s in scanners]
+        }
+    
+    @staticmethod
+    def pair_result(matrix, i, j):
+        """JSON-ready result for one room/scanner pair of an evaluated matrix"""
+        def number(value, digits=2):
+            value = float(value)
+            return round(value, digits) if np.isfinite(value) else None
+        
+        return {
+            'compatible': bool(matrix['compatible'][i, j]),
+            'site_voltage': number(matrix['site_voltage'][i, j], 0),
+            'required_voltage': number(matrix['required_voltage'][i, j], 0),
+            'required_kva': number(matrix['required_kva'][i, j], 1),
+            'current_a': number(matrix['current_a'][i, j], 1),
+            'feeder_mm2': number(matrix['feeder_mm2'][i, j], 0),
+            'voltage_drop_pct': number(matrix['voltage_drop_pct'][i, j]),
+            'panel_adequate': bool(matrix['panel_adequate'][i, j]),
+            'ups_adequate': bool(matrix['ups_adequate'][i, j])
+        }
+
+class StructuralEngine:
+    """Floor screening for scanner distributed and gantry point loads"""
+    
+    DYNAMIC_FACTOR = 1.1            # Gantry rotation and installation handling
+    GANTRY_WEIGHT_SHARE = 0.75      # Remainder is carried by the patient table
+    SUPPORT_POINTS = 4
+    PAD_SIZE = 0.15                 # m, square levelling pad
+    LEGACY_CAPACITY_FACTOR = 2      # Capacity > weight × factor when the footprint is unknown
+    
+    # Depth (m) through which a point load spreads at 45° before reaching the rated structure
+    LOAD_SPREAD_DEPTH = {'concrete': 0.3, 'composite': 0.2, 'steel': 0.15, 'wood': 0.05, 'timber': 0.05, 'raised': 0.0}
+    DEFAULT_SPREAD_DEPTH = 0.15
+    WEAK_FLOOR_TYPES = ('wood', 'timber', 'raised')
+    
+    @classmethod
+    def floor_properties(cls, floor_types):
+        """(spread depth, weak floor flag) arrays for floor type strings"""
+        depth, weak = [], []
+        for floor_type in floor_types:
+            floor_type = (floor_type or '').lower()
+            depth.append(next((d for k, d in cls.LOAD_SPREAD_DEPTH.items() if k in floor_type), cls.DEFAULT_SPREAD_DEPTH))
+            weak.append(any(k in floor_type for k in cls.WEAK_FLOOR_TYPES))
+        return np.array(depth, dtype=float), np.array(weak, dtype=bool)
+    
+    @classmethod
+    def _evaluate(cls, weight, length, width, capacity, spread_depth, weak):
+        """Broadcasting core shared by the pairwise and matrix entry points"""
+        load = weight * cls.DYNAMIC_FACTOR
+        footprint = length * width
+        with np.errstate(invalid='ignore', divide='ignore'):
+            distributed = load / footprint
+            point_load = load * cls.GANTRY_WEIGHT_SHARE / cls.SUPPORT_POINTS
+            point_pressure = point_load / (cls.PAD_SIZE + 2 * spread_depth) ** 2
+            utilization = np.maximum(distributed, point_pressure) / capacity
+        
+        known_capacity = np.isfinite(capacity) & (capacity > 0)
+        distributed_ok = distributed <= capacity
+        point_ok = point_pressure <= capacity
+        adequate = np.where(np.isfinite(footprint), distributed_ok & point_ok & ~weak,
+                            capacity > weight * cls.LEGACY_CAPACITY_FACTOR) & known_capacity
+        
+        return {
+            'footprint_m2': footprint,
+            'distributed_load': distributed,
+            'point_load': point_load,
+            'point_pressure': point_pressure,
+            'distributed_ok': distributed_ok,
+            'point_ok': point_ok,
+            'utilization': utilization,
+            'adequate': adequate,
+            'reinforcement_required': ~adequate
+        }
+    
+    @classmethod
+    def evaluate(cls, weight, dimensions, floor_capacity, floor_type):
+        """Element-wise check of equally long scanner/floor sequences"""
+        length, width, _ = (np.array(v, dtype=float) for v in zip(*[SpecParser.dimensions(d) for d in dimensions]))
+        depth, weak = cls.floor_properties(floor_type)
+        return cls._evaluate(np.asarray(weight, dtype=float), length, width,
+                             np.asarray(floor_capacity, dtype=float), depth, weak)
+    
+    @classmethod
+    def evaluate_matrix(cls, rooms, scanners):
+        """Every room × candidate scanner; rooms have floor_capacity/floor_type, scanners weight/dimensions"""
+        length, width, _ = (np.array(v, dtype=float)[None, :]
+                            for v in zip(*[SpecParser.dimensions(d) for d in scanners['dimensions']]))
+        depth, weak = cls.floor_properties(rooms['floor_type'])
+        return cls._evaluate(np.asarray(scanners['weight'], dtype=float)[None, :], length, width,
+                             np.asarray(rooms['floor_capacity'], dtype=float)[:, None],
+                             depth[:, None], weak[:, None])
+
+class DeliveryRouteEngine:
+    """Geometric feasibility of moving the scanner through the corridor and door into the room"""
+    
+    CLEARANCE = 0.05                # m, free space on each constrained dimension
+    DOLLY_HEIGHT = 0.1              # m, transport skates under the gantry
+    SKATE_COUNT = 4
+    SKATE_PAD_SIZE = 0.1            # m, square contact area per skate
+    TURN_ANGLES = np.linspace(0.01, np.pi / 2 - 0.01, 90)
+    
+    _cache = EngineResultCache(max_entries=512)
+    
+    @classmethod
+    def max_turn_length(cls, corridor_width, door_width, item_width):
+        """Longest rectangle of the given width that can turn from the corridor into the door
+        
+        For a right-angle corner the limit is min over θ of (a·sinθ + b·cosθ − w) / (sinθ·cosθ).
+        """
+        theta = cls.TURN_ANGLES
+        sin, cos = np.sin(theta), np.cos(theta)
+        a, b, w = corridor_width[..., None], door_width[..., None], item_width[..., None]
+        return ((a * sin + b * cos - w) / (sin * cos)).min(axis=-1)
+    
+    @classmethod
+    def evaluate_matrix(cls, rooms, scanners):
+        """Every room × scanner; rooms: door_width/door_height/corridor_width/ceiling_clearance/
+        floor_capacity/floor_type, scanners: dimensions/weight"""
+        dims = np.array([SpecParser.dimensions(d) for d in scanners['dimensions']], dtype=float).reshape(-1, 3)
+        horizontal = np.sort(dims[:, :2], axis=1)
+        narrow, long_side, height = horizontal[:, 0][None, :], horizontal[:, 1][None, :], dims[:, 2][None, :]
+        weight = np.asarray(scanners['weight'], dtype=float)[None, :]
+        
+        door_width = np.asarray(rooms['door_width'], dtype=float)[:, None]
+        door_height = np.asarray(rooms['door_height'], dtype=float)[:, None]
+        corridor = np.asarray(rooms['corridor_width'], dtype=float)[:, None]
+        ceiling = np.asarray(rooms['ceiling_clearance'], dtype=float)[:, None]
+        capacity = np.asarray(rooms['floor_capacity'], dtype=float)[:, None]
+        spread, _ = StructuralEngine.floor_properties(rooms['floor_type'])
+        
+        # Unknown route dimensions are not flagged; they are reported as unverified
+        door_width_ok = ~(door_width < narrow + cls.CLEARANCE)
+        door_height_ok = ~(door_height < height + cls.DOLLY_HEIGHT + cls.CLEARANCE)
+        corridor_ok = ~(corridor < narrow + cls.CLEARANCE)
+        ceiling_ok = ~(ceiling < height + cls.DOLLY_HEIGHT + cls.CLEARANCE)
+        
+        shape = (door_width.shape[0], narrow.shape[1])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            turn_limit = cls.max_turn_length(
+                np.broadcast_to(corridor - cls.CLEARANCE, shape),
+                np.broadcast_to(door_width - cls.CLEARANCE, shape),
+                np.broadcast_to(narrow, shape)
+            )
+            skate_pressure = (weight * StructuralEngine.DYNAMIC_FACTOR / cls.SKATE_COUNT /
+                              (cls.SKATE_PAD_SIZE + 2 * spread[:, None]) ** 2)
+        turn_ok = ~(turn_limit < long_side)
+        
+        verified = (np.isfinite(door_width) & np.isfinite(door_height) & np.isfinite(corridor) &
+                    np.isfinite(ceiling) & np.isfinite(narrow))
+        feasible = door_width_ok & door_height_ok & ceiling_ok & corridor_ok & turn_ok
+        
+        limiting = np.select(
+            [~door_height_ok, ~ceiling_ok, ~door_width_ok, ~corridor_ok, ~turn_ok],
+            ['door_height', 'ceiling_clearance', 'door_width', 'corridor_width', 'corner_turn'],
+            default=''
+        )
+        
+        return {
+            'feasible': feasible,
+            'verified': np.broadcast_to(verified, shape),
+            'door_width_ok': np.broadcast_to(door_width_ok, shape),
+            'door_height_ok': np.broadcast_to(door_height_ok, shape),
+            'ceiling_ok': np.broadcast_to(ceiling_ok, shape),
+            'corridor_ok': np.broadcast_to(corridor_ok, shape),
+            'turn_ok': turn_ok,
+            'max_turn_length': turn_limit,
+            'limiting': limiting,
+            'floor_protection_required': np.broadcast_to(~(skate_pressure <= capacity), shape)
+        }
+    
+    @classmethod
+    def for_room(cls, room, scanners):
+        """Feasibility flags of one room for every scanner, cached per room revision"""
+        key = (room.id, room.updated_at, tuple((s.id, s.dimensions, s.weight) for s in scanners))
+        cached = cls._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = []
+        if scanners:
+            matrix = cls.evaluate_matrix(
+                {'door_width': [room.door_width], 'door_height': [room.door_height],
+                 'corridor_width': [room.corridor_width], 'ceiling_clearance': [room.ceiling_clearance],
+                 'floor_capacity': [room.floor_load_capacity], 'floor_type': [room.floor_type]},
+                {'dimensions': [s.dimensions for s in scanners], 'weight': [s.weight for s in scanners]}
+            )
+            for j, scanner in enumerate(scanners):
+                turn = float(matrix['max_turn_length'][0, j])
+                result.append({
+                    'scanner_id': scanner.id,
+                    'feasible': bool(matrix['feasible'][0, j]),
+                    'verified': bool(matrix['verified'][0, j]),
+                    'door_width_ok': bool(matrix['door_width_ok'][0, j]),
+                    'door_height_ok': bool(matrix['door_height_ok'][0, j]),
+                    'ceiling_ok': bool(matrix['ceiling_ok'][0, j]),
+                    'corridor_ok': bool(matrix['corridor_ok'][0, j]),
+                    'turn_ok': bool(matrix['turn_ok'][0, j]),
+                    'max_turn_length_m': round(turn, 2) if np.isfinite(turn) else None,
+                    'limiting_constraint': str(matrix['limiting'][0, j]) or None,
+                    'floor_protection_required': bool(matrix['floor_protection_required'][0, j])
+                })
+        
+        cls._cache.put(key, result)
+        return result
+
+class PlacementSolver:
+    """Grid search for gantry and table placement with service clearances"""
+    
+    GRID_STEP = 0.1
+    GANTRY_DEPTH = 1.0              # m along the bore axis; the rest of the system length is the table
+    TABLE_WIDTH = 0.7
+    GANTRY_SERVICE_CLEARANCE = 1.0  # Sides and rear of the gantry with covers open
+    TABLE_ACCESS_CLEARANCE = 1.0    # Patient transfer on both sides of the table
+    TABLE_FOOT_CLEARANCE = 0.6
+    TABLE_TRAVEL = 1.0              # Cradle stroke beyond the gantry rear
+    DOOR_KEEPOUT_DEPTH = 1.2        # Door swing and stretcher entry in front of the door
+    VIEW_WEIGHT = 0.2               # Prefer gantries near the control-room window wall (x = length)
+    PARALLEL_VIEW_BONUS = 0.1       # Prefer the patient axis parallel to the window
+    ROTATIONS = (0, 90, 180, 270)
+    
+    @classmethod
+    def _local_rects(cls, gantry_width, system_length):
+        """Clearance rectangles (u0, u1, v0, v1) in the scanner frame; u points from gantry to table foot"""
+        d, tw = cls.GANTRY_DEPTH, cls.TABLE_WIDTH
+        table_length = max(system_length - d, 0.0)
+        return np.array([
+            # Gantry with service clearance at the sides and rear
+            [-d / 2 - cls.GANTRY_SERVICE_CLEARANCE, d / 2,
+             -gantry_width / 2 - cls.GANTRY_SERVICE_CLEARANCE, gantry_width / 2 + cls.GANTRY_SERVICE_CLEARANCE],
+            # Table with patient access and foot clearance
+            [d / 2, d / 2 + table_length + cls.TABLE_FOOT_CLEARANCE,
+             -tw / 2 - cls.TABLE_ACCESS_CLEARANCE, tw / 2 + cls.TABLE_ACCESS_CLEARANCE],
+            # Cradle travel through the bore
+            [-d / 2 - cls.TABLE_TRAVEL, -d / 2, -tw / 2, tw / 2]
+        ]), d / 2 + table_length / 2
+    
+    @staticmethod
+    def _rotate(rects, rotation):
+        """Map scanner-frame rectangles to room-frame offsets (x0, x1, y0, y1)"""
+        u0, u1, v0, v1 = rects.T
+        return np.stack({
+            0: (u0, u1, v0, v1),
+            90: (-v1, -v0, u0, u1),
+            180: (-u1, -u0, -v1, -v0),
+            270: (v0, v1, -u1, -u0)
+        }[rotation], axis=1)
+    
+    @staticmethod
+    def _rotate_point(u, rotation):
+        return {0: (u, 0.0), 90: (0.0, u), 180: (-u, 0.0), 270: (0.0, -u)}[rotation]
+    
+    @classmethod
+    def solve(cls, room_length, room_width, door_width, scanner_dimensions, top=3):
+        """Best layouts per orientation and the minimal room that fits any orientation"""
+        length, width, _ = SpecParser.dimensions(scanner_dimensions)
+        if length is None:
+            return {'feasible': None, 'reason': 'Scanner dimensions could not be parsed', 'layouts': []}
+        if not room_length or not room_width or room_length <= 0 or room_width <= 0:
+            return {'feasible': None, 'reason': 'Room length and width must be positive', 'layouts': []}
+        gantry_width, system_length = min(length, width), max(length, width)
+        local, table_offset = cls._local_rects(gantry_width, system_length)
         
-        # HVAC availability
-        if site_spec.has_hvac:
-            base_score += 10
+        xs = np.arange(0, room_length + 1e-9, cls.GRID_STEP)[:, None]
+        ys = np.arange(0, room_width + 1e-9, cls.GRID_STEP)[None, :]
+        door = door_width or 0.0
+        keepout = (room_length / 2 - door / 2, room_length / 2 + door / 2, 0.0, cls.DOOR_KEEPOUT_DEPTH)
+        
+        layouts, minimal = [], None
+        for rotation in cls.ROTATIONS:
+            rects = cls._rotate(local, rotation)
+            x0, x1, y0, y1 = rects[:, 0].min(), rects[:, 1].max(), rects[:, 2].min(), rects[:, 3].max()
+            
+            need_length, need_width = x1 - x0, y1 - y0
+            if minimal is None or need_length * need_width < minimal['length'] * minimal['width']:
+                minimal = {'length': round(need_length, 2), 'width': round(need_width, 2), 'rotation_deg': rotation}
+            
+            margin = np.minimum(np.minimum(xs + x0, room_length - (xs + x1)),
+                                np.minimum(ys + y0, room_width - (ys + y1)))
+            valid = margin >= 0
+            if door:
+                for rx0, rx1, ry0, ry1 in rects:
+                    overlap = ((xs + rx0 < keepout[1]) & (xs + rx1 > keepout[0]) &
+                               (ys + ry0 < keepout[3]) & (ys + ry1 > keepout[2]))
+                    valid &= ~overlap
+            if not valid.any():
+                continue
+            
+            score = margin - cls.VIEW_WEIGHT * (room_length - xs) / room_length
+            if rotation in (90, 270):
+                score = score + cls.PARALLEL_VIEW_BONUS
+            score = np.where(valid, score, -np.inf)
+            i, j = np.unravel_index(np.argmax(score), score.shape)
+            gx, gy = float(xs[i, 0]), float(ys[0, j])
+            tx, ty = cls._rotate_point(table_offset, rotation)
+            layouts.append({
+                'rotation_deg': rotation,
+                'gantry_center': [round(gx, 2), round(gy, 2)],
+                'table_center': [round(gx + tx, 2), round(gy + ty, 2)],
+                'margin_m': round(float(margin[i, j]), 2),
+                'score': round(float(score[i, j]), 3),
+                'valid_positions': int(valid.sum())
+            })
+        
+        layouts.sort(key=lambda layout: -layout['score'])
+        return {
+            'feasible': bool(layouts),
+            'layouts': layouts[:top],
+            'minimal_room': minimal,
+            'gantry_width': gantry_width,
+            'system_length': system_length,
+            'grid_step': cls.GRID_STEP
+        }
+    
+    @classmethod
+    def for_site_spec(cls, site_spec, top=3):
+        return cls.solve(site_spec.room_length, site_spec.room_width, site_spec.door_width,
+                         site_spec.catalog_scanner.dimensions, top)
+
+class HeatLoadCalculator:
+    """Scan-room cooling load from equipment dissipation, occupants, lighting and ventilation"""
+    
+    PERSON_LOAD_KW = 0.13           # Sensible + latent per person at light activity
+    LIGHTING_W_PER_M2 = 15
+    AIR_DENSITY = 1.2               # kg/m³
+    AIR_SPECIFIC_HEAT = 1.005       # kJ/(kg·K)
+    FRESH_AIR_FRACTION = 0.3        # Share of supply air taken from outside
+    OUTDOOR_DELTA_T = 12            # K between summer design outdoor and room set point
+    DEFAULT_AIR_CHANGES = 6
+    MAX_STAFF_IN_SCAN_ROOM = 2      # Plus the patient
+    SAFETY_FACTOR = 1.15
+    
+    @classmethod
+    def compute_batch(cls, heat_dissipation, room_length, room_width, room_height,
+                      air_changes, staff_count, available_kw):
+        """Vectorized cooling requirement and shortfall (kW) for n rooms"""
+        heat_dissipation = np.nan_to_num(np.asarray(heat_dissipation, dtype=float))
+        floor_area = np.asarray(room_length, dtype=float) * np.asarray(room_width, dtype=float)
+        volume = floor_area * np.asarray(room_height, dtype=float)
+        air_changes = np.asarray(air_changes, dtype=float)
+        air_changes = np.where(np.isfinite(air_changes) & (air_changes > 0), air_changes, cls.DEFAULT_AIR_CHANGES)
+        staff = np.asarray(staff_count, dtype=float)
+        staff = np.where(np.isfinite(staff), np.minimum(staff, cls.MAX_STAFF_IN_SCAN_ROOM), cls.MAX_STAFF_IN_SCAN_ROOM)
+        
+        occupant_kw = (staff + 1) * cls.PERSON_LOAD_KW
+        lighting_kw = floor_area * cls.LIGHTING_W_PER_M2 / 1000
+        supply_m3s = air_changes * volume / 3600
+        ventilation_kw = (cls.AIR_DENSITY * cls.AIR_SPECIFIC_HEAT * supply_m3s *
+                          cls.FRESH_AIR_FRACTION * cls.OUTDOOR_DELTA_T)
+        required_kw = (heat_dissipation + occupant_kw + lighting_kw + ventilation_kw) * cls.SAFETY_FACTOR
+        available = np.nan_to_num(np.asarray(available_kw, dtype=float))  # Unparseable capacity counts as none
+        
+        return {
+            'equipment_kw': heat_dissipation,
+            'occupant_kw': occupant_kw,
+            'lighting_kw': lighting_kw,
+            'ventilation_kw': ventilation_kw,
+            'required_kw': required_kw,
+            'available_kw': available,
+            'shortfall_kw': np.maximum(0.0, required_kw - available)
+        }
+    
+    @staticmethod
+    def _inputs(site_spec):
+        scanner, room = site_spec.catalog_scanner, site_spec.manual_room
+        available = SpecParser.cooling_kw(site_spec.hvac_capacity) if site_spec.has_hvac else 0.0
+        return (scanner.heat_dissipation, site_spec.room_length, site_spec.room_width, site_spec.room_height,
+                room.air_changes_per_hour if room else None, room.staff_count if room else None, available)
+    
+    @staticmethod
+    def _fingerprint(inputs):
+        return hashlib.sha1(repr(inputs).encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def assess(cls, site_specs, commit=True):
+        """Compute (or reuse) and store heat-load assessments for many site specifications"""
+        site_specs = list(site_specs)
+        if not site_specs:
+            return []
+        
+        existing = {a.site_specification_id: a for a in HeatLoadAssessment.query.filter(
+            HeatLoadAssessment.site_specification_id.in_([s.id for s in site_specs]))}
+        inputs = [cls._inputs(s) for s in site_specs]
+        fingerprints = [cls._fingerprint(i) for i in inputs]
+        stale = [i for i, s in enumerate(site_specs)
+                 if s.id not in existing or existing[s.id].input_fingerprint != fingerprints[i]]
+        
+        if stale:
+            batch = cls.compute_batch(*zip(*[inputs[i] for i in stale]))
+            for row, i in enumerate(stale):
+                spec = site_specs[i]
+                assessment = existing.get(spec.id) or HeatLoadAssessment(site_specification_id=spec.id)
+                assessment.input_fingerprint = fingerprints[i]
+                for field in ('equipment_kw', 'occupant_kw', 'lighting_kw', 'ventilation_kw',
+                              'required_kw', 'available_kw', 'shortfall_kw'):
+                    setattr(assessment, field, round(float(batch[field][row]), 2))
+                assessment.adequate = assessment.shortfall_kw == 0
+                assessment.computed_at = datetime.utcnow()
+                existing[spec.id] = assessment
+                db.session.add(assessment)
+            if commit:
+                db.session.commit()
+        
+        return [existing[s.id] for s in site_specs]
+    
+    @classmethod
+    def assess_project(cls, project):
+        return cls.assess(project.site_specifications)
+
+class ShieldingCalculator:
+    """Secondary (scatter) barrier thickness for CT rooms per the NCRP Report 147 DLP method"""
+    
+    DEFAULT_KVP = 120
+    DEFAULT_DAILY_PATIENTS = 30
+    ISOCENTRE_CLEARANCE = 0.3  # Occupied point 0.3 m beyond the barrier
+    
+    # Scatter fraction per DLP at 1 m (cm^-1) and typical DLP per procedure (mGy·cm)
+    SCATTER_COEFFICIENT = {'head': 9e-5, 'body': 3e-4}
+    TYPICAL_DLP = {'head': 1200, 'body': 550}
+    HEAD_FRACTION = 0.4
+    BODY_CONTRAST_FACTOR = 1.4  # Body scans repeated with contrast
+    
+    # Weekly air-kerma design goals (mGy/week)
+    DESIGN_GOALS = {'controlled': 0.1, 'uncontrolled': 0.02}
+    
+    # Archer fit parameters (alpha, beta, gamma) in mm^-1 for CT scatter
+    ARCHER = {
+        'lead': {120: (2.246, 5.73, 0.547), 140: (2.009, 3.99, 0.342)},
+        'concrete': {120: (0.0383, 0.0142, 0.658), 140: (0.0336, 0.0122, 0.519)}
+    }
+    
+    # Default wall layout: (name, axis the wall is perpendicular to, area type, occupancy factor)
+    WALLS = (
+        ('control_room', 'length', 'controlled', 1.0),
+        ('adjacent_room', 'length', 'uncontrolled', 1.0),
+        ('corridor', 'width', 'uncontrolled', 0.2),
+        ('adjacent_office', 'width', 'uncontrolled', 1.0)
+    )
+    
+    _cache = EngineResultCache()
+    
+    @staticmethod
+    def parse_kvp(*texts):
+        """Extract the maximum tube voltage from free-text scanner specs"""
+        for text in texts:
+            match = re.search(r'(\d{2,3})\s*kvp?\b', (text or '').lower())
+            if match:
+                return float(match.group(1))
+        return float(ShieldingCalculator.DEFAULT_KVP)
+    
+    @staticmethod
+    def parse_lead_equivalent(text):
+        """Extract the manufacturer lead-equivalent guideline in mm"""
+        match = re.search(r'(\d+(?:\.\d+)?)\s*mm\s*(?:of\s*)?(?:lead|pb)', (text or '').lower())
+        return float(match.group(1)) if match else 0.0
+    
+    @staticmethod
+    def weekly_patients(daily_patients, operating_hours):
+        days = 7 if operating_hours and '24/7' in operating_hours else 5
+        return (daily_patients or ShieldingCalculator.DEFAULT_DAILY_PATIENTS) * days
+    
+    @staticmethod
+    def archer_thickness(transmission, kvp, material):
+        """Invert the Archer transmission model; kvp selects the nearest fitted spectrum"""
+        fits = ShieldingCalculator.ARCHER[material]
+        use_140 = kvp > 130
+        alpha = np.where(use_140, fits[140][0], fits[120][0])
+        beta = np.where(use_140, fits[140][1], fits[120][1])
+        gamma = np.where(use_140, fits[140][2], fits[120][2])
+        ratio = beta / alpha
+        thickness = np.log((transmission ** -gamma + ratio) / (1 + ratio)) / (alpha * gamma)
+        return np.maximum(thickness, 0.0)
+    
+    @classmethod
+    def compute_batch(cls, room_length, room_width, room_height, weekly_patients, kvp, spec_lead_mm=None):
+        """Vectorized barrier design for n rooms × the default walls"""
+        room_length = np.asarray(room_length, dtype=float)[:, None]
+        room_width = np.asarray(room_width, dtype=float)[:, None]
+        room_height = np.asarray(room_height, dtype=float)[:, None]
+        kvp = np.asarray(kvp, dtype=float)[:, None]
+        
+        head = cls.HEAD_FRACTION * cls.SCATTER_COEFFICIENT['head'] * cls.TYPICAL_DLP['head']
+        body = ((1 - cls.HEAD_FRACTION) * cls.SCATTER_COEFFICIENT['body'] * cls.TYPICAL_DLP['body'] *
+                cls.BODY_CONTRAST_FACTOR)
+        kerma_1m = np.asarray(weekly_patients, dtype=float)[:, None] * (head + body)  # mGy/week at 1 m
+        
+        along_length = np.array([axis == 'length' for _, axis, _, _ in cls.WALLS])
+        occupancy = np.array([t for _, _, _, t in cls.WALLS])
+        design_goal = np.array([cls.DESIGN_GOALS[area] for _, _, area, _ in cls.WALLS])
+        
+        distance = np.where(along_length, room_length / 2, room_width / 2) + cls.ISOCENTRE_CLEARANCE
+        wall_area = np.where(along_length, room_width, room_length) * room_height
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            transmission = np.clip(design_goal * distance ** 2 / (occupancy * kerma_1m), 1e-12, 1.0)
+        lead_mm = cls.archer_thickness(transmission, kvp, 'lead')
+        concrete_mm = cls.archer_thickness(transmission, kvp, 'concrete')
+        
+        if spec_lead_mm is not None:
+            recommended_lead_mm = np.maximum(lead_mm, np.asarray(spec_lead_mm, dtype=float)[:, None])
         else:
-            base_score -= 15
+            recommended_lead_mm = lead_mm
+        # Round up to the 0.5 mm sheet increments lead is supplied in
+        recommended_lead_mm = np.ceil(recommended_lead_mm * 2) / 2
         
-        # Floor capacity
-        if site_spec.floor_load_capacity and site_spec.floor_load_capacity > scanner.weight * 2:
-            base_score += 10
+        return {
+            'walls': [name for name, _, _, _ in cls.WALLS],
+            'kerma_1m': kerma_1m[:, 0],
+            'distance': distance,
+            'transmission': transmission,
+            'lead_mm': lead_mm,
+            'concrete_mm': concrete_mm,
+            'recommended_lead_mm': recommended_lead_mm,
+            'wall_area': wall_area,
+            'lead_m2_mm': (recommended_lead_mm * wall_area).sum(axis=1)
+        }
+    
+    @classmethod
+    def for_site_spec(cls, site_spec):
+        """Per-wall barrier design for one site, cached on the inputs that drive it"""
+        scanner = site_spec.catalog_scanner
+        room = site_spec.manual_room
+        weekly = cls.weekly_patients(room.patient_volume if room else None, room.operating_hours if room else None)
+        kvp = cls.parse_kvp(scanner.radiation_shielding, scanner.environmental_specs)
+        spec_lead = cls.parse_lead_equivalent(scanner.radiation_shielding)
         
-        # Status-based adjustment
-        if status == 'CONFORMING':
-            base_score = max(base_score, 85)
-        elif status == 'NON_CONFORMING':
-            base_score = min(base_score, 50)
+        key = (site_spec.id, site_spec.room_length, site_spec.room_width, site_spec.room_height, weekly, kvp, spec_lead)
+        cached = cls._cache.get(key)
+        if cached is not None:
+            return cached
         
-        return max(0, min(100, base_score))
+        batch = cls.compute_batch([site_spec.room_length], [site_spec.room_width], [site_spec.room_height],
+                                  [weekly], [kvp], [spec_lead])
+        result = {
+            'kvp': kvp,
+            'weekly_patients': weekly,
+            'kerma_1m_mgy_week': round(float(batch['kerma_1m'][0]), 3),
+            'manufacturer_lead_mm': spec_lead,
+            'lead_m2_mm': round(float(batch['lead_m2_mm'][0]), 2),
+            'walls': [
+                {
+                    'wall': wall,
+                    'distance_m': round(float(batch['distance'][0, i]), 2),
+                    'transmission': float(batch['transmission'][0, i]),
+                    'lead_mm': round(float(batch['lead_mm'][0, i]), 2),
+                    'concrete_mm': round(float(batch['concrete_mm'][0, i]), 1),
+                    'recommended_lead_mm': float(batch['recommended_lead_mm'][0, i]),
+                    'area_m2': round(float(batch['wall_area'][0, i]), 2)
+                }
+                for i, wall in enumerate(batch['walls'])
+            ]
+        }
+        cls._cache.put(key, result)
+        return result
+
+# ===== VERSIONED COST MODEL =====
+
+DEFAULT_COST_RATES = {
+    'base_assessment': 8000,              # Enhanced professional assessment
+    'volume_expansion_per_m3': 20000,     # Cost per cubic meter expansion
+    'height_modification_per_m': 12000,
+    'electrical_upgrade': 25000,          # Electrical system upgrade
+    'hvac_new_neuviz': 45000,             # Precision HVAC for NeuViz
+    'hvac_new_standard': 30000,           # Standard medical HVAC
+    'hvac_upgrade_neuviz': 20000,         # HVAC upgrade for precision control
+    'floor_reinforcement': 18000,
+    'neuviz_engineer': 12000,             # Neusoft engineer
+    'neuviz_grounding': 25000,            # Enhanced grounding and precision systems
+    'neuviz_transport': 10000,            # Specialized transport and installation
+    'neuviz_monitoring': 8000,            # Environmental monitoring systems
+    'shielding_installation': 35000,      # Comprehensive shielding installation
+    'shielding_lead_cost_per_m2_mm': 0,   # When set, price calculated lead (m² × mm) instead of the flat fee
+    'score_multipliers': [[85, 0.6], [70, 0.8], [50, 1.3]],
+    'score_multiplier_floor': 1.8,        # Major overhaul below the lowest threshold
+    'status_multipliers': {
+        'CONFORMING': 0.5,
+        'REQUIRES_MODIFICATION': 1.0,
+        'NON_CONFORMING': 1.6
+    },
+    'extensive_work_multiplier': 1.4,
+    'minimal_work_multiplier': 0.7
+}
+
+# Keys accepted in older published tables but no longer used by the model
+RETIRED_COST_RATES = {'floor_load_factor'}  # Floor adequacy now comes from StructuralEngine
+
+class CostTableStore:
+    """Process-wide access to published cost tables"""
+    
+    ACTIVE_TTL_SECONDS = 60
+    
+    _lock = threading.Lock()
+    _versions = {}  # version -> rates; published tables never change
+    _active = None  # (version, rates, checked_at)
     
     @staticmethod
-    def _calculate_advanced_cost(site_spec, ai_response, score, status):
-        """Calculate comprehensive project cost"""
-        scanner = site_spec.scanner_model
-        base_cost = 8000  # Enhanced professional assessment
+    def validate_rates(rates):
+        """Merge rates over the defaults and reject unknown or non-numeric entries"""
+        rates = {k: v for k, v in rates.items() if k not in RETIRED_COST_RATES}
+        unknown = set(rates) - set(DEFAULT_COST_RATES)
+        if unknown:
+            raise ValueError(f"Unknown cost rates: {', '.join(sorted(unknown))}")
         
-        # Room modifications
-        room_volume = site_spec.room_length * site_spec.room_width * site_spec.room_height
-        required_volume = scanner.min_room_length * scanner.min_room_width * scanner.min_room_height
+        merged = dict(DEFAULT_COST_RATES)
+        merged.update(rates)
+        
+        for key, value in merged.items():
+            if key == 'score_multipliers':
+                if not value or not all(len(pair) == 2 and all(isinstance(v, (int, float)) for v in pair) for pair in value):
+                    raise ValueError("score_multipliers must be a non-empty list of [threshold, multiplier] pairs")
+            elif key == 'status_multipliers':
+                if not all(isinstance(v, (int, float)) for v in value.values()):
+                    raise ValueError("status_multipliers values must be numeric")
+            elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(f"Cost rate '{key}' must be numeric")
+        
+        merged['score_multipliers'] = sorted(merged['score_multipliers'], key=lambda pair: -pair[0])
+        return merged
+    
+    @classmethod
+    def get(cls, version):
+        """Return the rates of a published version"""
+        if version in cls._versions:
+            return cls._versions[version]
+        
+        table = CostTable.query.filter_by(version=version).first()
+        if not table:
+            raise ValueError(f"Cost table version {version} does not exist")
+        
+        rates = cls.validate_rates(table.rates_dict)
+        with cls._lock:
+            cls._versions[version] = rates
+        return rates
+    
+    @classmethod
+    def active(cls):
+        """Return (version, rates) of the active cost table"""
+        cached = cls._active
+        if cached and time.monotonic() - cached[2] < cls.ACTIVE_TTL_SECONDS:
+            return cached[0], cached[1]
+        
+        version = db.session.query(CostTable.version).filter_by(is_active=True).scalar()
+        if version is None:
+            # No table published yet - fall back to the built-in rates
+            version, rates = 0, cls.validate_rates({})
+        else:
+            rates = cls.get(version)
+        
+        with cls._lock:
+            cls._active = (version, rates, time.monotonic())
+        return version, rates
+    
+    @classmethod
+    def resolve(cls, version=None):
+        """Return (version, rates) for an explicit version or the active table"""
+        if version:
+            return version, cls.get(version)
+        return cls.active()
+    
+    @classmethod
+    def publish(cls, rates, label=None, notes=None, user_id=None):
+        """Publish a new cost table version and make it active"""
+        merged = cls.validate_rates(rates)
+        next_version = (db.session.query(db.func.max(CostTable.version)).scalar() or 0) + 1
+        
+        CostTable.query.filter_by(is_active=True).update({'is_active': False})
+        table = CostTable(
+            version=next_version,
+            label=label or f"Cost table v{next_version}",
+            rates=json.dumps(merged),
+            is_active=True,
+            notes=notes,
+            created_by=user_id
+        )
+        db.session.add(table)
+        db.session.commit()
         
-        if room_volume < required_volume:
-            volume_deficit = required_volume - room_volume
-            base_cost += volume_deficit * 20000  # Cost per cubic meter expansion
+        with cls._lock:
+            cls._versions[next_version] = merged
+            cls._active = None
         
-        # Height modifications
-        height_diff = max(0, scanner.min_room_height - site_spec.room_height)
-        if height_diff > 0:
-            base_cost += height_diff * 12000
+        logger.info(f"Cost table v{next_version} published and activated")
+        return table
+    
+    @classmethod
+    def ensure_default(cls):
+        """Seed version 1 from the built-in rates on a fresh database"""
+        if not CostTable.query.first():
+            cls.publish({}, label='Baseline rates', notes='Seeded from the built-in cost model')
+
+class CostModel:
+    """Deterministic cost model evaluated over numpy column arrays"""
+    
+    ADDITIVE = ('base', 'dimensions', 'power', 'hvac', 'floor_load', 'shielding', 'neuviz_extras')
+    MULTIPLIERS = ('score_band', 'status', 'scope')
+    
+    @staticmethod
+    def site_inputs(site_spec, ai_response, score, status):
+        """Build single-row model inputs from a site specification"""
+        scanner = site_spec.catalog_scanner
+        response_lower = (ai_response or '').lower()
+        extensive = 'extensive' in response_lower or 'major renovation' in response_lower
         
-        # Electrical infrastructure
-        if site_spec.available_power != scanner.required_power:
-            base_cost += 25000  # Electrical system upgrade
+        return CostModel.build_inputs(
+            room_length=[site_spec.room_length],
+            room_width=[site_spec.room_width],
+            room_height=[site_spec.room_height],
+            min_room_length=[scanner.min_room_length],
+            min_room_width=[scanner.min_room_width],
+            min_room_height=[scanner.min_room_height],
+            power_match=ElectricalEngine.power_match([site_spec.available_power], [scanner.required_power]),
+            has_hvac=[site_spec.has_hvac],
+            is_neuviz=[scanner.is_neuviz],
+            floor_adequate=StructuralEngine.evaluate([scanner.weight], [scanner.dimensions],
+                                                     [site_spec.floor_load_capacity], [site_spec.floor_type])['adequate'],
+            existing_shielding=[site_spec.existing_shielding],
+            score=[score],
+            status=[status],
+            extensive=[extensive],
+            minimal=[not extensive and ('minimal' in response_lower or 'simple changes' in response_lower)],
+            shielding_lead_m2_mm=[None if site_spec.existing_shielding
+                                  else ShieldingCalculator.for_site_spec(site_spec)['lead_m2_mm']]
+        )
+    
+    @staticmethod
+    def build_inputs(**columns):
+        """Coerce column lists to typed arrays (None becomes NaN / False)"""
+        float_fields = ('room_length', 'room_width', 'room_height', 'min_room_length', 'min_room_width',
+                        'min_room_height', 'score')
+        bool_fields = ('power_match', 'has_hvac', 'is_neuviz', 'floor_adequate', 'existing_shielding',
+                       'extensive', 'minimal')
+        
+        inputs = {}
+        for name in float_fields:
+            inputs[name] = np.array(columns[name], dtype=float)
+        # Optional engine outputs; NaN falls back to the flat rates
+        inputs['shielding_lead_m2_mm'] = np.array(
+            columns.get('shielding_lead_m2_mm', [None] * len(columns['score'])), dtype=float)
+        for name in bool_fields:
+            inputs[name] = np.array([bool(v) for v in columns[name]], dtype=bool)
+        inputs['status'] = np.array(columns['status'], dtype=object)
+        return inputs
+    
+    @staticmethod
+    def components(inputs, rates):
+        """Additive cost items and multipliers, one array per factor"""
+        has_hvac, is_neuviz = inputs['has_hvac'], inputs['is_neuviz']
+        
+        # Room modifications
+        room_volume = inputs['room_length'] * inputs['room_width'] * inputs['room_height']
+        required_volume = inputs['min_room_length'] * inputs['min_room_width'] * inputs['min_room_height']
+        height_diff = np.maximum(0, np.nan_to_num(inputs['min_room_height'] - inputs['room_height']))
+        dimensions = (np.where(room_volume < required_volume,
+                               (required_volume - room_volume) * rates['volume_expansion_per_m3'], 0.0) +
+                      height_diff * rates['height_modification_per_m'])
         
         # HVAC systems
-        if not site_spec.has_hvac:
-            if scanner.is_neuviz:
-                base_cost += 45000  # Precision HVAC for NeuViz
-            else:
-                base_cost += 30000  # Standard medical HVAC
-        elif scanner.is_neuviz:
-            base_cost += 20000  # HVAC upgrade for precision control
+        hvac = np.select(
+            [~has_hvac & is_neuviz, ~has_hvac, is_neuviz],
+            [rates['hvac_new_neuviz'], rates['hvac_new_standard'], rates['hvac_upgrade_neuviz']],
+            default=0.0
+        )
         
-        # Floor reinforcement
-        if not site_spec.floor_load_capacity or site_spec.floor_load_capacity < (scanner.weight * 2):
-            base_cost += 18000
+        # Radiation shielding, priced from the calculated lead area when a per-mm rate is configured
+        lead = inputs['shielding_lead_m2_mm']
+        shielding = np.full(len(lead), float(rates['shielding_installation']))
+        if rates['shielding_lead_cost_per_m2_mm'] > 0:
+            shielding = np.where(np.isfinite(lead), lead * rates['shielding_lead_cost_per_m2_mm'], shielding)
         
         # NeuViz-specific costs
-        if scanner.is_neuviz:
-            base_cost += 12000  # Neusoft engineer
-            base_cost += 25000  # Enhanced grounding and precision systems
-            base_cost += 10000  # Specialized transport and installation
-            base_cost += 8000   # Environmental monitoring systems
-        
-        # Radiation shielding
-        if not site_spec.existing_shielding:
-            base_cost += 35000  # Comprehensive shielding installation
+        neuviz_extras = (rates['neuviz_engineer'] + rates['neuviz_grounding'] +
+                         rates['neuviz_transport'] + rates['neuviz_monitoring'])
         
         # Score-based cost adjustment
-        if score >= 85:
-            base_cost *= 0.6  # Minimal modifications
-        elif score >= 70:
-            base_cost *= 0.8  # Minor modifications
-        elif score >= 50:
-            base_cost *= 1.3  # Significant modifications
-        else:
-            base_cost *= 1.8  # Major overhaul
+        score = inputs['score']
+        score_band = np.select(
+            [score >= threshold for threshold, _ in rates['score_multipliers']],
+            [multiplier for _, multiplier in rates['score_multipliers']],
+            default=rates['score_multiplier_floor']
+        )
         
         # Status-based adjustment
-        status_multipliers = {
-            'CONFORMING': 0.5,
-            'REQUIRES_MODIFICATION': 1.0,
-            'NON_CONFORMING': 1.6
-        }
-        base_cost *= status_multipliers.get(status, 1.0)
+        status = np.ones(len(score))
+        for status_name, multiplier in rates['status_multipliers'].items():
+            status[inputs['status'] == status_name] = multiplier
         
         # AI response cost indicators
-        response_lower = ai_response.lower()
-        if 'extensive' in response_lower or 'major renovation' in response_lower:
-            base_cost *= 1.4
-        elif 'minimal' in response_lower or 'simple changes' in response_lower:
-            base_cost *= 0.7
+        scope = np.select([inputs['extensive'], inputs['minimal']],
+                          [rates['extensive_work_multiplier'], rates['minimal_work_multiplier']], default=1.0)
+        
+        return {
+            'base': np.full(len(score), float(rates['base_assessment'])),
+            'dimensions': dimensions,
+            'power': np.where(inputs['power_match'], 0.0, rates['electrical_upgrade']),
+            'hvac': hvac,
+            'floor_load': np.where(inputs['floor_adequate'], 0.0, rates['floor_reinforcement']),
+            'shielding': np.where(inputs['existing_shielding'], 0.0, shielding),
+            'neuviz_extras': np.where(is_neuviz, neuviz_extras, 0.0),
+            'score_band': score_band,
+            'status': status,
+            'scope': scope
+        }
+    
+    @staticmethod
+    def compute(inputs, rates):
+        """Return the estimated cost for every row of the inputs"""
+        parts = CostModel.components(inputs, rates)
+        cost = sum(parts[name] for name in CostModel.ADDITIVE)
+        for name in CostModel.MULTIPLIERS:
+            cost = cost * parts[name]
+        return np.round(cost, -2)  # Round to nearest hundred
+
+class ScoreModel:
+    """Deterministic conformity score contributions evaluated over numpy column arrays"""
+    
+    BASE_SCORE = 50
+    
+    @staticmethod
+    def contributions(inputs):
+        """Return {factor: (passed, score_delta)} for every row of the inputs"""
+        room_volume = inputs['room_length'] * inputs['room_width'] * inputs['room_height']
+        required_volume = inputs['min_room_length'] * inputs['min_room_width'] * inputs['min_room_height']
+        floor_adequate = inputs['floor_adequate']
+        
+        return {
+            # Dimensional compliance
+            'dimensions': (room_volume >= required_volume,
+                           np.select([room_volume >= required_volume * 1.2, room_volume >= required_volume],
+                                     [20, 15], default=-20)),
+            # Power compatibility
+            'power': (inputs['power_match'], np.where(inputs['power_match'], 15, -10)),
+            # HVAC availability
+            'hvac': (inputs['has_hvac'], np.where(inputs['has_hvac'], 10, -15)),
+            # Floor capacity
+            'floor_load': (floor_adequate, np.where(floor_adequate, 10, 0))
+        }
+    
+    @staticmethod
+    def compute(inputs):
+        """Return (raw score, status-adjusted score) for every row of the inputs"""
+        raw = ScoreModel.BASE_SCORE + sum(delta for _, delta in ScoreModel.contributions(inputs).values())
+        
+        # Status-based adjustment
+        status = inputs['status']
+        adjusted = np.where(status == 'CONFORMING', np.maximum(raw, 85), raw)
+        adjusted = np.where(status == 'NON_CONFORMING', np.minimum(adjusted, 50), adjusted)
+        return raw, np.clip(adjusted, 0, 100)
+
+class FactorBreakdown:
+    """Normalized per-factor score and cost contributions persisted for indexed filtering"""
+    
+    FACTORS = ('dimensions', 'power', 'hvac', 'floor_load', 'shielding', 'neuviz_extras',
+               'score_band', 'status', 'scope')
+    
+    FACTOR_LABELS = {
+        'dimensions': 'Room Dimensions',
+        'power': 'Electrical Power',
+        'hvac': 'HVAC',
+        'floor_load': 'Floor Load',
+        'shielding': 'Radiation Shielding',
+        'neuviz_extras': 'NeuViz Requirements',
+        'score_band': 'Score Band Multiplier',
+        'status': 'Status / Assessment Adjustment',
+        'scope': 'Scope Multiplier'
+    }
+    
+    @staticmethod
+    def compute(inputs, rates):
+        """Return {factor: {passed, score_delta, cost_delta, multiplier}} arrays"""
+        n = len(inputs['score'])
+        parts = CostModel.components(inputs, rates)
+        scores = ScoreModel.contributions(inputs)
+        raw_score, adjusted_score = ScoreModel.compute(inputs)
+        none = np.full(n, None, dtype=object)
+        zeros = np.zeros(n)
+        
+        dimensions_passed, dimensions_score = scores['dimensions']
+        breakdown = {
+            'dimensions': {'passed': dimensions_passed & (inputs['room_height'] >= inputs['min_room_height']),
+                           'score_delta': dimensions_score, 'cost_delta': parts['dimensions'], 'multiplier': none},
+            'power': {'passed': scores['power'][0], 'score_delta': scores['power'][1],
+                      'cost_delta': parts['power'], 'multiplier': none},
+            'hvac': {'passed': scores['hvac'][0], 'score_delta': scores['hvac'][1],
+                     'cost_delta': parts['hvac'], 'multiplier': none},
+            'floor_load': {'passed': scores['floor_load'][0], 'score_delta': scores['floor_load'][1],
+                           'cost_delta': parts['floor_load'], 'multiplier': none}
+        }
+        breakdown['shielding'] = {'passed': inputs['existing_shielding'], 'score_delta': zeros,
+                                  'cost_delta': parts['shielding'], 'multiplier': none}
+        breakdown['neuviz_extras'] = {'passed': none, 'score_delta': zeros,
+                                      'cost_delta': parts['neuviz_extras'], 'multiplier': none}
+        breakdown['score_band'] = {'passed': none, 'score_delta': zeros,
+                                   'cost_delta': zeros, 'multiplier': parts['score_band']}
+        # The persisted score may be the AI-extracted one; the status row carries whatever separates it
+        # from the deterministic factors, so BASE_SCORE plus every score_delta equals conformity_score
+        persisted = np.where(np.isnan(inputs['score']), adjusted_score, inputs['score'])
+        breakdown['status'] = {'passed': none, 'score_delta': persisted - raw_score,
+                               'cost_delta': zeros, 'multiplier': parts['status']}
+        breakdown['scope'] = {'passed': none, 'score_delta': zeros,
+                              'cost_delta': zeros, 'multiplier': parts['scope']}
+        return breakdown
+    
+    @staticmethod
+    def to_mappings(report_ids, breakdown):
+        """Flatten breakdown arrays into ReportFactor insert mappings"""
+        mappings = []
+        for factor in FactorBreakdown.FACTORS:
+            values = breakdown[factor]
+            for i, report_id in enumerate(report_ids):
+                passed = values['passed'][i]
+                multiplier = values['multiplier'][i]
+                mappings.append({
+                    'report_id': int(report_id),
+                    'factor': factor,
+                    'passed': None if passed is None else bool(passed),
+                    'score_delta': float(values['score_delta'][i]),
+                    'cost_delta': round(float(values['cost_delta'][i]), 2),
+                    'multiplier': None if multiplier is None else float(multiplier)
+                })
+        return mappings
+    
+    @staticmethod
+    def replace(report_ids, breakdown):
+        """Replace the stored breakdown rows of the given reports (caller commits)"""
+        ids = [int(i) for i in report_ids]
+        if not ids:
+            return
+        ReportFactor.query.filter(ReportFactor.report_id.in_(ids)).delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(ReportFactor, FactorBreakdown.to_mappings(ids, breakdown))
+    
+    @staticmethod
+    def store_for_report(report, rates=None):
+        """Persist the breakdown of a single report"""
+        if rates is None:
+            _, rates = CostTableStore.resolve(report.cost_table_version)
+        inputs = CostModel.site_inputs(report.site_specification, report.ai_analysis,
+                                       report.conformity_score, report.overall_status)
+        FactorBreakdown.replace([report.id], FactorBreakdown.compute(inputs, rates))
+    
+    @staticmethod
+    def failing_reports_query(factor, only=False):
+        """Report ids failing on a factor (optionally on that factor alone)"""
+        query = db.session.query(ReportFactor.report_id).filter(
+            ReportFactor.factor == factor, ReportFactor.passed == db.false())
+        if only:
+            other = db.aliased(ReportFactor)
+            other_failures = db.session.query(other.report_id).filter(
+                other.factor != factor, other.passed == db.false())
+            query = query.filter(~ReportFactor.report_id.in_(other_failures))
+        return query
+    
+    @staticmethod
+    def summary():
+        """Failure counts and average cost impact per factor"""
+        rows = db.session.query(
+            ReportFactor.factor,
+            db.func.sum(db.case((ReportFactor.passed == db.false(), 1), else_=0)),
+            db.func.count(ReportFactor.id),
+            db.func.avg(ReportFactor.cost_delta),
+            db.func.avg(ReportFactor.multiplier)
+        ).group_by(ReportFactor.factor).all()
+        
+        return {
+            factor: {
+                'label': FactorBreakdown.FACTOR_LABELS.get(factor, factor),
+                'failing': int(failing or 0),
+                'reports': int(total or 0),
+                'avg_cost_delta': round(float(avg_cost or 0), 2),
+                'avg_multiplier': round(float(avg_multiplier), 3) if avg_multiplier is not None else None
+            }
+            for factor, failing, total, avg_cost, avg_multiplier in rows
+        }
+
+class BulkRecostingJob:
+    """Re-cost every ConformityReport against a cost table in streamed chunks"""
+    
+    DEFAULT_CHUNK_SIZE = 2000
+    
+    _lock = threading.Lock()
+    _state = {'running': False, 'started_at': None, 'progress': 0, 'last_result': None, 'error': None}
+    
+    @staticmethod
+    def _chunk_query(last_id, chunk_size, scanner_model_id=None):
+        analysis_lower = db.func.lower(db.func.coalesce(ConformityReport.ai_analysis, ''))
+        extensive = db.or_(analysis_lower.like('%extensive%'), analysis_lower.like('%major renovation%'))
+        minimal = db.or_(analysis_lower.like('%minimal%'), analysis_lower.like('%simple changes%'))
+        
+        query = db.session.query(
+            ConformityReport.id,
+            ConformityReport.estimated_cost,
+            ConformityReport.cost_table_version,
+            ConformityReport.conformity_score,
+            ConformityReport.overall_status,
+            db.case((extensive, 1), else_=0),
+            db.case((minimal, 1), else_=0),
+            SiteSpecification.room_length,
+            SiteSpecification.room_width,
+            SiteSpecification.room_height,
+            SiteSpecification.available_power,
+            SiteSpecification.has_hvac,
+            SiteSpecification.floor_load_capacity,
+            SiteSpecification.floor_type,
+            SiteSpecification.existing_shielding,
+            ScannerModel.min_room_length,
+            ScannerModel.min_room_width,
+            ScannerModel.min_room_height,
+            ScannerModel.required_power,
+            ScannerModel.is_neuviz,
+            ScannerModel.weight,
+            ScannerModel.dimensions,
+            ScannerModel.radiation_shielding,
+            ScannerModel.environmental_specs,
+            ManualRoomEntry.patient_volume,
+            ManualRoomEntry.operating_hours
+        ).join(
+            SiteSpecification, ConformityReport.site_specification_id == SiteSpecification.id
+        ).join(
+            ScannerModel, SiteSpecification.scanner_model_id == ScannerModel.id
+        ).outerjoin(
+            ManualRoomEntry, SiteSpecification.manual_room_id == ManualRoomEntry.id
+        ).filter(
+            ConformityReport.id > last_id
+        )
+        if scanner_model_id is not None:
+            query = query.filter(SiteSpecification.scanner_model_id == scanner_model_id)
+        return query.order_by(ConformityReport.id).limit(chunk_size).all()
+    
+    @staticmethod
+    def _rows_to_inputs(rows):
+        (ids, old_costs, old_versions, scores, statuses, extensive, minimal,
+         room_length, room_width, room_height, available_power, has_hvac, floor_load, floor_type,
+         existing_shielding, min_length, min_width, min_height, required_power, is_neuviz, weight, dimensions,
+         radiation_shielding, environmental_specs, patient_volume, operating_hours) = zip(*rows)
+        
+        barriers = ShieldingCalculator.compute_batch(
+            room_length, room_width, room_height,
+            [ShieldingCalculator.weekly_patients(p, h) for p, h in zip(patient_volume, operating_hours)],
+            [ShieldingCalculator.parse_kvp(r, e) for r, e in zip(radiation_shielding, environmental_specs)],
+            [ShieldingCalculator.parse_lead_equivalent(r) for r in radiation_shielding]
+        )
+        
+        inputs = CostModel.build_inputs(
+            room_length=room_length, room_width=room_width, room_height=room_height,
+            min_room_length=min_length, min_room_width=min_width, min_room_height=min_height,
+            power_match=ElectricalEngine.power_match(available_power, required_power),
+            has_hvac=has_hvac, is_neuviz=is_neuviz,
+            floor_adequate=StructuralEngine.evaluate(weight, dimensions, floor_load, floor_type)['adequate'],
+            existing_shielding=existing_shielding, score=scores, status=statuses,
+            extensive=extensive,
+            minimal=[m and not e for m, e in zip(minimal, extensive)],
+            shielding_lead_m2_mm=barriers['lead_m2_mm']
+        )
+        return np.array(ids), np.array(old_costs, dtype=float), old_versions, inputs
+    
+    @classmethod
+    def run(cls, version=None, chunk_size=None):
+        """Re-cost all reports; returns throughput statistics"""
+        chunk_size = chunk_size or cls.DEFAULT_CHUNK_SIZE
+        version, rates = CostTableStore.resolve(version)
+        
+        started = time.perf_counter()
+        processed = updated = chunks = 0
+        last_id = 0
+        
+        while True:
+            rows = cls._chunk_query(last_id, chunk_size)
+            if not rows:
+                break
+            
+            ids, old_costs, old_versions, inputs = cls._rows_to_inputs(rows)
+            new_costs = CostModel.compute(inputs, rates)
+            
+            changed = ~np.isclose(new_costs, old_costs) | np.array([v != version for v in old_versions])
+            now = datetime.utcnow()
+            mappings = [
+                {'id': int(report_id), 'estimated_cost': float(cost), 'cost_table_version': version, 'updated_at': now}
+                for report_id, cost in zip(ids[changed], new_costs[changed])
+            ]
+            if mappings:
+                db.session.bulk_update_mappings(ConformityReport, mappings)
+            
+            # Refresh the factor breakdown of re-costed reports and backfill missing ones
+            with_breakdown = [r for (r,) in db.session.query(ReportFactor.report_id).filter(
+                ReportFactor.report_id.between(int(ids[0]), int(ids[-1]))).distinct()]
+            stale = changed | ~np.isin(ids, with_breakdown)
+            if stale.any():
+                subset = {name: column[stale] for name, column in inputs.items()}
+                FactorBreakdown.replace(ids[stale], FactorBreakdown.compute(subset, rates))
+            db.session.commit()
+            
+            processed += len(rows)
+            updated += len(mappings)
+            chunks += 1
+            last_id = int(ids[-1])
+            cls._state['progress'] = processed
+        
+        elapsed = time.perf_counter() - started
+        result = {
+            'cost_table_version': version,
+            'processed': processed,
+            'updated': updated,
+            'chunks': chunks,
+            'chunk_size': chunk_size,
+            'elapsed_seconds': round(elapsed, 3),
+            'reports_per_second': round(processed / elapsed, 1) if elapsed > 0 else None
+        }
+        logger.info(f"Bulk re-costing v{version}: {processed} reports ({updated} updated) in "
+                    f"{elapsed:.2f}s - {result['reports_per_second']} reports/s")
+        return result
+    
+    @classmethod
+    def start_async(cls, version=None, chunk_size=None):
+        """Run the job in a background thread; returns False if one is already running"""
+        with cls._lock:
+            if cls._state['running']:
+                return False
+            cls._state.update({'running': True, 'started_at': datetime.utcnow().isoformat(),
+                               'progress': 0, 'error': None})
+        
+        def run_job():
+            with app.app_context():
+                try:
+                    cls._state['last_result'] = cls.run(version, chunk_size)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Bulk re-costing failed: {e}")
+                    cls._state['error'] = str(e)
+                finally:
+                    cls._state['running'] = False
+        
+        threading.Thread(target=run_job, daemon=True).start()
+        return True
+    
+    @classmethod
+    def status(cls):
+        return dict(cls._state)
+
+class ScannerImpactJob:
+    """Re-score the reports that depend on a scanner model after its catalog entry changes"""
+    
+    # ScannerModel columns that feed the deterministic score, cost or breakdown
+    SCORING_FIELDS = ('min_room_length', 'min_room_width', 'min_room_height', 'required_power',
+                      'weight', 'dimensions', 'is_neuviz', 'radiation_shielding', 'environmental_specs')
+    STATUSES = ('CONFORMING', 'REQUIRES_MODIFICATION', 'NON_CONFORMING')
+    CONFORMING_SCORE = 85
+    NON_CONFORMING_SCORE = 50
+    
+    _lock = threading.Lock()
+    _state = {'running': [], 'last_results': {}, 'errors': {}}
+    
+    @staticmethod
+    def changed_fields(scanner):
+        """Scoring fields with pending changes on a ScannerModel instance"""
+        state = db.inspect(scanner)
+        return [f for f in ScannerImpactJob.SCORING_FIELDS if state.attrs[f].history.has_changes()]
+    
+    @staticmethod
+    def dependents(scanner_model_id):
+        """Reverse dependency index: scanner -> site specifications -> reports"""
+        rows = db.session.query(SiteSpecification.id, ConformityReport.id).outerjoin(
+            ConformityReport, ConformityReport.site_specification_id == SiteSpecification.id
+        ).filter(SiteSpecification.scanner_model_id == scanner_model_id).all()
+        
+        site_specs = sorted({spec_id for spec_id, _ in rows})
+        reports = sorted(report_id for _, report_id in rows if report_id is not None)
+        return {'scanner_model_id': scanner_model_id, 'site_specification_ids': site_specs, 'report_ids': reports}
+    
+    @classmethod
+    def deterministic_status(cls, raw_scores):
+        """Map raw ScoreModel scores onto the report status bands"""
+        return np.where(raw_scores >= cls.CONFORMING_SCORE, 'CONFORMING',
+                        np.where(raw_scores <= cls.NON_CONFORMING_SCORE, 'NON_CONFORMING', 'REQUIRES_MODIFICATION'))
+    
+    @classmethod
+    def seed(cls, report):
+        """Record the deterministic score/status a new report starts from (the baseline for flip detection)"""
+        inputs = CostModel.site_inputs(report.site_specification, report.ai_analysis,
+                                       report.conformity_score, report.overall_status)
+        raw_scores, _ = ScoreModel.compute(inputs)
+        report.deterministic_score = float(raw_scores[0])
+        report.deterministic_status = str(cls.deterministic_status(raw_scores)[0])
+    
+    @classmethod
+    def run(cls, scanner_model_id, chunk_size=None):
+        """Re-score affected reports; returns rows touched, status flips and timing"""
+        chunk_size = chunk_size or BulkRecostingJob.DEFAULT_CHUNK_SIZE
+        started = time.perf_counter()
+        processed = rows_touched = 0
+        flipped_ids = []
+        last_id = 0
+        
+        while True:
+            rows = BulkRecostingJob._chunk_query(last_id, chunk_size, scanner_model_id)
+            if not rows:
+                break
+            
+            ids, old_costs, versions, inputs = BulkRecostingJob._rows_to_inputs(rows)
+            raw_scores, _ = ScoreModel.compute(inputs)
+            new_status = cls.deterministic_status(raw_scores)
+            previous = {report_id: (status, updated_at) for report_id, status, updated_at in db.session.query(
+                ConformityReport.id, ConformityReport.deterministic_status, ConformityReport.updated_at
+            ).filter(ConformityReport.id.in_([int(i) for i in ids]))}
+            
+            # Reports keep the cost table they were priced with; unversioned ones are priced with (and now
+            # record) the active table
+            costs = np.zeros(len(ids))
+            priced_with = list(versions)
+            for version in set(versions):
+                mask = np.array([v == version for v in versions])
+                resolved, rates = CostTableStore.resolve(version)
+                for i in np.flatnonzero(mask):
+                    priced_with[i] = resolved
+                subset = {name: column[mask] for name, column in inputs.items()}
+                costs[mask] = CostModel.compute(subset, rates)
+                FactorBreakdown.replace(ids[mask], FactorBreakdown.compute(subset, rates))
+                rows_touched += int(mask.sum()) * len(FactorBreakdown.FACTORS)
+            
+            now = datetime.utcnow()
+            mappings = []
+            for i, report_id in enumerate(ids):
+                mapping = {
+                    'id': int(report_id),
+                    'deterministic_score': float(raw_scores[i]),
+                    'deterministic_status': str(new_status[i]),
+                    'rescored_at': now
+                }
+                baseline, updated_at = previous[int(report_id)]
+                if versions[i] != priced_with[i]:
+                    mapping['cost_table_version'] = priced_with[i]
+                if not np.isclose(costs[i], old_costs[i]):
+                    mapping['estimated_cost'] = float(costs[i])
+                # Only a real price change bumps updated_at; passing the stored value keeps onupdate off it
+                changed = 'cost_table_version' in mapping or 'estimated_cost' in mapping
+                mapping['updated_at'] = now if changed else updated_at
+                # Reports without a recorded baseline only get one; a raised flag stays until acknowledged
+                if baseline in cls.STATUSES and baseline != new_status[i]:
+                    mapping['status_flipped'] = True
+                    flipped_ids.append(int(report_id))
+                mappings.append(mapping)
+            db.session.bulk_update_mappings(ConformityReport, mappings)
+            db.session.commit()
+            
+            processed += len(rows)
+            rows_touched += len(mappings)
+            last_id = int(ids[-1])
+        
+        elapsed = time.perf_counter() - started
+        result = {
+            'scanner_model_id': scanner_model_id,
+            'reports_rescored': processed,
+            'rows_touched': rows_touched,
+            'status_flips': len(flipped_ids),
+            'flipped_report_ids': flipped_ids[:100],
+            'elapsed_seconds': round(elapsed, 3),
+            'finished_at': datetime.utcnow().isoformat()
+        }
+        logger.info(f"Scanner {scanner_model_id} impact: {processed} reports re-scored, {len(flipped_ids)} status flips, "
+                    f"{rows_touched} rows touched in {elapsed:.2f}s")
+        return result
+    
+    @classmethod
+    def start_async(cls, scanner_model_id, chunk_size=None):
+        """Run the re-scoring in a background thread; returns False if this scanner is already queued"""
+        with cls._lock:
+            if scanner_model_id in cls._state['running']:
+                return False
+            cls._state['running'].append(scanner_model_id)
+            cls._state['errors'].pop(scanner_model_id, None)
+        
+        def run_job():
+            with app.app_context():
+                try:
+                    cls._state['last_results'][scanner_model_id] = cls.run(scanner_model_id, chunk_size)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Scanner {scanner_model_id} impact re-scoring failed: {e}")
+                    cls._state['errors'][scanner_model_id] = str(e)
+                finally:
+                    with cls._lock:
+                        cls._state['running'].remove(scanner_model_id)
+        
+        threading.Thread(target=run_job, daemon=True).start()
+        return True
+    
+    @classmethod
+    def status(cls, scanner_model_id):
+        return {
+            'running': scanner_model_id in cls._state['running'],
+            'last_result': cls._state['last_results'].get(scanner_model_id),
+            'error': cls._state['errors'].get(scanner_model_id)
+        }
+
+# ===== SCANNER RECOMMENDATION =====
+
+class ScannerRecommender:
+    """Budget-aware top-k scanner ranking for a room, scored over the whole catalog in one pass"""
+    
+    WEIGHTS = {'fit': 0.35, 'modification': 0.25, 'price': 0.25, 'complexity': 0.15}
+    FIT_MARGIN_TARGET = 0.2         # 20% headroom on the tightest dimension scores full marks
+    COMPLEXITY_SCORES = {'Low': 1, 'Medium': 2, 'High': 3}
+    DIMENSION_NAMES = ('length', 'width', 'height')
+    
+    _lock = threading.Lock()
+    _catalog = {'version': None, 'columns': None}
+    
+    @classmethod
+    def catalog_columns(cls):
+        """Parsed catalog arrays, rebuilt only when the catalog snapshot version changes"""
+        snapshot = ScannerCatalog.current()
+        cached = cls._catalog
+        if cached['version'] == snapshot.version:
+            return cached['columns']
+        
+        scanners = snapshot.scanners
+        length, width, _ = (np.array(v, dtype=float) for v in
+                            zip(*[SpecParser.dimensions(s.dimensions) for s in scanners])) if scanners else ([], [], [])
+        voltage, phases, _ = ElectricalEngine.parse_many([s.required_power for s in scanners])
+        
+        columns = {
+            'id': np.array([s.id for s in scanners], dtype=int),
+            'label': [f"{s.manufacturer} {s.model_name}" for s in scanners],
+            'min_dimensions': np.array([[s.min_room_length, s.min_room_width, s.min_room_height] for s in scanners],
+                                       dtype=float).reshape(-1, 3),
+            'required_power': [s.required_power for s in scanners],
+            'voltage': voltage,
+            'phases': phases,
+            'weight': np.array([s.weight for s in scanners], dtype=float),
+            'length': np.asarray(length, dtype=float),
+            'width': np.asarray(width, dtype=float),
+            'is_neuviz': np.array([bool(s.is_neuviz) for s in scanners], dtype=bool),
+            'price_min': np.array([s.price_range_min for s in scanners], dtype=float),
+            'price_max': np.array([s.price_range_max for s in scanners], dtype=float),
+            'complexity': np.array([cls.COMPLEXITY_SCORES.get(s.installation_complexity, 2) for s in scanners],
+                                   dtype=float),
+            'complexity_label': [s.installation_complexity or 'Medium' for s in scanners],
+            'kvp': np.array([ShieldingCalculator.parse_kvp(s.radiation_shielding, s.environmental_specs)
+                             for s in scanners], dtype=float),
+            'spec_lead_mm': np.array([ShieldingCalculator.parse_lead_equivalent(s.radiation_shielding)
+                                      for s in scanners], dtype=float)
+        }
+        with cls._lock:
+            cls._catalog = {'version': snapshot.version, 'columns': columns}
+        return columns
+    
+    @classmethod
+    def score(cls, room, budget, catalog, rates):
+        """Component scores (0-1) and supporting arrays for every catalog scanner"""
+        n = len(catalog['id'])
+        room_dimensions = np.array([room.room_length, room.room_width, room.room_height], dtype=float)
+        
+        # Fit margin on the tightest dimension
+        with np.errstate(invalid='ignore', divide='ignore'):
+            margins = room_dimensions / catalog['min_dimensions'] - 1
+        margins = np.nan_to_num(margins, nan=-1.0)
+        tightest = margins.argmin(axis=1)
+        fit_margin = margins[np.arange(n), tightest]
+        
+        site_v, site_ph, _ = ElectricalEngine.parse_many([room.available_power])
+        power_match = ElectricalEngine.compatible(site_v, site_ph, catalog['voltage'], catalog['phases'],
+                                                  [room.available_power], catalog['required_power'])
+        depth, weak = StructuralEngine.floor_properties([room.floor_type])
+        floor_adequate = StructuralEngine._evaluate(
+            catalog['weight'], catalog['length'], catalog['width'],
+            np.array([room.floor_load_capacity], dtype=float), depth, weak)['adequate']
+        
+        if room.existing_shielding:
+            lead_m2_mm = np.full(n, np.nan)
+        else:
+            weekly = ShieldingCalculator.weekly_patients(room.patient_volume, room.operating_hours)
+            lead_m2_mm = ShieldingCalculator.compute_batch(
+                np.full(n, room.room_length), np.full(n, room.room_width), np.full(n, room.room_height),
+                np.full(n, weekly), catalog['kvp'], catalog['spec_lead_mm'])['lead_m2_mm']
+        
+        # Site modification cost from the deterministic cost model
+        inputs = CostModel.build_inputs(
+            room_length=np.full(n, room.room_length), room_width=np.full(n, room.room_width),
+            room_height=np.full(n, room.room_height),
+            min_room_length=catalog['min_dimensions'][:, 0], min_room_width=catalog['min_dimensions'][:, 1],
+            min_room_height=catalog['min_dimensions'][:, 2],
+            power_match=power_match, has_hvac=np.full(n, bool(room.has_hvac)), is_neuviz=catalog['is_neuviz'],
+            floor_adequate=floor_adequate, existing_shielding=np.full(n, bool(room.existing_shielding)),
+            score=np.full(n, np.nan), status=np.full(n, None, dtype=object),
+            extensive=np.zeros(n, dtype=bool), minimal=np.zeros(n, dtype=bool),
+            shielding_lead_m2_mm=lead_m2_mm
+        )
+        inputs['score'] = ScoreModel.compute(inputs)[0].astype(float)
+        modification_cost = CostModel.compute(inputs, rates)
+        
+        # Price overlap with what is left of the budget after site modifications
+        price_min, price_max = catalog['price_min'], catalog['price_max']
+        priced = np.isfinite(price_min) & np.isfinite(price_max)
+        if budget:
+            remaining = budget - modification_cost
+            with np.errstate(invalid='ignore', divide='ignore'):
+                overlap = np.where(price_max > price_min, (remaining - price_min) / (price_max - price_min),
+                                   (remaining >= price_min).astype(float))
+            price = np.where(priced, np.clip(overlap, 0, 1), 0.5)
+            modification = 1 - np.clip(modification_cost / budget, 0, 1)
+        else:
+            remaining = np.full(n, np.nan)
+            price = np.full(n, 0.5)
+            modification = 1 - modification_cost / max(float(modification_cost.max()), 1.0)
+        
+        components = {
+            'fit': np.clip((fit_margin + cls.FIT_MARGIN_TARGET) / (2 * cls.FIT_MARGIN_TARGET), 0, 1),
+            'modification': modification,
+            'price': price,
+            'complexity': (3 - catalog['complexity']) / 2
+        }
+        total = sum(cls.WEIGHTS[name] * values for name, values in components.items())
+        return total, components, {
+            'fit_margin': fit_margin,
+            'tightest': tightest,
+            'power_match': power_match,
+            'floor_adequate': floor_adequate,
+            'modification_cost': modification_cost,
+            'remaining_budget': remaining,
+            'priced': priced
+        }
+    
+    @classmethod
+    def explain(cls, catalog, details, i, budget):
+        """Human-readable reasons behind one scanner's ranking"""
+        margin = details['fit_margin'][i]
+        dimension = cls.DIMENSION_NAMES[details['tightest'][i]]
+        reasons = [
+            f"Room exceeds the minimum {dimension} by {margin * 100:.0f}%" if margin >= 0
+            else f"Room is {-margin * 100:.0f}% short of the minimum {dimension}",
+            'Available power is compatible' if details['power_match'][i] else 'Electrical upgrade required',
+            'Floor load is adequate' if details['floor_adequate'][i] else 'Floor reinforcement required',
+            f"Estimated site modification ${details['modification_cost'][i]:,.0f}"
+        ]
+        if not details['priced'][i]:
+            reasons.append('No catalog price - contact manufacturer')
+        elif budget:
+            remaining = details['remaining_budget'][i]
+            price_range = f"${catalog['price_min'][i]:,.0f} - ${catalog['price_max'][i]:,.0f}"
+            if remaining >= catalog['price_max'][i]:
+                reasons.append(f"Price {price_range} fits the ${remaining:,.0f} left after modifications")
+            elif remaining >= catalog['price_min'][i]:
+                reasons.append(f"Price {price_range} partly fits the ${remaining:,.0f} left after modifications")
+            else:
+                reasons.append(f"Price {price_range} exceeds the ${max(remaining, 0):,.0f} left after modifications")
+        reasons.append(f"{catalog['complexity_label'][i]} installation complexity")
+        return reasons
+    
+    @classmethod
+    def recommend(cls, room, budget=None, k=5):
+        """Top-k scanners for a room and budget with score components and explanations"""
+        started = time.perf_counter()
+        catalog = cls.catalog_columns()
+        version, rates = CostTableStore.active()
+        n = len(catalog['id'])
+        budget = budget if budget is not None else (room.project.budget if room.project else None)
+        
+        recommendations = []
+        if n:
+            total, components, details = cls.score(room, budget, catalog, rates)
+            k = max(1, min(k, n))
+            top = np.argpartition(-total, k - 1)[:k]
+            top = top[np.argsort(-total[top], kind='stable')]
+            
+            for i in top:
+                remaining = details['remaining_budget'][i]
+                recommendations.append({
+                    'scanner_id': int(catalog['id'][i]),
+                    'scanner': catalog['label'][i],
+                    'score': round(float(total[i]) * 100, 1),
+                    'components': {name: round(float(values[i]), 3) for name, values in components.items()},
+                    'fit_margin_pct': round(float(details['fit_margin'][i]) * 100, 1),
+                    'modification_cost': float(details['modification_cost'][i]),
+                    'within_budget': bool(remaining >= catalog['price_min'][i]) if budget and details['priced'][i] else None,
+                    'explanations': cls.explain(catalog, details, i, budget)
+                })
+        
+        return {
+            'room_id': room.id,
+            'budget': budget,
+            'cost_table_version': version,
+            'catalog_size': n,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+            'recommendations': recommendations
+        }
+
+class ScannerSimilarityIndex:
+    """In-memory normalized feature matrix for N-way comparison and nearest-neighbour search"""
+    
+    FEATURES = ('slice_count', 'weight', 'min_room_length', 'min_room_width', 'min_room_height',
+                'power_kw', 'heat_kw', 'price', 'complexity')
+    FEATURE_LABELS = {
+        'slice_count': 'Slices',
+        'weight': 'Weight (kg)',
+        'min_room_length': 'Min Room Length (m)',
+        'min_room_width': 'Min Room Width (m)',
+        'min_room_height': 'Min Room Height (m)',
+        'power_kw': 'Power (kW)',
+        'heat_kw': 'Heat Dissipation (kW)',
+        'price': 'Price (mid-range)',
+        'complexity': 'Installation Complexity'
+    }
+    HIGHER_IS_BETTER = ('slice_count',)
+    
+    _lock = threading.Lock()
+    _index = {'signature': None}
+    
+    @staticmethod
+    def raw_features(scanner):
+        """Comparable numbers for one scanner (None when unknown)"""
+        _, _, kva = SpecParser.power(scanner.required_power)
+        prices = [p for p in (scanner.price_range_min, scanner.price_range_max) if p]
+        return {
+            'slice_count': scanner.slice_count,
+            'weight': scanner.weight,
+            'min_room_length': scanner.min_room_length,
+            'min_room_width': scanner.min_room_width,
+            'min_room_height': scanner.min_room_height,
+            'power_kw': scanner.power_consumption or kva,
+            'heat_kw': scanner.heat_dissipation or SpecParser.cooling_kw(scanner.cooling_requirements),
+            'price': sum(prices) / len(prices) if prices else None,
+            'complexity': ScannerRecommender.COMPLEXITY_SCORES.get(scanner.installation_complexity, 2)
+        }
+    
+    @classmethod
+    def normalize(cls, raw):
+        """Catalog z-scores; unknown values sit at the catalog mean"""
+        known = np.isfinite(raw)
+        count = np.maximum(known.sum(axis=0), 1)
+        values = np.where(known, raw, 0.0)
+        mean = values.sum(axis=0) / count
+        std = np.sqrt((np.where(known, raw - mean, 0.0) ** 2).sum(axis=0) / count)
+        normalized = (values - mean) / np.where(std > 0, std, 1.0)
+        return np.where(known, normalized, 0.0)
+    
+    @classmethod
+    def rebuild(cls, snapshot=None):
+        """Recompute every feature vector for the current catalog and publish them in memory"""
+        snapshot = snapshot or ScannerCatalog.current()
+        scanners = snapshot.scanners
+        features = [cls.raw_features(s) for s in scanners]
+        raw = np.array([[f[name] for name in cls.FEATURES] for f in features], dtype=float).reshape(-1, len(cls.FEATURES))
+        cls._publish(snapshot.version, [s.id for s in scanners],
+                     [f"{s.manufacturer} {s.model_name}" for s in scanners], raw, cls.normalize(raw))
+        return cls._index
+    
+    @classmethod
+    def persist(cls):
+        """Store the current vectors; called from catalog write paths so read requests never write"""
+        index = cls.load()
+        now = datetime.utcnow()
+        ScannerFeatureVector.query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(ScannerFeatureVector, [
+            dict(scanner_model_id=int(scanner_id), catalog_signature=index['signature'], computed_at=now,
+                 normalized=json.dumps([round(float(v), 6) for v in index['normalized'][i]]),
+                 **{name: float(value) if np.isfinite(value) else None
+                    for name, value in zip(cls.FEATURES, index['raw'][i])})
+            for i, scanner_id in enumerate(index['ids'])
+        ])
+        db.session.commit()
+        logger.info(f"Scanner feature vectors stored for {len(index['ids'])} models")
+        return index
+    
+    @classmethod
+    def _publish(cls, key, ids, labels, raw, normalized):
+        with cls._lock:
+            cls._index = {
+                'signature': key,
+                'ids': np.array(ids, dtype=int),
+                'labels': labels,
+                'positions': {scanner_id: i for i, scanner_id in enumerate(ids)},
+                'raw': raw,
+                'normalized': normalized
+            }
+    
+    @classmethod
+    def load(cls):
+        """Current index: memory, then the stored table, then an in-memory rebuild"""
+        snapshot = ScannerCatalog.current()
+        key = snapshot.version
+        if cls._index['signature'] == key:
+            return cls._index
         
-        return round(base_cost, -2)  # Round to nearest hundred
+        rows = ScannerFeatureVector.query.order_by(ScannerFeatureVector.scanner_model_id).all()
+        if (rows and [v.scanner_model_id for v in rows] == [s.id for s in snapshot.scanners]
+                and all(v.catalog_signature == key for v in rows)):
+            raw = np.array([[getattr(v, name) for name in cls.FEATURES] for v in rows], dtype=float)
+            normalized = np.array([json.loads(v.normalized) for v in rows], dtype=float)
+            cls._publish(key, [s.id for s in snapshot.scanners],
+                         [f"{s.manufacturer} {s.model_name}" for s in snapshot.scanners], raw, normalized)
+            return cls._index
+        return cls.rebuild(snapshot)
     
     @staticmethod
-    def _calculate_project_timeline(site_spec, ai_response, score, status):
-        """Calculate comprehensive project timeline"""
-        scanner = site_spec.scanner_model
-        base_timeline = 45  # Enhanced base timeline
-        
-        # Score-based timeline
-        if score < 40:
-            base_timeline += 90  # Major reconstruction
-        elif score < 60:
-            base_timeline += 60  # Significant modifications
-        elif score < 80:
-            base_timeline += 30  # Moderate modifications
-        
-        # NeuViz additional coordination time
-        if scanner.is_neuviz:
-            base_timeline += 15  # Neusoft engineer coordination
-        
-        # System modifications
-        if not site_spec.has_hvac:
-            base_timeline += 25
-        
-        if site_spec.available_power != scanner.required_power:
-            base_timeline += 20
+    def _number(value, digits=2):
+        value = float(value)
+        return round(value, digits) if np.isfinite(value) else None
+    
+    @classmethod
+    def compare(cls, scanner_ids):
+        """N-way feature table, best value per feature and pairwise similarity matrix"""
+        index = cls.load()
+        missing = [i for i in scanner_ids if i not in index['positions']]
+        if missing:
+            raise ValueError(f"Unknown scanner ids: {missing}")
         
-        if not site_spec.existing_shielding:
-            base_timeline += 30
+        rows = np.array([index['positions'][i] for i in scanner_ids], dtype=int)
+        raw, vectors = index['raw'][rows], index['normalized'][rows]
+        distance = np.sqrt(((vectors[:, None, :] - vectors[None, :, :]) ** 2).sum(axis=2))
         
-        # Regulatory timeline
-        base_timeline += 20  # Permits and approvals
+        features = []
+        for j, name in enumerate(cls.FEATURES):
+            column = raw[:, j]
+            best = None
+            if np.isfinite(column).any():
+                pick = np.nanargmax(column) if name in cls.HIGHER_IS_BETTER else np.nanargmin(column)
+                best = int(scanner_ids[pick])
+            features.append({
+                'feature': name,
+                'label': cls.FEATURE_LABELS[name],
+                'values': [cls._number(v) for v in column],
+                'best_scanner_id': best
+            })
         
-        return base_timeline
+        return {
+            'scanners': [{'scanner_id': int(i), 'scanner': index['labels'][r]} for i, r in zip(scanner_ids, rows)],
+            'features': features,
+            'similarity': np.round(1 / (1 + distance), 3).tolist()
+        }
     
-    @staticmethod
-    def _extract_comprehensive_recommendations(ai_response):
-        """Extract detailed recommendations from AI response"""
-        lines = ai_response.split('\n')
-        recommendations = []
-        
-        # Look for recommendation sections
-        in_recommendations = False
-        recommendation_keywords = [
-            'recommendation', 'action', 'required', 'should', 'must',
-            'immediate', 'infrastructure', 'regulatory', 'cost optimization'
-        ]
+    @classmethod
+    def similar(cls, scanner_id, k=5):
+        """Nearest catalog neighbours of a scanner with the features that differ most"""
+        index = cls.load()
+        if scanner_id not in index['positions']:
+            raise ValueError(f"Unknown scanner id: {scanner_id}")
         
-        for line in lines:
-            line_clean = line.strip()
-            line_lower = line_clean.lower()
-            
-            # Detect recommendation sections
-            if any(keyword in line_lower for keyword in recommendation_keywords):
-                if ':' in line_clean or line_clean.endswith(':'):
-                    in_recommendations = True
-                    continue
-            
-            # Extract recommendation items
-            if in_recommendations and line_clean:
-                if line_clean.startswith(('*', '-', '•', '1.', '2.', '3.')):
-                    recommendations.append(line_clean.lstrip('*-•123456789. '))
-                elif line_clean.startswith('**') and line_clean.endswith('**'):
-                    in_recommendations = False  # End of section
-                elif any(keyword in line_lower for keyword in ['immediate', 'priority', 'critical', 'must']):
-                    recommendations.append(line_clean)
+        target = index['positions'][scanner_id]
+        gaps = index['normalized'] - index['normalized'][target]
+        distance = np.sqrt((gaps ** 2).sum(axis=1))
+        distance[target] = np.inf
         
-        # Fallback: extract sentences with action words
-        if not recommendations:
-            action_words = ['should', 'must', 'recommend', 'install', 'upgrade', 'modify', 'ensure']
-            for line in lines:
-                if any(word in line.lower() for word in action_words):
-                    recommendations.append(line.strip())
+        k = min(k, len(distance) - 1)
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distance, k - 1)[:k]
+        nearest = nearest[np.argsort(distance[nearest], kind='stable')]
         
-        return '\n'.join(recommendations[:25]) if recommendations else 'Detailed recommendations provided in analysis above.'
+        results = []
+        for i in nearest:
+            differs = np.argsort(-np.abs(gaps[i]))[:2]
+            results.append({
+                'scanner_id': int(index['ids'][i]),
+                'scanner': index['labels'][i],
+                'similarity': round(float(1 / (1 + distance[i])), 3),
+                'differs_most_in': [cls.FEATURE_LABELS[cls.FEATURES[j]] for j in differs if abs(gaps[i, j]) > 0]
+            })
+        return results
 
 # ===== PROFESSIONAL TEMPLATE SYSTEM =====
 
@@ -1529,13 +3663,13 @@ def get_professional_base_template():
             </div>
         </div>
     </nav>
-
+    
     <!-- Main Content -->
     <main class="container-fluid py-4">
         <!-- CONTENT PLACEHOLDER -->
         {{ content|safe }}
     </main>
-
+    
     <!-- Professional Footer -->
     <footer class="promamec-footer">
         <div class="container">
@@ -1563,7 +3697,7 @@ def get_professional_base_template():
             </div>
         </div>
     </footer>
-
+    
     <!-- Professional JavaScript -->
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
     <script>
@@ -1697,12 +3831,12 @@ def index():
         </div>
     </div>
     '''
-    
+
 @app.route('/scanner-comparison')
 @login_required
 def scanner_comparison():
     """Professional scanner comparison tool - FIXED VERSION"""
-    scanners = ScannerModel.query.all()
+    scanners = ScannerCatalog.all()
     
     # Generate scanner table rows
     scanner_rows = []
@@ -1850,7 +3984,7 @@ def view_report(report_id):
                                         <table class="table table-sm">
                                             <tr><td><strong>Project:</strong></td><td>{report.project.name}</td></tr>
                                             <tr><td><strong>Site:</strong></td><td>{report.site_specification.site_name}</td></tr>
-                                            <tr><td><strong>Scanner:</strong></td><td>{report.site_specification.scanner_model.manufacturer} {report.site_specification.scanner_model.model_name}</td></tr>
+                                            <tr><td><strong>Scanner:</strong></td><td>{report.site_specification.catalog_scanner.manufacturer} {report.site_specification.catalog_scanner.model_name}</td></tr>
                                             <tr><td><strong>Generated:</strong></td><td>{report.created_at.strftime('%Y-%m-%d %H:%M UTC')}</td></tr>
                                         </table>
                                     </div>
@@ -1921,11 +4055,11 @@ def create_site_spec(room_id):
         return redirect(url_for('dashboard'))
     
     room = ManualRoomEntry.query.get_or_404(room_id)
-    scanners = ScannerModel.query.all()
+    scanners = ScannerCatalog.all()
     
     if request.method == 'POST':
         scanner_id = request.form.get('scanner_id')
-        scanner = ScannerModel.query.get(scanner_id)
+        scanner = ScannerCatalog.get(scanner_id)
         
         if not scanner:
             flash('Please select a valid scanner model.', 'error')
@@ -1956,10 +4090,17 @@ def create_site_spec(room_id):
             notes=room.notes
         )
         
+        placement = PlacementSolver.for_site_spec(site_spec)
+        site_spec.placement_layout = json.dumps(placement)
+        
         db.session.add(site_spec)
         db.session.commit()
         
         flash(f'Site specification created successfully for {scanner.manufacturer} {scanner.model_name}!', 'success')
+        if placement['feasible'] is False:
+            minimal = placement['minimal_room']
+            flash(f"No layout with full service clearances fits this room. "
+                  f"Minimum clear floor: {minimal['length']} m × {minimal['width']} m.", 'warning')
         return redirect(url_for('ai_analysis'))
     
     content = f'''
@@ -2064,6 +4205,52 @@ def analytics_dashboard():
         'Critical': ConformityReport.query.filter_by(risk_assessment='Critical').count()
     }
     
+    # Failing factor breakdown
+    factor_summary = FactorBreakdown.summary()
+    factor_rows = []
+    for factor in FactorBreakdown.FACTORS:
+        stats = factor_summary.get(factor)
+        if not stats or stats['failing'] == 0:
+            continue
+        factor_rows.append(f"""
+        <tr>
+            <td>{stats['label']}</td>
+            <td><a href="/analytics-dashboard?failing={factor}">{stats['failing']}</a></td>
+            <td><a href="/analytics-dashboard?failing={factor}&only=1">only this</a></td>
+            <td>${stats['avg_cost_delta']:,.0f}</td>
+        </tr>
+        """)
+    
+    failing = request.args.get('failing')
+    only = request.args.get('only') == '1'
+    filtered_content = ''
+    if failing in FactorBreakdown.FACTORS:
+        matching_ids = FactorBreakdown.failing_reports_query(failing, only).subquery()
+        matching = ConformityReport.query.filter(ConformityReport.id.in_(db.select(matching_ids.c.report_id))).order_by(
+            ConformityReport.created_at.desc()).limit(100).all()
+        matching_rows = ''.join(
+            f"<tr><td><a href='/view-report/{r.id}'>{r.report_number}</a></td><td>{r.site_specification.site_name}</td>"
+            f"<td>{r.overall_status.replace('_', ' ')}</td><td>{r.conformity_score or 0:.1f}%</td><td>${r.estimated_cost or 0:,.0f}</td></tr>"
+            for r in matching
+        )
+        filtered_content = f"""
+        <div class="row mt-4">
+            <div class="col-12">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-filter"></i> Reports failing {'only ' if only else ''}on {FactorBreakdown.FACTOR_LABELS[failing]} ({len(matching)})</h5>
+                    </div>
+                    <div class="card-body">
+                        <table class="table table-promamec">
+                            <thead><tr><th>Report</th><th>Site</th><th>Status</th><th>Score</th><th>Investment</th></tr></thead>
+                            <tbody>{matching_rows}</tbody>
+                        </table>
+                    </div>
+                </div>
+            </div>
+        </div>
+        """
+    
     content = f'''
     <div class="container-fluid">
         <div class="row">
@@ -2154,11 +4341,66 @@ def analytics_dashboard():
                 </div>
             </div>
         </div>
+        
+        <!-- Failing Factors -->
+        <div class="row mt-4">
+            <div class="col-12">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-th-list"></i> Failing Factors</h5>
+                    </div>
+                    <div class="card-body">
+                        <table class="table table-promamec">
+                            <thead><tr><th>Factor</th><th>Failing Reports</th><th>Failing Only On</th><th>Avg. Cost Impact</th></tr></thead>
+                            <tbody>{''.join(factor_rows) or '<tr><td colspan="4" class="text-muted">No failing factors recorded</td></tr>'}</tbody>
+                        </table>
+                    </div>
+                </div>
+            </div>
+        </div>
+        {filtered_content}
     </div>
     '''
     
     return render_professional_page(content)
 
+@app.route('/api/reports/factors')
+@login_required
+def api_report_factors():
+    """Reports filtered by failing factor, or the per-factor aggregate when no filter is given"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    failing = request.args.get('failing')
+    if not failing:
+        return jsonify(FactorBreakdown.summary())
+    if failing not in FactorBreakdown.FACTORS:
+        return jsonify({'error': f'Unknown factor: {failing}', 'factors': list(FactorBreakdown.FACTORS)}), 400
+    
+    only = request.args.get('only') == '1'
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    matching_ids = FactorBreakdown.failing_reports_query(failing, only).subquery()
+    
+    rows = db.session.query(
+        ConformityReport.id, ConformityReport.report_number, ConformityReport.overall_status,
+        ConformityReport.conformity_score, ConformityReport.estimated_cost, ReportFactor.cost_delta
+    ).join(
+        ReportFactor, (ReportFactor.report_id == ConformityReport.id) & (ReportFactor.factor == failing)
+    ).filter(
+        ConformityReport.id.in_(db.select(matching_ids.c.report_id))
+    ).order_by(ConformityReport.id.desc()).offset(offset).limit(limit).all()
+    
+    return jsonify({
+        'factor': failing,
+        'only': only,
+        'reports': [
+            {'id': r[0], 'report_number': r[1], 'status': r[2], 'score': r[3],
+             'estimated_cost': r[4], 'factor_cost': r[5]}
+            for r in rows
+        ]
+    })
+
 @app.route('/create-sample-data')
 def create_sample_data():
     """Create comprehensive sample data for demonstration - FIXED VERSION"""
@@ -2383,7 +4625,7 @@ def create_sample_data():
                     door_width=2.1,
                     door_height=2.4,
                     corridor_width=2.5,
-                    ceiling_clearance=0.5,
+                    ceiling_clearance=2.8,
                     floor_type='concrete',
                     floor_load_capacity=2500,
                     ceiling_type='concrete',
@@ -2462,17 +4704,445 @@ def create_sample_data():
                 db.session.commit()
         
         db.session.commit()
+        ScannerSimilarityIndex.persist()
         
         logger.info("✅ Comprehensive sample data created successfully")
         flash('Professional sample data created successfully! You can now explore all features with realistic data.', 'success')
         return redirect(url_for('index'))
-        
+    
     except Exception as e:
         db.session.rollback()
         logger.error(f"Sample data creation failed: {e}")
         flash(f'Sample data creation failed: {e}', 'error')
         return redirect(url_for('index'))
 
+# ===== ENGINEERING ENGINE API =====
+
+@app.route('/api/site-specs/<int:spec_id>/shielding')
+@login_required
+def api_site_spec_shielding(spec_id):
+    """Per-wall radiation barrier design for a site specification"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    site_spec = SiteSpecification.query.get_or_404(spec_id)
+    return jsonify(ShieldingCalculator.for_site_spec(site_spec))
+
+@app.route('/api/projects/<int:project_id>/shielding')
+@login_required
+def api_project_shielding(project_id):
+    """Barrier design for every site specification of a project in one vectorized pass"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    project = Project.query.get_or_404(project_id)
+    specs = project.site_specifications
+    if not specs:
+        return jsonify({'project_id': project.id, 'sites': []})
+    
+    rooms = [s.manual_room for s in specs]
+    batch = ShieldingCalculator.compute_batch(
+        [s.room_length for s in specs], [s.room_width for s in specs], [s.room_height for s in specs],
+        [ShieldingCalculator.weekly_patients(r.patient_volume if r else None, r.operating_hours if r else None) for r in rooms],
+        [ShieldingCalculator.parse_kvp(s.catalog_scanner.radiation_shielding, s.catalog_scanner.environmental_specs) for s in specs],
+        [ShieldingCalculator.parse_lead_equivalent(s.catalog_scanner.radiation_shielding) for s in specs]
+    )
+    
+    return jsonify({
+        'project_id': project.id,
+        'walls': batch['walls'],
+        'sites': [
+            {
+                'site_specification_id': spec.id,
+                'site_name': spec.site_name,
+                'recommended_lead_mm': batch['recommended_lead_mm'][i].tolist(),
+                'concrete_mm': np.round(batch['concrete_mm'][i], 1).tolist(),
+                'lead_m2_mm': round(float(batch['lead_m2_mm'][i]), 2)
+            }
+            for i, spec in enumerate(specs)
+        ]
+    })
+
+@app.route('/api/site-specs/<int:spec_id>/heat-load')
+@login_required
+def api_site_spec_heat_load(spec_id):
+    """Cooling requirement and shortfall for a site specification"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    site_spec = SiteSpecification.query.get_or_404(spec_id)
+    return jsonify(HeatLoadCalculator.assess([site_spec], commit=False)[0].to_dict())
+
+@app.route('/api/projects/<int:project_id>/heat-load')
+@login_required
+def api_project_heat_load(project_id):
+    """Heat-load assessments for every room of a project, computed in one batch"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    project = Project.query.get_or_404(project_id)
+    assessments = HeatLoadCalculator.assess_project(project)
+    return jsonify({
+        'project_id': project.id,
+        'total_shortfall_kw': round(sum(a.shortfall_kw for a in assessments), 2),
+        'sites': [a.to_dict() for a in assessments]
+    })
+
+@app.route('/api/site-specs/<int:spec_id>/electrical')
+@login_required
+def api_site_spec_electrical(spec_id):
+    """Feeder size, voltage drop and supply adequacy for a site specification"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    site_spec = SiteSpecification.query.get_or_404(spec_id)
+    room = site_spec.manual_room
+    rooms = {
+        'available_power': [site_spec.available_power],
+        'panel_distance': [room.electrical_panel_distance if room else None],
+        'panel_capacity': [room.electrical_panel_capacity if room else None],
+        'has_ups': [room.has_ups if room else False],
+        'ups_kva': [room.ups_capacity if room else None]
+    }
+    matrix = ElectricalEngine.evaluate_matrix(rooms, ElectricalEngine.scanner_inputs([site_spec.catalog_scanner]))
+    return jsonify(ElectricalEngine.pair_result(matrix, 0, 0))
+
+@app.route('/api/rooms/<int:room_id>/electrical')
+@login_required
+def api_room_electrical(room_id):
+    """Electrical compatibility of a room against the whole scanner catalog"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    room = ManualRoomEntry.query.get_or_404(room_id)
+    scanners = ScannerCatalog.all()
+    if not scanners:
+        return jsonify({'room_id': room.id, 'scanners': []})
+    matrix = ElectricalEngine.evaluate_matrix(ElectricalEngine.room_inputs([room]),
+                                              ElectricalEngine.scanner_inputs(scanners))
+    return jsonify({
+        'room_id': room.id,
+        'scanners': [
+            dict(ElectricalEngine.pair_result(matrix, 0, j), scanner_id=scanner.id,
+                 scanner=f"{scanner.manufacturer} {scanner.model_name}")
+            for j, scanner in enumerate(scanners)
+        ]
+    })
+
+@app.route('/api/rooms/<int:room_id>/structural')
+@login_required
+def api_room_structural(room_id):
+    """Floor loading screen of a room against every candidate scanner"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    room = ManualRoomEntry.query.get_or_404(room_id)
+    scanners = ScannerCatalog.all()
+    if not scanners:
+        return jsonify({'room_id': room.id, 'scanners': []})
+    
+    matrix = StructuralEngine.evaluate_matrix(
+        {'floor_capacity': [room.floor_load_capacity], 'floor_type': [room.floor_type]},
+        {'weight': [s.weight for s in scanners], 'dimensions': [s.dimensions for s in scanners]}
+    )
+    
+    def number(value, digits=1):
+        value = float(value)
+        return round(value, digits) if np.isfinite(value) else None
+    
+    return jsonify({
+        'room_id': room.id,
+        'floor_load_capacity': room.floor_load_capacity,
+        'floor_type': room.floor_type,
+        'scanners': [
+            {
+                'scanner_id': scanner.id,
+                'scanner': f"{scanner.manufacturer} {scanner.model_name}",
+                'footprint_m2': number(matrix['footprint_m2'][0, j], 2),
+                'distributed_load': number(matrix['distributed_load'][0, j]),
+                'point_load': number(matrix['point_load'][0, j]),
+                'point_pressure': number(matrix['point_pressure'][0, j]),
+                'utilization': number(matrix['utilization'][0, j], 2),
+                'adequate': bool(matrix['adequate'][0, j]),
+                'reinforcement_required': bool(matrix['reinforcement_required'][0, j])
+            }
+            for j, scanner in enumerate(scanners)
+        ]
+    })
+
+@app.route('/api/rooms/<int:room_id>/delivery-route')
+@login_required
+def api_room_delivery_route(room_id):
+    """Door, corridor and corner-turn feasibility of a room for every candidate scanner"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    room = ManualRoomEntry.query.get_or_404(room_id)
+    return jsonify({
+        'room_id': room.id,
+        'door': {'width': room.door_width, 'height': room.door_height},
+        'corridor_width': room.corridor_width,
+        'ceiling_clearance': room.ceiling_clearance,
+        'scanners': DeliveryRouteEngine.for_room(room, ScannerCatalog.all())
+    })
+
+@app.route('/api/rooms/<int:room_id>/recommendations')
+@login_required
+def api_room_recommendations(room_id):
+    """Top-k scanners for a room within the project budget (override with ?budget=)"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    room = ManualRoomEntry.query.get_or_404(room_id)
+    k = min(max(request.args.get('k', 5, type=int), 1), 50)
+    return jsonify(ScannerRecommender.recommend(room, request.args.get('budget', type=float), k))
+
+@app.route('/api/scanners/compare')
+@login_required
+def api_scanner_compare():
+    """N-way comparison of ?ids=1,2,3 from the scanner feature index"""
+    try:
+        scanner_ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+    scanner_ids = list(dict.fromkeys(scanner_ids))
+    if not 2 <= len(scanner_ids) <= 20:
+        return jsonify({'error': 'Select between 2 and 20 scanners'}), 400
+    try:
+        return jsonify(ScannerSimilarityIndex.compare(scanner_ids))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/scanners/<int:scanner_id>/similar')
+@login_required
+def api_scanner_similar(scanner_id):
+    """Catalog scanners closest to the given one"""
+    k = min(max(request.args.get('k', 5, type=int), 1), 50)
+    try:
+        return jsonify({'scanner_id': scanner_id, 'similar': ScannerSimilarityIndex.similar(scanner_id, k)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/scanners/<int:scanner_id>/compatible-rooms')
+@login_required
+def api_scanner_compatible_rooms(scanner_id):
+    """Rooms whose parsed supply matches a scanner (?hvac=1 / ?climate=1 add cooling and climate bounds)"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    scanner = ScannerCatalog.get_or_404(scanner_id)
+    rooms = SpecColumns.compatible_rooms_query(
+        scanner, hvac=request.args.get('hvac', type=int) == 1, climate=request.args.get('climate', type=int) == 1
+    ).order_by(ManualRoomEntry.id).limit(500).all()
+    
+    return jsonify({
+        'scanner_id': scanner.id,
+        'requirements': {
+            'voltage': scanner.power_voltage,
+            'phases': scanner.power_phases,
+            'cooling_kw': scanner.cooling_kw,
+            'temperature': [scanner.temperature_min, scanner.temperature_max],
+            'humidity': [scanner.humidity_min, scanner.humidity_max]
+        },
+        'rooms': [
+            {
+                'room_id': room.id,
+                'project_id': room.project_id,
+                'site_name': room.site_name,
+                'voltage': room.power_voltage,
+                'phases': room.power_phases,
+                'hvac_kw': room.hvac_kw,
+                'temperature': [room.temperature_min, room.temperature_max],
+                'humidity': [room.humidity_min, room.humidity_max]
+            }
+            for room in rooms
+        ]
+    })
+
+@app.route('/api/site-specs/<int:spec_id>/placement')
+@login_required
+def api_site_spec_placement(spec_id):
+    """Best gantry/table layouts and the minimal room size for a site specification"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    site_spec = SiteSpecification.query.get_or_404(spec_id)
+    if not site_spec.room_length or not site_spec.room_width or site_spec.room_length <= 0 or site_spec.room_width <= 0:
+        return jsonify({'error': 'Room length and width must be positive'}), 400
+    top = max(1, min(request.args.get('top', 3, type=int), len(PlacementSolver.ROTATIONS)))
+    return jsonify(PlacementSolver.for_site_spec(site_spec, top))
+
+@app.route('/api/scanners/<int:scanner_id>/impact', methods=['GET', 'POST'])
+@login_required
+def api_scanner_impact(scanner_id):
+    """Dependent site specs/reports of a scanner and its re-scoring status (POST re-runs it)"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    ScannerCatalog.get_or_404(scanner_id)
+    
+    started = None
+    if request.method == 'POST':
+        started = ScannerImpactJob.start_async(scanner_id)
+    
+    dependents = ScannerImpactJob.dependents(scanner_id)
+    flipped = ConformityReport.query.filter(
+        ConformityReport.id.in_(dependents['report_ids']),
+        ConformityReport.status_flipped == db.true()
+    ).count() if dependents['report_ids'] else 0
+    
+    return jsonify({
+        'scanner_id': scanner_id,
+        'site_specifications': len(dependents['site_specification_ids']),
+        'reports': len(dependents['report_ids']),
+        'flagged_status_flips': flipped,
+        'started': started,
+        'job': ScannerImpactJob.status(scanner_id)
+    })
+
+@app.route('/api/reports/<int:report_id>/acknowledge-status-flip', methods=['POST'])
+@login_required
+def api_acknowledge_status_flip(report_id):
+    """Clear a report's status-flip flag once its new deterministic status has been reviewed"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    report = ConformityReport.query.get_or_404(report_id)
+    report.status_flipped = False
+    db.session.commit()
+    logger.info(f"Status flip on {report.report_number} acknowledged by {current_user.username}")
+    return jsonify({'report_id': report.id, 'deterministic_status': report.deterministic_status, 'status_flipped': False})
+
+# ===== COST MANAGEMENT ROUTES =====
+
+@app.route('/cost-tables', methods=['GET', 'POST'])
+@login_required
+def cost_tables():
+    """Versioned cost tables used by the deterministic cost model"""
+    if current_user.role != 'Admin':
+        flash('Access denied. Cost tables are managed by Administrators only.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    if request.method == 'POST':
+        try:
+            rates = json.loads(request.form.get('rates') or '{}')
+            table = CostTableStore.publish(
+                rates,
+                label=request.form.get('label') or None,
+                notes=request.form.get('notes') or None,
+                user_id=current_user.id
+            )
+            flash(f'Cost table v{table.version} published. Run a re-costing job to update historical reports.', 'success')
+        except (ValueError, TypeError, AttributeError) as e:
+            db.session.rollback()
+            flash(f'Cost table rejected: {e}', 'error')
+        return redirect(url_for('cost_tables'))
+    
+    tables = CostTable.query.order_by(CostTable.version.desc()).all()
+    active_version, active_rates = CostTableStore.active()
+    job = BulkRecostingJob.status()
+    
+    report_counts = dict(db.session.query(ConformityReport.cost_table_version, db.func.count(ConformityReport.id))
+                         .group_by(ConformityReport.cost_table_version).all())
+    
+    table_rows = []
+    for t in tables:
+        author = t.author.full_name if t.author else 'System'
+        state = '<span class="badge bg-success">Active</span>' if t.is_active else '<span class="badge bg-secondary">Archived</span>'
+        row = f"""
+        <tr>
+            <td><strong>v{t.version}</strong></td>
+            <td>{escape(t.label or '')}</td>
+            <td>{state}</td>
+            <td>{report_counts.get(t.version, 0)}</td>
+            <td>{escape(author)}</td>
+            <td>{t.created_at.strftime('%Y-%m-%d %H:%M')}</td>
+        </tr>
+        """
+        table_rows.append(row)
+    
+    last_result = job['last_result'] or {}
+    job_summary = 'Running' if job['running'] else (
+        f"Last run: {last_result.get('processed', 0)} reports, {last_result.get('updated', 0)} updated, "
+        f"{last_result.get('reports_per_second') or 0} reports/s" if last_result else 'Never run'
+    )
+    
+    content = f'''
+    <div class="container-fluid">
+        <div class="row">
+            <div class="col-12">
+                <div class="d-flex justify-content-between align-items-center mb-4">
+                    <h2 class="mb-0"><i class="fas fa-coins"></i> Cost Tables</h2>
+                    <form method="POST" action="/cost-tables/recost">
+                        <button type="submit" class="btn btn-promamec-primary" {"disabled" if job['running'] else ""}>
+                            <i class="bi bi-arrow-repeat"></i> Re-cost All Reports (v{active_version})
+                        </button>
+                    </form>
+                </div>
+                <p class="text-muted">{job_summary}</p>
+            </div>
+        </div>
+        
+        <div class="row">
+            <div class="col-md-7">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-history"></i> Published Versions</h5>
+                    </div>
+                    <div class="card-body">
+                        <table class="table table-promamec">
+                            <thead>
+                                <tr><th>Version</th><th>Label</th><th>State</th><th>Reports</th><th>Published By</th><th>Date</th></tr>
+                            </thead>
+                            <tbody>{''.join(table_rows)}</tbody>
+                        </table>
+                    </div>
+                </div>
+            </div>
+            
+            <div class="col-md-5">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-plus-circle"></i> Publish New Version</h5>
+                    </div>
+                    <div class="card-body">
+                        <form method="POST">
+                            <div class="mb-3">
+                                <label class="form-label">Label</label>
+                                <input type="text" name="label" class="form-control" placeholder="e.g. 2026 Q4 contractor rates">
+                            </div>
+                            <div class="mb-3">
+                                <label class="form-label">Rates (JSON)</label>
+                                <textarea name="rates" class="form-control" rows="18" style="font-family: monospace;">{json.dumps(active_rates, indent=2)}</textarea>
+                                <div class="form-text">Omitted keys fall back to the built-in rates.</div>
+                            </div>
+                            <div class="mb-3">
+                                <label class="form-label">Notes</label>
+                                <textarea name="notes" class="form-control" rows="2"></textarea>
+                            </div>
+                            <button type="submit" class="btn btn-promamec-primary">
+                                <i class="bi bi-upload"></i> Publish and Activate
+                            </button>
+                        </form>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    '''
+    
+    return render_professional_page(content)
+
+@app.route('/cost-tables/recost', methods=['POST'])
+@login_required
+def recost_reports():
+    """Start the bulk re-costing job against the active cost table"""
+    if current_user.role != 'Admin':
+        flash('Access denied. Cost tables are managed by Administrators only.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    version = request.form.get('version', type=int)
+    if BulkRecostingJob.start_async(version):
+        flash('Re-costing job started. Historical reports will be updated in the background.', 'success')
+    else:
+        flash('A re-costing job is already running.', 'warning')
+    return redirect(url_for('cost_tables'))
+
+@app.route('/api/cost-tables/recost-status')
+@login_required
+def recost_status():
+    """Progress and throughput of the bulk re-costing job"""
+    if current_user.role != 'Admin':
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(BulkRecostingJob.status())
+
 # ===== ADMIN INTERFACE SETUP =====
 
 class SecureProfessionalAdminIndexView(AdminIndexView):
@@ -2531,6 +5201,21 @@ class ProfessionalScannerModelAdminView(ProfessionalRoleRequiredMixin, ModelView
         'price_range': lambda v, c, m, p: m.price_range,
         'is_neuviz': lambda v, c, m, p: '✓ NeuViz' if m.is_neuviz else 'Standard'
     }
+    
+    def on_model_change(self, form, model, is_created):
+        # Captured before commit, while attribute history is still available
+        model._scoring_changes = [] if is_created else ScannerImpactJob.changed_fields(model)
+    
+    def after_model_change(self, form, model, is_created):
+        ScannerCatalog.refresh()
+        ScannerSimilarityIndex.persist()
+        changes = getattr(model, '_scoring_changes', None)
+        if changes and ScannerImpactJob.start_async(model.id):
+            flash(f'Scoring fields changed ({", ".join(changes)}) - re-scoring dependent reports in the background.', 'info')
+    
+    def after_model_delete(self, model):
+        ScannerCatalog.refresh()
+        ScannerSimilarityIndex.persist()
 
 admin = Admin(app, name='Promamec Professional Admin', index_view=SecureProfessionalAdminIndexView())
 # Add professional admin views
@@ -2587,11 +5272,39 @@ def internal_error(error):
 
 # ===== APPLICATION INITIALIZATION =====
 
+def upgrade_schema():
+    """Add columns introduced after a table was first created (SQLite has no auto-migration)"""
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            logger.info(f"Schema upgrade: added {table.name}.{column.name}")
+        
+        # Indexes declared after the table was created (new columns or existing foreign keys)
+        existing_indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=db.engine)
+                logger.info(f"Schema upgrade: created index {index.name}")
+
 def create_database():
     """Initialize professional database"""
     try:
         with app.app_context():
             db.create_all()
+            upgrade_schema()
+            SpecColumns.backfill()
+            CostTableStore.ensure_default()
+            ScannerSimilarityIndex.persist()
             logger.info("✅ Professional database initialized successfully")
     except Exception as e:
         logger.error(f"❌ Database initialization failed: {e}")
@@ -2630,7 +5343,7 @@ if __name__ == '__main__':
             debug=True,
             threaded=True
         )
-        
+    
     except Exception as e:
         logger.error(f"❌ Application startup failed: {e}")
         sys.exit(1)
@@ -2764,7 +5477,7 @@ def ai_analysis():
     
     # Populate site specification choices
     site_specs = SiteSpecification.query.all()
-    form.site_specification_id.choices = [(s.id, f"{s.site_name} - {s.scanner_model.manufacturer} {s.scanner_model.model_name}") for s in site_specs]
+    form.site_specification_id.choices = [(s.id, f"{s.site_name} - {s.catalog_scanner.manufacturer} {s.catalog_scanner.model_name}") for s in site_specs]
     
     if not site_specs:
         form.site_specification_id.choices = [(-1, 'No site specifications available - Create one first')]
@@ -2795,6 +5508,7 @@ def ai_analysis():
                 recommendations=analysis_result['recommendations'],
                 risk_assessment=analysis_result['risk_level'],
                 estimated_cost=analysis_result.get('estimated_cost', 0),
+                cost_table_version=analysis_result.get('cost_table_version'),
                 modification_timeline=analysis_result.get('timeline', 30),
                 technical_drawings_required=analysis_result['score'] < 70,
                 pdf_generated=False,
@@ -2803,10 +5517,13 @@ def ai_analysis():
             )
             
             # Add NeuViz-specific analysis
-            if site_spec.scanner_model.is_neuviz:
-                report.neuviz_specific_analysis = f"NeuViz {site_spec.scanner_model.model_name} compliance analysis completed per {site_spec.scanner_model.neuviz_manual_ref}. Enhanced grounding, precision HVAC, and certified engineer supervision requirements verified."
+            if site_spec.catalog_scanner.is_neuviz:
+                report.neuviz_specific_analysis = f"NeuViz {site_spec.catalog_scanner.model_name} compliance analysis completed per {site_spec.catalog_scanner.neuviz_manual_ref}. Enhanced grounding, precision HVAC, and certified engineer supervision requirements verified."
             
             db.session.add(report)
+            db.session.flush()
+            FactorBreakdown.store_for_report(report)
+            ScannerImpactJob.seed(report)
             db.session.commit()
             
             logger.info(f"AI analysis completed: {report.report_number} - {report.overall_status} ({report.conformity_score}%)")
@@ -14,6 +14,7 @@ from flask import Flask, render_template, render_template_string, request, redir
 from flask_admin import Admin, AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SelectField, TextAreaField, FloatField, BooleanField
@@ -27,6 +28,7 @@ import re
 import io
 import base64
 import uuid
+import hashlib
 import threading
 import smtplib
 from email.mime.multipart import MIMEMultipart
@@ -45,6 +47,7 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.graphics.shapes import Drawing
+from report_charts import ReportChartRenderer
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.offline import plot
@@ -63,6 +66,8 @@ app.config.update({
     'WTF_CSRF_TIME_LIMIT': None
 })
 
+logger = logging.getLogger(__name__)
+
 # Initialize extensions
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
@@ -222,6 +227,14 @@ class ConformityReport(db.Model):
 class EnhancedPDFReportGenerator:
     """Professional PDF report generator with advanced features"""
     
+    # Cost analysis table and budget pie: (category, share of the modification cost, description)
+    COST_BASE = 3000
+    COST_SPLIT = [('Room Modifications', 0.4, 'Structural changes if required'),
+                  ('Electrical Upgrades', 0.25, 'Power system modifications'),
+                  ('HVAC Installation', 0.2, 'Climate control systems'),
+                  ('Radiation Shielding', 0.1, 'Safety compliance'),
+                  ('Project Management', 0.05, 'Coordination and oversight')]
+    
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.company_info = {
@@ -421,11 +434,35 @@ class EnhancedPDFReportGenerator:
         
         return elements
     
+    # Four-band scale used by this generator's conformity gauge
+    GAUGE_BANDS = [(0, 30, '#ff4444', 'Critical'), (30, 60, '#ff8800', 'Major Mod'),
+                   (60, 85, '#ffaa00', 'Minor Mod'), (85, 100, '#44aa44', 'Conforming')]
+    
     def _generate_analysis_charts(self, report):
         """Generate various analysis charts (FIXED)"""
+        if ReportChartRenderer.BACKEND == 'vector':
+            try:
+                cost_split = [(category, share) for category, share, _ in self.COST_SPLIT]
+                return ReportChartRenderer.report_charts(report, cost_split, self.COST_BASE, self.GAUGE_BANDS)
+            except Exception as e:
+                logger.warning(f"Vector chart generation failed, falling back to matplotlib: {e}")
+        
         charts = []
         
         try:
+            img_buffer = self._render_conformity_png(report)
+            chart_img = ReportLabImage(img_buffer, width=5*inch, height=3.5*inch)
+            charts.append(chart_img)
+            
+        except Exception as e:
+            print(f"Chart generation failed: {e}")
+            # Continue without failing
+        
+        return charts
+    
+    def _render_conformity_png(self, report):
+        """Rasterize the conformity gauge with pyplot (matplotlib fallback)"""
+        with ReportChartRenderer.PYPLOT_LOCK:
             # FIXED: Conformity gauge chart
             fig, ax = plt.subplots(figsize=(8, 6))
             
@@ -451,14 +488,7 @@ class EnhancedPDFReportGenerator:
             img_buffer.seek(0)
             plt.close()
             
-            chart_img = ReportLabImage(img_buffer, width=5*inch, height=3.5*inch)
-            charts.append(chart_img)
-            
-        except Exception as e:
-            print(f"Chart generation failed: {e}")
-            # Continue without failing
-        
-        return charts
+            return img_buffer
     
     def _create_action_plan(self, report):
         """Create detailed action plan"""
@@ -494,17 +524,14 @@ class EnhancedPDFReportGenerator:
         elements.append(Paragraph("Cost Analysis & Budget Impact", self.styles['Heading1']))
         
         # Detailed cost breakdown
-        base_cost = 3000
+        base_cost = self.COST_BASE
         total_cost = report.estimated_cost or base_cost
         
         cost_items = [
             ['Cost Category', 'Amount (USD)', 'Description'],
             ['Initial Assessment', f"${base_cost:,.0f}", 'Professional conformity analysis'],
-            ['Room Modifications', f"${max(0, (total_cost - base_cost) * 0.4):,.0f}", 'Structural changes if required'],
-            ['Electrical Upgrades', f"${max(0, (total_cost - base_cost) * 0.25):,.0f}", 'Power system modifications'],
-            ['HVAC Installation', f"${max(0, (total_cost - base_cost) * 0.2):,.0f}", 'Climate control systems'],
-            ['Radiation Shielding', f"${max(0, (total_cost - base_cost) * 0.1):,.0f}", 'Safety compliance'],
-            ['Project Management', f"${max(0, (total_cost - base_cost) * 0.05):,.0f}", 'Coordination and oversight'],
+            *[[category, f"${max(0, (total_cost - base_cost) * share):,.0f}", description]
+              for category, share, description in self.COST_SPLIT],
             ['TOTAL ESTIMATED', f"${total_cost:,.0f}", 'Complete project cost']
         ]
         
@@ -635,6 +662,143 @@ class EnhancedPDFReportGenerator:
         elements.append(Paragraph(footer_text, footer_style))
         return elements
 
+# ===== STEP 4: PDF CACHE =====
+
+class PDFCache:
+    """Disk-backed cache of rendered report PDFs with size-bounded LRU eviction"""
+    
+    CACHE_DIR = os.environ.get('PDF_CACHE_DIR', os.path.join('reports', 'cache'))
+    MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def key(report, **options):
+        """Cache key from everything that changes the rendered PDF"""
+        parts = [
+            report.id,
+            report.updated_at.isoformat() if report.updated_at else '',
+            report.project.updated_at.isoformat() if report.project and report.project.updated_at else '',
+            json.dumps(options, sort_keys=True)
+        ]
+        return hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest()
+    
+    @classmethod
+    def path(cls, report_id, key):
+        return os.path.join(cls.CACHE_DIR, f'report_{report_id}_{key}.pdf')
+    
+    @classmethod
+    def get_or_render(cls, report, include_3d=True, include_charts=True):
+        """Path of a cached PDF for this report revision, rendering it on a miss"""
+        key = cls.key(report, include_3d=include_3d, include_charts=include_charts)
+        path = cls.path(report.id, key)
+        
+        if os.path.exists(path):
+            os.utime(path)  # mtime doubles as the LRU access time
+            return path
+        
+        pdf_buffer = EnhancedPDFReportGenerator().generate_enhanced_report(
+            report, include_3d=include_3d, include_charts=include_charts)
+        
+        os.makedirs(cls.CACHE_DIR, exist_ok=True)
+        temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(pdf_buffer.getbuffer())
+        
+        with cls._lock:
+            # Older revisions of this report can never be hit again
+            cls._remove(report.id, keep=path)
+            os.replace(temp_path, path)
+            cls._evict()
+        return path
+    
+    @classmethod
+    def _remove(cls, report_id, keep=None):
+        if not os.path.isdir(cls.CACHE_DIR):
+            return
+        prefix = f'report_{report_id}_'
+        for name in os.listdir(cls.CACHE_DIR):
+            path = os.path.join(cls.CACHE_DIR, name)
+            if name.startswith(prefix) and name.endswith('.pdf') and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    @classmethod
+    def _evict(cls):
+        """Drop least recently served PDFs until the cache fits in MAX_BYTES"""
+        entries = []
+        for name in os.listdir(cls.CACHE_DIR):
+            if not name.endswith('.pdf'):
+                continue
+            stat = os.stat(os.path.join(cls.CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= cls.MAX_BYTES:
+                break
+            try:
+                os.remove(os.path.join(cls.CACHE_DIR, name))
+                total -= size
+            except OSError:
+                pass
+    
+    @classmethod
+    def invalidate(cls, report_id=None):
+        """Forget cached PDFs for one report, or all of them"""
+        with cls._lock:
+            if report_id is not None:
+                cls._remove(report_id)
+            elif os.path.isdir(cls.CACHE_DIR):
+                for name in os.listdir(cls.CACHE_DIR):
+                    if name.endswith('.pdf'):
+                        try:
+                            os.remove(os.path.join(cls.CACHE_DIR, name))
+                        except OSError:
+                            pass
+    
+    @staticmethod
+    def schedule(session, report_ids):
+        """Queue report ids (None = every report) for invalidation once the session commits"""
+        pending = session.info.setdefault('pdf_cache_invalidations', set())
+        pending.update(report_ids)
+
+# Flush events only record what changed; files are removed after the commit succeeds
+@event.listens_for(ConformityReport, 'after_update')
+@event.listens_for(ConformityReport, 'after_delete')
+def invalidate_report_pdf(mapper, connection, target):
+    PDFCache.schedule(db.inspect(target).session, [target.id])
+
+@event.listens_for(SiteSpecification, 'after_update')
+def invalidate_site_pdfs(mapper, connection, target):
+    # Query through the flush connection: lazy-loading relationships is not allowed here
+    report_ids = connection.execute(
+        db.select(ConformityReport.id).where(ConformityReport.site_specification_id == target.id)
+    ).scalars().all()
+    PDFCache.schedule(db.inspect(target).session, report_ids)
+
+@event.listens_for(ScannerModel, 'after_update')
+def invalidate_scanner_pdfs(mapper, connection, target):
+    # Scanner edits are rare and reach reports through many sites
+    PDFCache.schedule(db.inspect(target).session, [None])
+
+@event.listens_for(db.session, 'after_commit')
+def apply_pdf_invalidations(session):
+    pending = session.info.pop('pdf_cache_invalidations', None)
+    if not pending:
+        return
+    if None in pending:
+        PDFCache.invalidate()
+    else:
+        for report_id in pending:
+            PDFCache.invalidate(report_id)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_pdf_invalidations(session, previous_transaction):
+    session.info.pop('pdf_cache_invalidations', None)
+
 # ===== STEP 4: ADVANCED VISUALIZATION ENGINE (FIXED) =====
 
 class AdvancedVisualizationEngine:
@@ -1886,11 +2050,10 @@ def download_pdf(report_id):
     report = ConformityReport.query.get_or_404(report_id)
     
     try:
-        pdf_generator = EnhancedPDFReportGenerator()
-        pdf_buffer = pdf_generator.generate_enhanced_report(report, include_3d=True, include_charts=True)
+        pdf_path = PDFCache.get_or_render(report, include_3d=True, include_charts=True)
         
         return send_file(
-            pdf_buffer,
+            os.path.abspath(pdf_path),
             as_attachment=True,
             download_name=f'CT_Scanner_Report_{report.report_number}_Enhanced.pdf',
             mimetype='application/pdf'
@@ -1995,6 +2158,19 @@ def engineer_dashboard():
                                 projects=projects, recent_reports=recent_reports, 
                                 ai_reports_count=ai_reports_count, **engineer_metrics)
 
+@app.route('/api/reports/<int:report_id>/chart-benchmark')
+@login_required
+def api_chart_benchmark(report_id):
+    """Compare the vector and matplotlib conformity gauge for one report"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    report = ConformityReport.query.get_or_404(report_id)
+    runs = max(1, min(request.args.get('runs', 5, type=int), 20))
+    generator = EnhancedPDFReportGenerator()
+    return jsonify(ReportChartRenderer.benchmark(report, generator._render_conformity_png,
+                                                 generator.GAUGE_BANDS, runs=runs))
+
 @app.route('/api/report-data/<int:report_id>')
 @login_required
 def api_report_data(report_id):
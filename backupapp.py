@@ -12,29 +12,41 @@ import logging
 from dotenv import load_dotenv
 load_dotenv()
 
-from flask import Flask, render_template_string, request, redirect, url_for, flash, session, jsonify, send_file
+from flask import Flask, render_template_string, request, redirect, url_for, flash, session, jsonify, send_file, Response, stream_with_context, abort
 from flask_admin import Admin, AdminIndexView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_wtf import FlaskForm
 from flask_admin.theme import Bootstrap4Theme
 from wtforms import StringField, PasswordField, SelectField, TextAreaField, FloatField, BooleanField, IntegerField
 from wtforms.validators import DataRequired, Email, Length, NumberRange
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.utils import secure_filename
 import openai
 import json
 from datetime import datetime, timedelta
 import re
 import io
+import zipfile
+import tempfile
+import shutil
 import base64
 import uuid
+import copy
+import hashlib
 import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from collections import OrderedDict
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
-from email import encoders
 
 # Visualization & PDF Libraries
 import matplotlib
@@ -47,9 +59,11 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.graphics.shapes import Drawing
+from report_charts import ReportChartRenderer
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from plotly.offline import plot
+from plotly.offline import plot, get_plotlyjs
 
 # ===== PROFESSIONAL LOGGING SETUP =====
 logging.basicConfig(
@@ -78,8 +92,14 @@ app.config.update({
     'COMPANY_TAGLINE': 'Professional Medical Equipment Consulting & Integration',
     'COMPANY_LOGO': 'https://promamec.com/assets/site/img/logo.png',
     'VERSION': '2.0.0',
-    'BUILD': 'Professional-Enterprise'
+    'BUILD': 'Professional-Enterprise',
+    # Stored report delivery: '' (Python streams), 'x-sendfile' (Apache/lighttpd) or 'x-accel' (nginx)
+    'ARTIFACT_ROOT': os.environ.get('ARTIFACT_ROOT', 'reports'),
+    'ARTIFACT_SENDFILE_MODE': os.environ.get('ARTIFACT_SENDFILE_MODE', ''),
+    'ARTIFACT_ACCEL_PREFIX': os.environ.get('ARTIFACT_ACCEL_PREFIX', '/protected-reports'),
+    'ARTIFACT_MAX_AGE': int(os.environ.get('ARTIFACT_MAX_AGE', 365 * 24 * 3600))
 })
+app.config['USE_X_SENDFILE'] = app.config['ARTIFACT_SENDFILE_MODE'] == 'x-sendfile'
 
 # Initialize extensions
 db = SQLAlchemy(app)
@@ -461,6 +481,36 @@ class ConformityReport(db.Model):
     def __repr__(self):
         return f'<Report {self.report_number} - {self.overall_status}>'
 
+class ReportFigure(db.Model):
+    """Precomputed Plotly figure JSON for one report revision"""
+    __table_args__ = (db.UniqueConstraint('report_id', 'kind', name='uq_report_figure_kind'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    report_id = db.Column(db.Integer, db.ForeignKey('conformity_report.id'), nullable=False, index=True)
+    kind = db.Column(db.String(30), nullable=False)  # dashboard, room_model
+    revision_key = db.Column(db.String(64), nullable=False)
+    figure_json = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    report = db.relationship('ConformityReport', backref=db.backref('figures', cascade='all, delete-orphan'))
+    
+    def __repr__(self):
+        return f'<Figure {self.kind} for report {self.report_id} ({self.revision_key})>'
+
+class ReportArtifact(db.Model):
+    """Manifest entry for a content-addressed file in the artifact store"""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    path = db.Column(db.String(255), nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    mimetype = db.Column(db.String(100), default='application/pdf')
+    store_count = db.Column(db.Integer, default=1)  # renders that produced these exact bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_stored_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Artifact {self.sha256[:12]} ({self.size_bytes} bytes)>'
+
 # ===== COMPREHENSIVE FORMS =====
 
 class LoginForm(FlaskForm):
@@ -1112,7 +1162,7 @@ def get_professional_base_template():
             </div>
         </div>
     </nav>
-
+    
     <!-- Main Content -->
     <main class="container-fluid py-4">
         {% with messages = get_flashed_messages(with_categories=true) %}
@@ -1134,7 +1184,7 @@ def get_professional_base_template():
         <!-- CONTENT PLACEHOLDER -->
         {{ content|safe }}
     </main>
-
+    
     <!-- Professional Footer -->
     <footer class="promamec-footer">
         <div class="container">
@@ -1162,7 +1212,7 @@ def get_professional_base_template():
             </div>
         </div>
     </footer>
-
+    
     <!-- Professional JavaScript -->
     <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
     <script>
@@ -1263,7 +1313,7 @@ class AdvancedCTScannerAI:
             logger.info(f"AI analysis completed for site {site_spec.site_name}: {analysis_result['status']} ({analysis_result['score']}%)")
             
             return analysis_result
-            
+        
         except Exception as e:
             error_msg = str(e)
             logger.error(f"Enhanced AI analysis failed: {error_msg}")
@@ -1442,7 +1492,7 @@ RESPONSE FORMAT REQUIRED:
 
 Provide highly technical, detailed, and actionable analysis using precise engineering terminology, specific measurements, and professional cost estimates.
 """
-        
+
         return prompt
     
     @staticmethod
@@ -1731,6 +1781,19 @@ Provide highly technical, detailed, and actionable analysis using precise engine
 class ProfessionalPDFReportGenerator:
     """Professional PDF report generator with advanced features"""
     
+    # Cost analysis table and budget pie: (category, share of the modification cost, description)
+    COST_BASE = 5000
+    COST_SPLIT = [('Room Modifications', 0.35, 'Structural changes if required'),
+                  ('Electrical Systems', 0.25, 'Power system upgrades'),
+                  ('HVAC Installation', 0.20, 'Environmental control systems'),
+                  ('Radiation Shielding', 0.15, 'Safety compliance measures'),
+                  ('Project Management', 0.05, 'Coordination and oversight')]
+    
+    # Built section flowables, shared by every generator in this process
+    SECTION_CACHE_SIZE = int(os.environ.get('PDF_SECTION_CACHE_SIZE', 512))
+    _section_cache = OrderedDict()
+    _section_lock = threading.Lock()
+    
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.company_info = {
@@ -1779,57 +1842,95 @@ class ProfessionalPDFReportGenerator:
             alignment=0
         )
     
-    def generate_comprehensive_report(self, report, include_visualizations=True):
-        """Generate comprehensive professional PDF report"""
+    def _section(self, name, inputs, builder):
+        """Flowables for one section, rebuilt only when the inputs it depends on change"""
+        key = (name, hashlib.sha1(repr(inputs).encode('utf-8')).hexdigest())
+        with self._section_lock:
+            cached = self._section_cache.get(key)
+            if cached is not None:
+                self._section_cache.move_to_end(key)
+        
+        if cached is None:
+            cached = builder()
+            with self._section_lock:
+                self._section_cache[key] = cached
+                while len(self._section_cache) > self.SECTION_CACHE_SIZE:
+                    self._section_cache.popitem(last=False)
+        
+        # doc.build wraps and splits flowables in place, so every document lays out its own copy
+        return copy.deepcopy(cached)
+    
+    @classmethod
+    def clear_section_cache(cls):
+        with cls._section_lock:
+            cls._section_cache.clear()
+    
+    def generate_comprehensive_report(self, report, include_visualizations=True, output=None):
+        """Generate comprehensive professional PDF report into output (a new BytesIO by default)"""
         try:
-            buffer = io.BytesIO()
+            buffer = output if output is not None else io.BytesIO()
             doc = SimpleDocTemplate(
                 buffer, 
                 pagesize=A4,
                 rightMargin=60,
                 leftMargin=60,
                 topMargin=60,
-                bottomMargin=60
+                bottomMargin=60,
+                invariant=1  # fixed creation date and document ID so identical reports dedupe in the store
             )
             
             story = []
             
-            # Professional header
+            site_spec = report.site_specification
+            scanner = site_spec.scanner_model
+            
+            # Professional header (branding is static; metadata carries the generation time)
+            story.extend(self._section('branding', (), self._create_branding))
             story.extend(self._create_professional_header(report))
             story.append(Spacer(1, 20))
             
             # Executive summary
-            story.extend(self._create_executive_summary(report))
+            story.extend(self._section('executive_summary', (
+                report.overall_status, report.conformity_score, report.risk_assessment,
+                report.estimated_cost, report.modification_timeline
+            ), lambda: self._create_executive_summary(report)))
             story.append(Spacer(1, 20))
             
             # Detailed technical analysis
-            story.extend(self._create_technical_analysis(report))
+            story.extend(self._section('technical_analysis', (report.ai_analysis,),
+                                       lambda: self._create_technical_analysis(report)))
             story.append(Spacer(1, 20))
             
-            # Visual analytics (if enabled)
+            # Visual analytics (if enabled); never cached, since chart Drawings cannot be deep-copied
+            # and the vector ones are cheap to rebuild
             if include_visualizations:
                 story.extend(self._create_visual_analytics(report))
                 story.append(Spacer(1, 20))
             
             # Cost analysis
-            story.extend(self._create_cost_analysis(report))
+            story.extend(self._section('cost_analysis', (report.estimated_cost,),
+                                       lambda: self._create_cost_analysis(report)))
             story.append(Spacer(1, 20))
             
             # Action plan
-            story.extend(self._create_action_plan(report))
+            story.extend(self._section('action_plan', (report.recommendations,),
+                                       lambda: self._create_action_plan(report)))
             story.append(Spacer(1, 20))
             
             # NeuViz-specific section
-            if report.site_specification.scanner_model.is_neuviz:
-                story.extend(self._create_neuviz_section(report))
+            if scanner.is_neuviz:
+                story.extend(self._section('neuviz', (scanner.neuviz_manual_ref, report.neuviz_specific_analysis),
+                                           lambda: self._create_neuviz_section(report)))
                 story.append(Spacer(1, 20))
             
-            # Compliance checklist
-            story.extend(self._create_compliance_section(report))
+            # Compliance checklist (static template, four site-dependent status marks)
+            story.extend(self._section('compliance', self._compliance_marks(site_spec, scanner),
+                                       lambda: self._create_compliance_section(report)))
             story.append(Spacer(1, 20))
             
             # Professional footer
-            story.extend(self._create_professional_footer())
+            story.extend(self._section('footer', (), self._create_professional_footer))
+            story.append(self._create_generation_notice(report))
             
             # Build PDF
             doc.build(story)
@@ -1837,13 +1938,13 @@ class ProfessionalPDFReportGenerator:
             
             logger.info(f"PDF report generated successfully for {report.report_number}")
             return buffer
-            
+        
         except Exception as e:
             logger.error(f"PDF generation failed: {e}")
             raise
     
-    def _create_professional_header(self, report):
-        """Create professional report header"""
+    def _create_branding(self):
+        """Create company branding block and report title"""
         elements = []
         
         # Company header
@@ -1870,11 +1971,16 @@ class ProfessionalPDFReportGenerator:
         
         # Report title
         elements.append(Paragraph("PROFESSIONAL CT SCANNER CONFORMITY ANALYSIS", self.title_style))
+        return elements
+    
+    def _create_professional_header(self, report):
+        """Create report metadata header"""
+        elements = []
         
         # Report metadata
         metadata = [
             ['Report Number:', report.report_number],
-            ['Generation Date:', datetime.now().strftime('%Y-%m-%d %H:%M UTC')],
+            ['Report Date:', f"{self._report_date(report).strftime('%Y-%m-%d %H:%M UTC')} (revision {report.revision_number or 1})"],
             ['Project:', report.project.name],
             ['Client:', report.project.client_name],
             ['Site:', report.site_specification.site_name],
@@ -1972,6 +2078,17 @@ class ProfessionalPDFReportGenerator:
         
         elements.append(Paragraph("VISUAL ANALYTICS", self.heading_style))
         
+        if ReportChartRenderer.BACKEND == 'vector':
+            try:
+                cost_split = [(category, share) for category, share, _ in self.COST_SPLIT]
+                for drawing in ReportChartRenderer.report_charts(report, cost_split, self.COST_BASE):
+                    elements.append(drawing)
+                    elements.append(Spacer(1, 10))
+                return elements
+            except Exception as e:
+                logger.warning(f"Vector chart generation failed, falling back to matplotlib: {e}")
+                elements = elements[:1]
+        
         try:
             # Generate conformity chart
             chart_buffer = self._generate_conformity_chart(report)
@@ -1986,34 +2103,35 @@ class ProfessionalPDFReportGenerator:
         return elements
     
     def _generate_conformity_chart(self, report):
-        """Generate conformity analysis chart"""
+        """Generate conformity analysis chart (matplotlib fallback)"""
         try:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            
-            # Simple conformity gauge
-            score = report.conformity_score or 0
-            categories = ['Critical\n(0-50)', 'Modification\n(50-85)', 'Conforming\n(85-100)']
-            values = [50, 35, 15]
-            colors_list = ['#dc2626', '#d97706', '#059669']
-            
-            # Create gauge chart
-            wedges, texts = ax.pie(values, labels=categories, colors=colors_list, 
-                                 startangle=180, counterclock=False)
-            
-            # Add score indicator
-            ax.text(0, -1.3, f'Conformity Score: {score:.1f}%', 
-                   horizontalalignment='center', fontsize=16, fontweight='bold')
-            
-            plt.title('CT Scanner Conformity Assessment', fontsize=18, fontweight='bold', pad=20)
-            
-            # Save to buffer
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150)
-            img_buffer.seek(0)
-            plt.close()
-            
-            return img_buffer
-            
+            with ReportChartRenderer.PYPLOT_LOCK:
+                fig, ax = plt.subplots(figsize=(8, 6))
+                
+                # Simple conformity gauge
+                score = report.conformity_score or 0
+                categories = ['Critical\n(0-50)', 'Modification\n(50-85)', 'Conforming\n(85-100)']
+                values = [50, 35, 15]
+                colors_list = ['#dc2626', '#d97706', '#059669']
+                
+                # Create gauge chart
+                wedges, texts = ax.pie(values, labels=categories, colors=colors_list, 
+                                     startangle=180, counterclock=False)
+                
+                # Add score indicator
+                ax.text(0, -1.3, f'Conformity Score: {score:.1f}%', 
+                       horizontalalignment='center', fontsize=16, fontweight='bold')
+                
+                plt.title('CT Scanner Conformity Assessment', fontsize=18, fontweight='bold', pad=20)
+                
+                # Save to buffer
+                img_buffer = io.BytesIO()
+                plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150)
+                img_buffer.seek(0)
+                plt.close()
+                
+                return img_buffer
+        
         except Exception as e:
             logger.error(f"Chart generation error: {e}")
             return None
@@ -2025,17 +2143,14 @@ class ProfessionalPDFReportGenerator:
         elements.append(Paragraph("COST ANALYSIS & BUDGET PLANNING", self.heading_style))
         
         # Cost breakdown
-        base_cost = 5000
+        base_cost = self.COST_BASE
         total_cost = report.estimated_cost or base_cost
         
         cost_items = [
             ['Cost Category', 'Amount (USD)', 'Description'],
             ['Professional Assessment', f"${base_cost:,.0f}", 'Comprehensive conformity analysis'],
-            ['Room Modifications', f"${max(0, (total_cost - base_cost) * 0.35):,.0f}", 'Structural changes if required'],
-            ['Electrical Systems', f"${max(0, (total_cost - base_cost) * 0.25):,.0f}", 'Power system upgrades'],
-            ['HVAC Installation', f"${max(0, (total_cost - base_cost) * 0.20):,.0f}", 'Environmental control systems'],
-            ['Radiation Shielding', f"${max(0, (total_cost - base_cost) * 0.15):,.0f}", 'Safety compliance measures'],
-            ['Project Management', f"${max(0, (total_cost - base_cost) * 0.05):,.0f}", 'Coordination and oversight'],
+            *[[category, f"${max(0, (total_cost - base_cost) * share):,.0f}", description]
+              for category, share, description in self.COST_SPLIT],
             ['TOTAL ESTIMATED', f"${total_cost:,.0f}", 'Complete project investment']
         ]
         
@@ -2112,29 +2227,35 @@ class ProfessionalPDFReportGenerator:
         elements.append(Paragraph(neuviz_content, self.body_style))
         return elements
     
+    @staticmethod
+    def _compliance_marks(site_spec, scanner):
+        """Site-dependent status marks of the compliance checklist"""
+        return (
+            '✓' if (site_spec.room_length >= scanner.min_room_length and 
+                    site_spec.room_width >= scanner.min_room_width and 
+                    site_spec.room_height >= scanner.min_room_height) else '⚠',
+            '✓' if site_spec.available_power == scanner.required_power else '⚠',
+            '✓' if site_spec.has_hvac else '✗',
+            '✓' if site_spec.accessibility_compliance else '⚠'
+        )
+    
     def _create_compliance_section(self, report):
         """Create regulatory compliance checklist"""
         elements = []
         
         elements.append(Paragraph("REGULATORY COMPLIANCE CHECKLIST", self.heading_style))
         
-        site_spec = report.site_specification
-        scanner = site_spec.scanner_model
+        dimensions, electrical, environmental, accessibility = self._compliance_marks(
+            report.site_specification, report.site_specification.scanner_model)
         
         # Compliance matrix
         compliance_data = [
             ['Compliance Category', 'Status', 'Requirements'],
-            ['Room Dimensions', '✓' if (site_spec.room_length >= scanner.min_room_length and 
-                                      site_spec.room_width >= scanner.min_room_width and 
-                                      site_spec.room_height >= scanner.min_room_height) else '⚠', 
-             'Spatial adequacy verification'],
-            ['Electrical Systems', '✓' if site_spec.available_power == scanner.required_power else '⚠', 
-             'Power compatibility assessment'],
-            ['Environmental Controls', '✓' if site_spec.has_hvac else '✗', 
-             'HVAC system for equipment cooling'],
+            ['Room Dimensions', dimensions, 'Spatial adequacy verification'],
+            ['Electrical Systems', electrical, 'Power compatibility assessment'],
+            ['Environmental Controls', environmental, 'HVAC system for equipment cooling'],
             ['Radiation Safety', '⚠', 'Shielding assessment required'],
-            ['Accessibility (ADA)', '✓' if site_spec.accessibility_compliance else '⚠', 
-             'Disability access compliance'],
+            ['Accessibility (ADA)', accessibility, 'Disability access compliance'],
             ['Building Permits', '⚠', 'Local authority approvals needed'],
             ['Fire Safety Systems', '⚠', 'Fire suppression compliance'],
             ['Environmental Clearance', '⚠', 'Environmental impact assessment']
@@ -2174,214 +2295,1186 @@ class ProfessionalPDFReportGenerator:
         Website: {self.company_info['website']}<br/><br/>
         
         <i>This professional report is generated using advanced AI technology and engineering standards. 
-        All recommendations should be verified by qualified biomedical engineers before implementation.
-        Report generated on {datetime.now().strftime('%Y-%m-%d at %H:%M UTC')}.</i><br/><br/>
+        All recommendations should be verified by qualified biomedical engineers before implementation.</i><br/><br/>
         
         <b>CONFIDENTIAL - This document contains proprietary professional analysis.</b>
         """
         
-        footer_style = ParagraphStyle(
+        elements.append(Paragraph(footer_text, self._footer_style()))
+        return elements
+    
+    @staticmethod
+    def _report_date(report):
+        """Creation time of the report; unlike updated_at it is not bumped by render bookkeeping,
+        so re-rendering unchanged data yields identical bytes"""
+        return report.created_at or datetime.utcnow()
+    
+    def _create_generation_notice(self, report):
+        """Report date and revision under the footer (the only per-report line in it)"""
+        return Paragraph(f"<i>Report dated {self._report_date(report).strftime('%Y-%m-%d at %H:%M UTC')}, "
+                         f"revision {report.revision_number or 1}.</i>", self._footer_style())
+    
+    def _footer_style(self):
+        return ParagraphStyle(
             'FooterStyle',
             parent=self.styles['Normal'],
             fontSize=8,
             textColor=colors.grey,
             alignment=1,
         )
+
+# ===== ASYNCHRONOUS PDF RENDERING =====
+
+def render_pdf_worker(snapshot, include_visualizations, output_path):
+    """Process-pool entry point: render a report snapshot straight to disk"""
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    
+    # ReportLab writes straight to the file; no in-memory copy of the PDF is kept
+    with open(temp_path, 'wb') as f:
+        ProfessionalPDFReportGenerator().generate_comprehensive_report(snapshot, include_visualizations, output=f)
+    os.replace(temp_path, output_path)
+    
+    return {
+        'path': output_path,
+        'bytes': os.path.getsize(output_path),
+        'render_seconds': round(time.perf_counter() - started, 3)
+    }
+
+class PDFRenderQueue:
+    """Job queue feeding a process pool so ReportLab/matplotlib work stays off the request threads"""
+    
+    MAX_WORKERS = int(os.environ.get('PDF_WORKERS', max(1, min(4, (os.cpu_count() or 2) - 1))))
+    MAX_TRACKED_JOBS = 500
+    PRIVATE_FIELDS = ('pdf_path', 'error')  # Server paths and exception text stay in the logs
+    
+    _lock = threading.Lock()
+    _executor = None
+    _jobs = {}
+    
+    @classmethod
+    def _pool(cls):
+        with cls._lock:
+            if cls._executor is None:
+                # Spawned workers do not inherit the threaded server's locks or open DB connections
+                cls._executor = ProcessPoolExecutor(max_workers=cls.MAX_WORKERS,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+            return cls._executor
+    
+    @staticmethod
+    def _columns(obj):
+        return {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
+    
+    @classmethod
+    def snapshot(cls, report):
+        """Picklable copy of everything the PDF generator reads from a report"""
+        site_spec = report.site_specification
+        return SimpleNamespace(
+            **cls._columns(report),
+            project=SimpleNamespace(**cls._columns(report.project)),
+            site_specification=SimpleNamespace(
+                **cls._columns(site_spec),
+                scanner_model=SimpleNamespace(**cls._columns(site_spec.scanner_model))
+            )
+        )
+    
+    @classmethod
+    def submit(cls, report, include_visualizations=True, recipients=None, include_dashboard=True):
+        """Queue a render; recipients (if any) are emailed the PDF once it is ready"""
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'report_id': report.id,
+            'report_number': report.report_number,
+            'status': 'queued',
+            'submitted_at': datetime.utcnow().isoformat(),
+            'finished_at': None,
+            'pdf_path': None,
+            'bytes': None,
+            'render_seconds': None,
+            'email_sent': None,
+            'error': None
+        }
+        with cls._lock:
+            cls._jobs[job_id] = job
+            if len(cls._jobs) > cls.MAX_TRACKED_JOBS:
+                finished = [k for k, j in cls._jobs.items() if j['status'] in ('completed', 'failed')]
+                for key in finished[:len(cls._jobs) - cls.MAX_TRACKED_JOBS]:
+                    del cls._jobs[key]
+        
+        output_path = ArtifactStore.staging_path(f'{job_id}.pdf')
+        future = cls._pool().submit(render_pdf_worker, cls.snapshot(report), include_visualizations, output_path)
+        job['status'] = 'running'
+        future.add_done_callback(lambda f: cls._complete(job_id, f, recipients, include_dashboard))
+        logger.info(f"PDF job {job_id} queued for {report.report_number}")
+        return job_id
+    
+    @classmethod
+    def _complete(cls, job_id, future, recipients, include_dashboard):
+        """Record the result, update the report and send the completion notification"""
+        job = cls._jobs.get(job_id)
+        if job is None:
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"PDF job {job_id} failed: {e}")
+            job.update(status='failed', error=str(e), finished_at=datetime.utcnow().isoformat())
+            return
         
-        elements.append(Paragraph(footer_text, footer_style))
-        return elements
+        with app.app_context():
+            try:
+                report = ConformityReport.query.get(job['report_id'])
+                result['path'] = ArtifactStore.put_file(result['path'])
+                report.pdf_generated = True
+                report.pdf_path = result['path']
+                
+                if recipients:
+                    with open(result['path'], 'rb') as pdf_file:
+                        job['email_sent'] = ProfessionalEmailService().send_professional_notification(
+                            report, recipients, pdf_file, include_dashboard)
+                    report.email_sent = report.email_sent or job['email_sent']
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"PDF job {job_id} post-processing failed: {e}")
+                job.update(status='failed', error=str(e), finished_at=datetime.utcnow().isoformat())
+                return
+        
+        job.update(status='completed', pdf_path=result['path'], bytes=result['bytes'],
+                   render_seconds=result['render_seconds'], finished_at=datetime.utcnow().isoformat())
+        logger.info(f"PDF job {job_id} completed: {job['report_number']} "
+                    f"({result['bytes']} bytes in {result['render_seconds']}s)")
+    
+    @classmethod
+    def status(cls, job_id):
+        job = cls._jobs.get(job_id)
+        return dict(job) if job else None
+    
+    @classmethod
+    def latest_for_report(cls, report_id):
+        jobs = [j for j in list(cls._jobs.values()) if j['report_id'] == report_id]
+        return dict(max(jobs, key=lambda j: j['submitted_at'])) if jobs else None
+
+# ===== PROJECT REPORT BUNDLES =====
+
+class ZipChunkSink:
+    """Write-only, unseekable file object; zipfile writes into it and the bundle stream drains it"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+class ProjectReportBundle:
+    """Streams a ZIP of every report PDF in a project, one PDF in memory at a time"""
+    
+    CHUNK_SIZE = 64 * 1024
+    SPOOL_MAX_SIZE = 8 * 1024 * 1024
+    
+    @staticmethod
+    def index_rows(project_id):
+        """Column-only rows for the summary index, without loading report bodies"""
+        return db.session.query(
+            ConformityReport.id, ConformityReport.report_number, ConformityReport.overall_status,
+            ConformityReport.conformity_score, ConformityReport.estimated_cost, ConformityReport.created_at,
+            SiteSpecification.site_name, ScannerModel.manufacturer, ScannerModel.model_name
+        ).join(SiteSpecification, ConformityReport.site_specification_id == SiteSpecification.id
+        ).join(ScannerModel, SiteSpecification.scanner_model_id == ScannerModel.id
+        ).filter(ConformityReport.project_id == project_id
+        ).order_by(ConformityReport.created_at).all()
+    
+    @staticmethod
+    def member_name(report_number):
+        return f'Promamec_Professional_Analysis_{report_number}.pdf'
+    
+    @classmethod
+    def index_pdf(cls, project, rows):
+        """Summary index of the bundle as a one-table PDF"""
+        generator = ProfessionalPDFReportGenerator()
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=50, bottomMargin=50)
+        
+        story = [
+            Paragraph(f"{project.name} - Conformity Report Index", generator.title_style),
+            Paragraph(f"<b>Client:</b> {project.client_name} | <b>Reports:</b> {len(rows)} | "
+                      f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}", generator.body_style),
+            Spacer(1, 12)
+        ]
+        
+        table_data = [['Report', 'Site', 'Scanner', 'Status', 'Score', 'Est. Cost']]
+        for row in rows:
+            table_data.append([
+                row.report_number,
+                row.site_name,
+                f"{row.manufacturer} {row.model_name}",
+                (row.overall_status or 'Pending').replace('_', ' '),
+                f"{row.conformity_score:.1f}%" if row.conformity_score is not None else 'N/A',
+                f"${row.estimated_cost:,.0f}" if row.estimated_cost else 'TBD'
+            ])
+        
+        index_table = Table(table_data, colWidths=[1.3*inch, 1.3*inch, 1.5*inch, 1.1*inch, 0.6*inch, 0.9*inch], repeatRows=1)
+        index_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('ALIGN', (4, 1), (-1, -1), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+        story.append(index_table)
+        
+        doc.build(story)
+        buffer.seek(0)
+        return buffer
+    
+    @classmethod
+    def pdf_chunks(cls, report):
+        """PDF bytes for one report: from disk when already rendered, otherwise rendered now"""
+        if report.pdf_path and os.path.exists(report.pdf_path):
+            with open(report.pdf_path, 'rb') as pdf_file:
+                chunk = pdf_file.read(cls.CHUNK_SIZE)
+                while chunk:
+                    yield chunk
+                    chunk = pdf_file.read(cls.CHUNK_SIZE)
+            return
+        
+        # Large renders spill to disk instead of growing the worker's heap
+        with tempfile.SpooledTemporaryFile(max_size=cls.SPOOL_MAX_SIZE) as spool:
+            ProfessionalPDFReportGenerator().generate_comprehensive_report(report, output=spool)
+            spool.seek(0)
+            chunk = spool.read(cls.CHUNK_SIZE)
+            while chunk:
+                yield chunk
+                chunk = spool.read(cls.CHUNK_SIZE)
+    
+    @classmethod
+    def stream(cls, project):
+        """Yield the ZIP archive in chunks as each member is written"""
+        rows = cls.index_rows(project.id)
+        sink = ZipChunkSink()
+        
+        # PDFs are already compressed; storing them avoids a second deflate pass
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+            archive.writestr('00_Report_Index.pdf', cls.index_pdf(project, rows).getvalue())
+            yield sink.drain()
+            
+            for row in rows:
+                report = ConformityReport.query.get(row.id)
+                chunks = None
+                try:
+                    if report is None:
+                        raise LookupError('report was deleted while the bundle was streaming')
+                    # Render (or open) the PDF before the member entry exists, so a failed
+                    # render leaves only the error note instead of an empty PDF beside it
+                    chunks = cls.pdf_chunks(report)
+                    first_chunk = next(chunks, b'')
+                    with archive.open(cls.member_name(row.report_number), 'w') as member:
+                        member.write(first_chunk)
+                        for chunk in chunks:
+                            member.write(chunk)
+                            data = sink.drain()
+                            if data:
+                                yield data
+                except Exception as e:
+                    logger.error(f"Bundle member {row.report_number} failed: {e}")
+                    archive.writestr(f'{row.report_number}_ERROR.txt', f'PDF generation failed: {e}')
+                finally:
+                    if chunks is not None:
+                        chunks.close()
+                    # Keep the session from accumulating every report in a large project
+                    if report is not None:
+                        db.session.expunge(report)
+                yield sink.drain()
+        
+        # Central directory
+        yield sink.drain()
+
+# ===== CONTENT-ADDRESSED ARTIFACT STORE =====
+
+class ArtifactStore:
+    """Stores rendered files under ARTIFACT_ROOT/objects/<aa>/<bb>/<sha256><ext> with a manifest table"""
+    
+    HASH_CHUNK = 1024 * 1024
+    GC_GRACE_SECONDS = 3600  # never collect files younger than this (renders in flight)
+    
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def root():
+        return app.config['ARTIFACT_ROOT']
+    
+    @classmethod
+    def objects_dir(cls):
+        return os.path.join(cls.root(), 'objects')
+    
+    @classmethod
+    def staging_path(cls, name):
+        staging = os.path.join(cls.root(), 'staging')
+        os.makedirs(staging, exist_ok=True)
+        return os.path.join(staging, name)
+    
+    @classmethod
+    def object_path(cls, sha256, ext='.pdf'):
+        return os.path.join(cls.objects_dir(), sha256[:2], sha256[2:4], f'{sha256}{ext}')
+    
+    @classmethod
+    def is_object(cls, path):
+        name, _ = os.path.splitext(os.path.basename(path))
+        return (len(name) == 64 and all(c in '0123456789abcdef' for c in name) and
+                os.path.abspath(path).startswith(os.path.abspath(cls.objects_dir()) + os.sep))
+    
+    @classmethod
+    def file_sha256(cls, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            chunk = f.read(cls.HASH_CHUNK)
+            while chunk:
+                digest.update(chunk)
+                chunk = f.read(cls.HASH_CHUNK)
+        return digest.hexdigest()
+    
+    @classmethod
+    def put_file(cls, temp_path, mimetype='application/pdf'):
+        """Move a finished file into the store (consuming temp_path) and return its stored path"""
+        sha256 = cls.file_sha256(temp_path)
+        ext = os.path.splitext(temp_path)[1] or '.bin'
+        dest = cls.object_path(sha256, ext)
+        size = os.path.getsize(temp_path)
+        
+        with cls._lock:
+            if os.path.exists(dest):
+                os.remove(temp_path)  # identical render already stored
+            else:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.replace(temp_path, dest)
+        
+        # Atomic bump, so concurrent stores of the same render do not lose counts
+        bump = {'store_count': db.func.coalesce(ReportArtifact.store_count, 1) + 1,
+                    'last_stored_at': datetime.utcnow(), 'path': dest}
+        if not ReportArtifact.query.filter_by(sha256=sha256).update(bump, synchronize_session=False):
+            try:
+                with db.session.begin_nested():
+                    db.session.add(ReportArtifact(sha256=sha256, path=dest, size_bytes=size, mimetype=mimetype))
+            except IntegrityError:
+                # Another worker inserted the same render between the update and the insert
+                ReportArtifact.query.filter_by(sha256=sha256).update(bump, synchronize_session=False)
+        return dest
+    
+    @classmethod
+    def _is_stale(cls, path, now):
+        try:
+            return now - os.path.getmtime(path) > cls.GC_GRACE_SECONDS
+        except OSError:
+            return False
+    
+    @classmethod
+    def _remove(cls, path, dry_run):
+        if not dry_run:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    @classmethod
+    def gc(cls, dry_run=True):
+        """Adopt legacy files, clear dangling pdf_paths and delete unreferenced artifacts"""
+        now = time.time()
+        stats = {'dry_run': dry_run, 'adopted': 0, 'dangling_cleared': 0, 'artifacts_deleted': 0,
+                 'orphans_deleted': 0, 'loose_deleted': 0, 'bytes_freed': 0}
+        
+        # Reports pointing at missing files, and legacy loose files to move into the store
+        # Paths reports point at once adoption is done; a dry run works out the same set without moving files
+        reports = ConformityReport.query.filter(ConformityReport.pdf_path.isnot(None)).all()
+        adopted = set()
+        referenced = set()
+        for report in reports:
+            if not os.path.exists(report.pdf_path):
+                stats['dangling_cleared'] += 1
+                if not dry_run:
+                    report.pdf_path = None
+                    report.pdf_generated = False
+            elif not cls.is_object(report.pdf_path):
+                stats['adopted'] += 1
+                adopted.add(os.path.abspath(report.pdf_path))
+                if dry_run:
+                    stored = cls.object_path(cls.file_sha256(report.pdf_path))
+                else:
+                    staged = cls.staging_path(f'{uuid.uuid4().hex}.pdf')
+                    shutil.copyfile(report.pdf_path, staged)
+                    stored = report.pdf_path = cls.put_file(staged)
+                referenced.add(os.path.abspath(stored))
+            else:
+                referenced.add(os.path.abspath(report.pdf_path))
+        if not dry_run:
+            db.session.flush()
+        
+        # Manifest entries nothing points at any more
+        manifest = {}
+        for artifact in ReportArtifact.query.all():
+            path = os.path.abspath(artifact.path)
+            manifest[path] = artifact
+            if (path not in referenced and cls._is_stale(path, now)) or not os.path.exists(path):
+                stats['artifacts_deleted'] += 1
+                stats['bytes_freed'] += artifact.size_bytes if os.path.exists(path) else 0
+                cls._remove(path, dry_run)
+                if not dry_run:
+                    db.session.delete(artifact)
+        
+        # Stored objects missing from the manifest, and leftover staging files
+        for directory in (cls.objects_dir(), os.path.join(cls.root(), 'staging')):
+            for dirpath, _, filenames in os.walk(directory):
+                for name in filenames:
+                    path = os.path.abspath(os.path.join(dirpath, name))
+                    if path not in manifest and path not in referenced and cls._is_stale(path, now):
+                        stats['orphans_deleted'] += 1
+                        stats['bytes_freed'] += os.path.getsize(path)
+                        cls._remove(path, dry_run)
+        
+        # Timestamp-named PDFs from before the store; the ones just adopted were copied in above
+        if os.path.isdir(cls.root()):
+            for name in os.listdir(cls.root()):
+                path = os.path.abspath(os.path.join(cls.root(), name))
+                if (name.endswith('.pdf') and os.path.isfile(path) and path not in referenced
+                        and (path in adopted or cls._is_stale(path, now))):
+                    stats['loose_deleted'] += 1
+                    stats['bytes_freed'] += os.path.getsize(path)
+                    cls._remove(path, dry_run)
+        
+        if not dry_run:
+            db.session.commit()
+        logger.info(f"Artifact GC {'(dry run) ' if dry_run else ''}completed: {stats}")
+        return stats
+    
+    @classmethod
+    def metrics(cls):
+        """Disk usage of the store and how much deduplication saved"""
+        usage = {'objects': [0, 0], 'staging': [0, 0], 'loose': [0, 0]}
+        if os.path.isdir(cls.root()):
+            for dirpath, _, filenames in os.walk(cls.root()):
+                relative = os.path.relpath(dirpath, cls.root())
+                bucket = 'loose' if relative == '.' else relative.split(os.sep)[0]
+                if bucket not in usage:
+                    continue
+                for name in filenames:
+                    usage[bucket][0] += 1
+                    usage[bucket][1] += os.path.getsize(os.path.join(dirpath, name))
+        
+        totals = db.session.query(
+            db.func.count(ReportArtifact.id),
+            db.func.coalesce(db.func.sum(ReportArtifact.size_bytes), 0),
+            db.func.coalesce(db.func.sum((ReportArtifact.store_count - 1) * ReportArtifact.size_bytes), 0)
+        ).one()
+        referenced = db.session.query(db.func.count(db.distinct(ConformityReport.pdf_path))).filter(
+            ConformityReport.pdf_path.isnot(None)).scalar()
+        disk = shutil.disk_usage(cls.root() if os.path.isdir(cls.root()) else '.')
+        
+        return {
+            'manifest_artifacts': totals[0],
+            'manifest_bytes': int(totals[1]),
+            'dedupe_bytes_saved': int(totals[2]),
+            'referenced_paths': referenced,
+            'files': {bucket: {'count': count, 'bytes': size} for bucket, (count, size) in usage.items()},
+            'volume': {'total_bytes': disk.total, 'used_bytes': disk.used, 'free_bytes': disk.free}
+        }
+
+# ===== REPORT ARTIFACT DELIVERY =====
+
+class ArtifactDelivery:
+    """Conditional, range-aware delivery of stored report files"""
+    
+    HASH_CHUNK = 1024 * 1024
+    
+    _hashes = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def content_hash(cls, path):
+        """SHA-256 of a stored file, recomputed only when its mtime or size changes"""
+        path = os.path.abspath(path)
+        if ArtifactStore.is_object(path):
+            return os.path.splitext(os.path.basename(path))[0]
+        
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            cached = cls._hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            chunk = f.read(cls.HASH_CHUNK)
+            while chunk:
+                digest.update(chunk)
+                chunk = f.read(cls.HASH_CHUNK)
+        
+        with cls._lock:
+            cls._hashes[path] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+    
+    @classmethod
+    def download_url(cls, report):
+        """Download link carrying the content version, so browsers may cache it indefinitely"""
+        if report.pdf_path and os.path.exists(report.pdf_path):
+            return url_for('download_report', report_id=report.id, v=cls.content_hash(report.pdf_path)[:16])
+        return url_for('download_report', report_id=report.id)
+    
+    @classmethod
+    def send(cls, path, download_name, mimetype='application/pdf'):
+        """Serve a stored file with a strong ETag, Range support and the configured offload mode"""
+        etag = cls.content_hash(path)
+        
+        if app.config['ARTIFACT_SENDFILE_MODE'] == 'x-accel':
+            response = cls._accel_response(path, download_name, mimetype, etag)
+        else:
+            # Werkzeug answers If-None-Match / Range / If-Range itself; with USE_X_SENDFILE it
+            # only emits the X-Sendfile header and the front server streams the bytes
+            response = send_file(os.path.abspath(path), mimetype=mimetype, as_attachment=True,
+                                 download_name=download_name, etag=etag, conditional=True, max_age=None)
+        
+        # Versioned URLs never change content; unversioned ones revalidate (a cheap 304)
+        if request.args.get('v') == etag[:16]:
+            response.headers['Cache-Control'] = f"private, max-age={app.config['ARTIFACT_MAX_AGE']}, immutable"
+        else:
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @classmethod
+    def _accel_response(cls, path, download_name, mimetype, etag):
+        """Hand the file to nginx through an internal location; nginx serves ranges itself"""
+        root = os.path.abspath(app.config['ARTIFACT_ROOT'])
+        relative = os.path.relpath(os.path.abspath(path), root)
+        if relative.startswith('..'):
+            abort(404)
+        
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{app.config['ARTIFACT_ACCEL_PREFIX'].rstrip('/')}/{relative.replace(os.sep, '/')}"
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        response.set_etag(etag)
+        return response.make_conditional(request)
 
 # ===== 3D VISUALIZATION ENGINE =====
 
+class PlotlyAsset:
+    """plotly.js served once per deployment as a fingerprinted, far-future cached asset"""
+    
+    MAX_AGE = 365 * 24 * 3600
+    
+    _lock = threading.Lock()
+    _source = None
+    _fingerprint = None
+    
+    @classmethod
+    def _load(cls):
+        with cls._lock:
+            if cls._source is None:
+                cls._source = get_plotlyjs().encode('utf-8')
+                cls._fingerprint = hashlib.sha256(cls._source).hexdigest()[:12]
+        return cls._source, cls._fingerprint
+    
+    @classmethod
+    def fingerprint(cls):
+        return cls._load()[1]
+    
+    @classmethod
+    def url(cls):
+        return f'/assets/plotly-{cls.fingerprint()}.min.js'
+    
+    @classmethod
+    def script_tag(cls):
+        return f'<script src="{cls.url()}"></script>'
+    
+    @classmethod
+    def response(cls, fingerprint):
+        """The bundle for a fingerprinted URL; its bytes can never change, so it is cacheable forever"""
+        source, current = cls._load()
+        if fingerprint != current:
+            return redirect(cls.url())
+        
+        response = Response(source, mimetype='application/javascript')
+        response.headers['Cache-Control'] = f'public, max-age={cls.MAX_AGE}, immutable'
+        response.set_etag(current)
+        return response.make_conditional(request)
+
 class Advanced3DVisualizationEngine:
     """Advanced 3D visualization and interactive dashboards"""
     
+    @staticmethod
+    def figure_json(fig):
+        """Compact figure JSON (data + layout only) for client-side Plotly.newPlot"""
+        return fig.to_json(pretty=False, remove_uids=True)
+    
+    @staticmethod
+    def embed_json(figure_json, element_id):
+        """Figure div drawn client-side from stored figure JSON (page must include PlotlyAsset.script_tag())"""
+        # Site names are user input; keep them from closing the script element
+        safe_json = figure_json.replace('</', '<\\/')
+        return f'''
+        <div id="{element_id}"></div>
+        <script>
+            (function() {{
+                const figure = {safe_json};
+                Plotly.newPlot('{element_id}', figure.data, figure.layout, {{responsive: true}});
+            }})();
+        </script>
+        '''
+    
+    @staticmethod
+    def embed(fig):
+        """Figure div that loads plotly.js from the fingerprinted asset instead of inlining it"""
+        return fig.to_html(include_plotlyjs=PlotlyAsset.url(), full_html=False)
+    
     @staticmethod
     def create_comprehensive_dashboard(report):
         """Create comprehensive interactive dashboard"""
         try:
-            from plotly.subplots import make_subplots
-            
-            fig = make_subplots(
-                rows=2, cols=2,
-                subplot_titles=('Conformity Assessment', 'Risk Analysis', 'Cost Breakdown', 'Timeline Planning'),
-                specs=[[{"type": "indicator"}, {"type": "bar"}],
-                       [{"type": "pie"}, {"type": "scatter"}]]
-            )
-            
-            # Conformity gauge
-            fig.add_trace(
-                go.Indicator(
-                    mode="gauge+number+delta",
-                    value=report.conformity_score or 0,
-                    domain={'x': [0, 1], 'y': [0, 1]},
-                    title={'text': "Conformity Score (%)"},
-                    delta={'reference': 85},
-                    gauge={
-                        'axis': {'range': [None, 100]},
-                        'bar': {'color': "#059669" if (report.conformity_score or 0) >= 85 else "#d97706"},
-                        'steps': [
-                            {'range': [0, 50], 'color': "#fecaca"},
-                            {'range': [50, 85], 'color': "#fef3c7"},
-                            {'range': [85, 100], 'color': "#d1fae5"}
-                        ],
-                        'threshold': {
-                            'line': {'color': "#dc2626", 'width': 4},
-                            'thickness': 0.75,
-                            'value': 90
-                        }
-                    }
-                ),
-                row=1, col=1
-            )
-            
-            # Risk assessment
-            risk_levels = ['Low', 'Medium', 'High', 'Critical']
-            risk_counts = [1 if report.risk_assessment == level else 0 for level in risk_levels]
-            risk_colors = ['#059669', '#d97706', '#dc2626', '#7c2d12']
-            
-            fig.add_trace(
-                go.Bar(x=risk_levels, y=risk_counts, marker_color=risk_colors, name="Risk Level"),
-                row=1, col=2
-            )
-            
-            # Cost breakdown
-            total_cost = report.estimated_cost or 10000
-            cost_categories = ['Assessment', 'Modifications', 'Systems', 'Compliance', 'Management']
-            cost_values = [5000, total_cost * 0.4, total_cost * 0.3, total_cost * 0.2, total_cost * 0.1]
-            
-            fig.add_trace(
-                go.Pie(labels=cost_categories, values=cost_values, name="Cost Distribution"),
-                row=2, col=1
-            )
-            
-            # Timeline analysis
-            timeline_days = report.modification_timeline or 45
-            phases = ['Planning', 'Permits', 'Modification', 'Installation', 'Testing']
-            phase_days = [timeline_days * 0.2, timeline_days * 0.1, timeline_days * 0.4, 
-                         timeline_days * 0.2, timeline_days * 0.1]
-            
-            fig.add_trace(
-                go.Scatter(x=phases, y=phase_days, mode='lines+markers', name="Project Timeline"),
-                row=2, col=2
-            )
-            
-            fig.update_layout(
-                title="Professional CT Scanner Analysis Dashboard",
-                height=800,
-                showlegend=False,
-                font=dict(family="Inter", size=12)
-            )
-            
-            return fig.to_html(include_plotlyjs='inline')
-            
+            return Advanced3DVisualizationEngine.embed(Advanced3DVisualizationEngine.dashboard_figure(report))
         except Exception as e:
             logger.error(f"Dashboard generation failed: {e}")
             return "<div class='alert alert-warning'>Interactive dashboard temporarily unavailable</div>"
     
+    @staticmethod
+    def dashboard_figure(report):
+        """Build the four-panel analysis dashboard figure"""
+        from plotly.subplots import make_subplots
+        
+        fig = make_subplots(
+            rows=2, cols=2,
+            subplot_titles=('Conformity Assessment', 'Risk Analysis', 'Cost Breakdown', 'Timeline Planning'),
+            specs=[[{"type": "indicator"}, {"type": "bar"}],
+                   [{"type": "pie"}, {"type": "scatter"}]]
+        )
+        
+        # Conformity gauge
+        fig.add_trace(
+            go.Indicator(
+                mode="gauge+number+delta",
+                value=report.conformity_score or 0,
+                domain={'x': [0, 1], 'y': [0, 1]},
+                title={'text': "Conformity Score (%)"},
+                delta={'reference': 85},
+                gauge={
+                    'axis': {'range': [None, 100]},
+                    'bar': {'color': "#059669" if (report.conformity_score or 0) >= 85 else "#d97706"},
+                    'steps': [
+                        {'range': [0, 50], 'color': "#fecaca"},
+                        {'range': [50, 85], 'color': "#fef3c7"},
+                        {'range': [85, 100], 'color': "#d1fae5"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "#dc2626", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 90
+                    }
+                }
+            ),
+            row=1, col=1
+        )
+        
+        # Risk assessment
+        risk_levels = ['Low', 'Medium', 'High', 'Critical']
+        risk_counts = [1 if report.risk_assessment == level else 0 for level in risk_levels]
+        risk_colors = ['#059669', '#d97706', '#dc2626', '#7c2d12']
+        
+        fig.add_trace(
+            go.Bar(x=risk_levels, y=risk_counts, marker_color=risk_colors, name="Risk Level"),
+            row=1, col=2
+        )
+        
+        # Cost breakdown
+        total_cost = report.estimated_cost or 10000
+        cost_categories = ['Assessment', 'Modifications', 'Systems', 'Compliance', 'Management']
+        cost_values = [5000, total_cost * 0.4, total_cost * 0.3, total_cost * 0.2, total_cost * 0.1]
+        
+        fig.add_trace(
+            go.Pie(labels=cost_categories, values=cost_values, name="Cost Distribution"),
+            row=2, col=1
+        )
+        
+        # Timeline analysis
+        timeline_days = report.modification_timeline or 45
+        phases = ['Planning', 'Permits', 'Modification', 'Installation', 'Testing']
+        phase_days = [timeline_days * 0.2, timeline_days * 0.1, timeline_days * 0.4, 
+                     timeline_days * 0.2, timeline_days * 0.1]
+        
+        fig.add_trace(
+            go.Scatter(x=phases, y=phase_days, mode='lines+markers', name="Project Timeline"),
+            row=2, col=2
+        )
+        
+        fig.update_layout(
+            title="Professional CT Scanner Analysis Dashboard",
+            height=800,
+            showlegend=False,
+            font=dict(family="Inter", size=12)
+        )
+        
+        return fig
+    
     @staticmethod
     def create_professional_3d_model(site_spec):
         """Create professional 3D room model"""
         try:
-            scanner = site_spec.scanner_model
-            
-            fig = go.Figure()
-            
-            # Room dimensions
-            room_l, room_w, room_h = site_spec.room_length, site_spec.room_width, site_spec.room_height
-            req_l, req_w, req_h = scanner.min_room_length, scanner.min_room_width, scanner.min_room_height
-            
-            # Room structure
-            room_vertices = [
-                [0, 0, 0], [room_l, 0, 0], [room_l, room_w, 0], [0, room_w, 0],  # floor
-                [0, 0, room_h], [room_l, 0, room_h], [room_l, room_w, room_h], [0, room_w, room_h]  # ceiling
-            ]
-            
-            # Room mesh
-            fig.add_trace(go.Mesh3d(
-                x=[v[0] for v in room_vertices],
-                y=[v[1] for v in room_vertices],
-                z=[v[2] for v in room_vertices],
-                i=[0, 0, 0, 4, 4, 1],
-                j=[1, 3, 4, 7, 5, 2],
-                k=[2, 7, 1, 3, 6, 6],
-                opacity=0.3,
-                color='lightblue',
-                name='Actual Room'
-            ))
-            
-            # Required space indication
-            req_vertices = [
-                [0, 0, 0], [req_l, 0, 0], [req_l, req_w, 0], [0, req_w, 0],
-                [0, 0, req_h], [req_l, 0, req_h], [req_l, req_w, req_h], [0, req_w, req_h]
-            ]
-            
-            fig.add_trace(go.Mesh3d(
-                x=[v[0] for v in req_vertices],
-                y=[v[1] for v in req_vertices],
-                z=[v[2] for v in req_vertices],
-                i=[0, 0, 0, 4, 4, 1],
-                j=[1, 3, 4, 7, 5, 2],
-                k=[2, 7, 1, 3, 6, 6],
-                opacity=0.2,
-                color='red',
-                name='Required Space'
-            ))
-            
-            # CT scanner representation
-            scanner_l = min(req_l * 0.7, room_l * 0.7)
-            scanner_w = min(req_w * 0.5, room_w * 0.5)
-            scanner_h = min(req_h * 0.8, room_h * 0.8)
-            
-            # Center the scanner
-            start_x = (room_l - scanner_l) / 2
-            start_y = (room_w - scanner_w) / 2
-            
-            scanner_vertices = [
-                [start_x, start_y, 0], [start_x + scanner_l, start_y, 0],
-                [start_x + scanner_l, start_y + scanner_w, 0], [start_x, start_y + scanner_w, 0],
-                [start_x, start_y, scanner_h], [start_x + scanner_l, start_y, scanner_h],
-                [start_x + scanner_l, start_y + scanner_w, scanner_h], [start_x, start_y + scanner_w, scanner_h]
-            ]
-            
-            fig.add_trace(go.Mesh3d(
-                x=[v[0] for v in scanner_vertices],
-                y=[v[1] for v in scanner_vertices],
-                z=[v[2] for v in scanner_vertices],
-                color='#1e3a8a',
-                opacity=0.8,
-                name=f'{scanner.manufacturer} {scanner.model_name}'
-            ))
-            
-            # Add measurement annotations
-            fig.add_trace(go.Scatter3d(
-                x=[room_l/2], y=[-0.5], z=[0],
-                mode='text',
-                text=[f'Length: {room_l}m'],
-                textfont=dict(size=14, color='darkblue'),
-                showlegend=False
-            ))
-            
-            fig.update_layout(
-                title=f'Professional 3D Analysis: {site_spec.site_name}<br>{scanner.manufacturer} {scanner.model_name}',
-                scene=dict(
-                    xaxis_title='Length (m)',
-                    yaxis_title='Width (m)',
-                    zaxis_title='Height (m)',
-                    camera=dict(
-                        eye=dict(x=1.5, y=1.5, z=1.5)
-                    ),
-                    aspectmode='cube'
-                ),
-                height=600,
-                font=dict(family="Inter", size=12)
-            )
-            
-            return fig.to_html(include_plotlyjs='inline')
-            
+            return Advanced3DVisualizationEngine.embed(Advanced3DVisualizationEngine.room_model_figure(site_spec))
         except Exception as e:
             logger.error(f"3D model generation failed: {e}")
             return "<div class='alert alert-warning'>3D visualization temporarily unavailable</div>"
+    
+    @staticmethod
+    def room_model_figure(site_spec):
+        """Build the 3D room / required space / scanner figure"""
+        scanner = site_spec.scanner_model
+        
+        fig = go.Figure()
+        
+        # Room dimensions
+        room_l, room_w, room_h = site_spec.room_length, site_spec.room_width, site_spec.room_height
+        req_l, req_w, req_h = scanner.min_room_length, scanner.min_room_width, scanner.min_room_height
+        
+        # Room structure
+        room_vertices = [
+            [0, 0, 0], [room_l, 0, 0], [room_l, room_w, 0], [0, room_w, 0],  # floor
+            [0, 0, room_h], [room_l, 0, room_h], [room_l, room_w, room_h], [0, room_w, room_h]  # ceiling
+        ]
+        
+        # Room mesh
+        fig.add_trace(go.Mesh3d(
+            x=[v[0] for v in room_vertices],
+            y=[v[1] for v in room_vertices],
+            z=[v[2] for v in room_vertices],
+            i=[0, 0, 0, 4, 4, 1],
+            j=[1, 3, 4, 7, 5, 2],
+            k=[2, 7, 1, 3, 6, 6],
+            opacity=0.3,
+            color='lightblue',
+            name='Actual Room'
+        ))
+        
+        # Required space indication
+        req_vertices = [
+            [0, 0, 0], [req_l, 0, 0], [req_l, req_w, 0], [0, req_w, 0],
+            [0, 0, req_h], [req_l, 0, req_h], [req_l, req_w, req_h], [0, req_w, req_h]
+        ]
+        
+        fig.add_trace(go.Mesh3d(
+            x=[v[0] for v in req_vertices],
+            y=[v[1] for v in req_vertices],
+            z=[v[2] for v in req_vertices],
+            i=[0, 0, 0, 4, 4, 1],
+            j=[1, 3, 4, 7, 5, 2],
+            k=[2, 7, 1, 3, 6, 6],
+            opacity=0.2,
+            color='red',
+            name='Required Space'
+        ))
+        
+        # CT scanner representation
+        scanner_l = min(req_l * 0.7, room_l * 0.7)
+        scanner_w = min(req_w * 0.5, room_w * 0.5)
+        scanner_h = min(req_h * 0.8, room_h * 0.8)
+        
+        # Center the scanner
+        start_x = (room_l - scanner_l) / 2
+        start_y = (room_w - scanner_w) / 2
+        
+        scanner_vertices = [
+            [start_x, start_y, 0], [start_x + scanner_l, start_y, 0],
+            [start_x + scanner_l, start_y + scanner_w, 0], [start_x, start_y + scanner_w, 0],
+            [start_x, start_y, scanner_h], [start_x + scanner_l, start_y, scanner_h],
+            [start_x + scanner_l, start_y + scanner_w, scanner_h], [start_x, start_y + scanner_w, scanner_h]
+        ]
+        
+        fig.add_trace(go.Mesh3d(
+            x=[v[0] for v in scanner_vertices],
+            y=[v[1] for v in scanner_vertices],
+            z=[v[2] for v in scanner_vertices],
+            color='#1e3a8a',
+            opacity=0.8,
+            name=f'{scanner.manufacturer} {scanner.model_name}'
+        ))
+        
+        # Add measurement annotations
+        fig.add_trace(go.Scatter3d(
+            x=[room_l/2], y=[-0.5], z=[0],
+            mode='text',
+            text=[f'Length: {room_l}m'],
+            textfont=dict(size=14, color='darkblue'),
+            showlegend=False
+        ))
+        
+        fig.update_layout(
+            title=f'Professional 3D Analysis: {site_spec.site_name}<br>{scanner.manufacturer} {scanner.model_name}',
+            scene=dict(
+                xaxis_title='Length (m)',
+                yaxis_title='Width (m)',
+                zaxis_title='Height (m)',
+                camera=dict(
+                    eye=dict(x=1.5, y=1.5, z=1.5)
+                ),
+                aspectmode='cube'
+            ),
+            height=600,
+            font=dict(family="Inter", size=12)
+        )
+        
+        return fig
+
+# ===== 3D ROOM GEOMETRY =====
+
+class RoomGeometry:
+    """Room, clearance envelope and scanner meshes as little-endian float32/uint32 buffers"""
+    
+    FORMAT = 'promamec-geometry/1'
+    RING_SEGMENTS = 48
+    
+    # Unit cube corners and its 12 outward-facing triangles
+    BOX_CORNERS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                            [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=np.float32)
+    BOX_TRIANGLES = np.array([[0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7],
+                              [0, 1, 5], [0, 5, 4], [1, 2, 6], [1, 6, 5],
+                              [2, 3, 7], [2, 7, 6], [3, 0, 4], [3, 4, 7]], dtype=np.uint32)
+    
+    @classmethod
+    def box(cls, origin, size):
+        return cls.BOX_CORNERS * np.asarray(size, dtype=np.float32) + np.asarray(origin, dtype=np.float32), cls.BOX_TRIANGLES
+    
+    @classmethod
+    def boxes(cls, origins, sizes):
+        """Many boxes as one mesh: (N, 3) origins and sizes -> 8N vertices, 12N triangles"""
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        sizes = np.asarray(sizes, dtype=np.float32).reshape(-1, 3)
+        positions = cls.BOX_CORNERS[None, :, :] * sizes[:, None, :] + origins[:, None, :]
+        offsets = (np.arange(len(origins), dtype=np.uint32) * len(cls.BOX_CORNERS))[:, None, None]
+        triangles = cls.BOX_TRIANGLES[None, :, :] + offsets
+        return positions.reshape(-1, 3), triangles.reshape(-1, 3)
+    
+    @classmethod
+    def ring(cls, center, outer_radius, inner_radius, depth, segments=None):
+        """Gantry: annular cylinder around the x axis"""
+        segments = segments or cls.RING_SEGMENTS
+        angles = np.linspace(0, 2 * np.pi, segments, endpoint=False, dtype=np.float32)
+        cos, sin = np.cos(angles), np.sin(angles)
+        
+        # Vertex rings: outer-front, outer-back, inner-front, inner-back
+        rings = []
+        for radius, x in ((outer_radius, 0), (outer_radius, depth), (inner_radius, 0), (inner_radius, depth)):
+            rings.append(np.column_stack([np.full(segments, x, dtype=np.float32), cos * radius, sin * radius]))
+        positions = np.vstack(rings) + (np.asarray(center, dtype=np.float32) - [depth / 2, 0, 0])
+        
+        a = np.arange(segments, dtype=np.uint32)
+        b = (a + 1) % segments
+        of, ob, inf, inb = 0, segments, 2 * segments, 3 * segments
+        quads = [(of, ob), (inb, inf), (inf, of), (ob, inb)]  # outer wall, inner wall, front face, back face
+        # Wound counter-clockwise seen from outside, like BOX_TRIANGLES
+        triangles = np.vstack([np.vstack([np.column_stack([p + a, q + b, q + a]),
+                                          np.column_stack([p + a, p + b, q + b])]) for p, q in quads])
+        return positions.astype(np.float32), triangles.astype(np.uint32)
+    
+    @staticmethod
+    def merge(parts):
+        """Concatenate (positions, triangles) pairs into one mesh"""
+        positions, triangles, offset = [], [], 0
+        for part_positions, part_triangles in parts:
+            positions.append(part_positions)
+            triangles.append(part_triangles + offset)
+            offset += len(part_positions)
+        return np.vstack(positions).astype(np.float32), np.vstack(triangles).astype(np.uint32)
+    
+    @staticmethod
+    def encode(array, dtype):
+        return base64.b64encode(np.ascontiguousarray(array, dtype=dtype).tobytes()).decode('ascii')
+    
+    @classmethod
+    def mesh(cls, name, positions, triangles, color, opacity):
+        return {
+            'name': name,
+            'color': color,
+            'opacity': opacity,
+            'vertex_count': int(len(positions)),
+            'triangle_count': int(len(triangles)),
+            'positions': cls.encode(positions, '<f4'),
+            'indices': cls.encode(triangles, '<u4')
+        }
+    
+    @classmethod
+    def scanner_parts(cls, origin, size):
+        """Gantry ring plus patient couch inside a scanner footprint"""
+        x, y, z = origin
+        length, width, height = size
+        radius = min(width, height) / 2
+        depth = min(0.9, length * 0.3)
+        gantry_center = (x + length * 0.35, y + width / 2, z + radius)
+        couch_width = min(0.6, width * 0.4)
+        return [
+            cls.ring(gantry_center, radius, radius * 0.45, depth),
+            cls.box((x, y + (width - couch_width) / 2, z + radius * 0.55), (length, couch_width, 0.12)),
+            cls.box((x + length * 0.55, y + (width - couch_width * 0.6) / 2, z), (length * 0.3, couch_width * 0.6, radius * 0.55))
+        ]
+    
+    @staticmethod
+    def dimensions(site_spec):
+        scanner = site_spec.scanner_model
+        room = (site_spec.room_length, site_spec.room_width, site_spec.room_height)
+        required = (scanner.min_room_length, scanner.min_room_width, scanner.min_room_height)
+        footprint = (min(required[0] * 0.7, room[0] * 0.7), min(required[1] * 0.5, room[1] * 0.5),
+                     min(required[2] * 0.8, room[2] * 0.8))
+        return room, required, footprint
+    
+    @classmethod
+    def signature(cls, site_spec):
+        scanner = site_spec.scanner_model
+        return hashlib.sha1(repr((cls.FORMAT, site_spec.site_name, cls.dimensions(site_spec), scanner.manufacturer,
+                                  scanner.model_name)).encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def for_site(cls, site_spec):
+        """Geometry payload of one room with its clearance envelope and scanner"""
+        scanner = site_spec.scanner_model
+        room, required, footprint = cls.dimensions(site_spec)
+        scanner_origin = ((room[0] - footprint[0]) / 2, (room[1] - footprint[1]) / 2, 0)
+        
+        meshes = [
+            cls.mesh('Actual Room', *cls.box((0, 0, 0), room), 'lightblue', 0.3),
+            cls.mesh('Required Space', *cls.box((0, 0, 0), required), 'red', 0.2),
+            cls.mesh(f'{scanner.manufacturer} {scanner.model_name}',
+                     *cls.merge(cls.scanner_parts(scanner_origin, footprint)), '#1e3a8a', 0.8)
+        ]
+        return {
+            'format': cls.FORMAT,
+            'units': 'm',
+            'title': f'{site_spec.site_name} - {scanner.manufacturer} {scanner.model_name}',
+            'bounds': {'min': [0, 0, 0], 'max': [float(max(room[i], required[i])) for i in range(3)]},
+            'meshes': meshes
+        }
+    
+    # Facility overview layout and conformity colour scale: hard bands at the 50 / 85 status thresholds
+    FACILITY_GAP = 1.5
+    CONFORMITY_COLORSCALE = [[0, '#dc2626'], [0.5, '#dc2626'], [0.5, '#d97706'], [0.85, '#d97706'],
+                             [0.85, '#059669'], [1, '#059669']]
+    
+    @staticmethod
+    def project_sites(project_id):
+        """Rooms of a project with the conformity score of each room's latest report"""
+        sites = SiteSpecification.query.filter_by(project_id=project_id).order_by(SiteSpecification.id).all()
+        latest = {}
+        for site_id, score in db.session.query(
+                ConformityReport.site_specification_id, ConformityReport.conformity_score
+        ).filter(ConformityReport.project_id == project_id).order_by(ConformityReport.created_at):
+            latest[site_id] = score
+        return sites, latest
+    
+    @classmethod
+    def facility_signature(cls, sites, latest):
+        return hashlib.sha1(repr((cls.FORMAT, [(site.id, site.site_name, cls.dimensions(site), latest.get(site.id))
+                                               for site in sites])).encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def for_project(cls, project, sites, latest):
+        """Every room of a project on one grid, batched into a handful of mesh traces"""
+        if not sites:
+            return {'format': cls.FORMAT, 'units': 'm', 'title': f'{project.name} - no rooms', 'meshes': []}
+        
+        dims = np.array([cls.dimensions(site) for site in sites], dtype=np.float32)  # (N, room/required/footprint, xyz)
+        room, required, footprint = dims[:, 0], dims[:, 1], dims[:, 2]
+        
+        # Grid cells sized to the largest room or envelope so nothing overlaps
+        cell = np.maximum(room, required).max(axis=0)[:2] + cls.FACILITY_GAP
+        columns = int(np.ceil(np.sqrt(len(sites))))
+        index = np.arange(len(sites))
+        origins = np.column_stack([(index % columns) * cell[0], (index // columns) * cell[1],
+                                   np.zeros(len(sites))]).astype(np.float32)
+        
+        scores = np.array([np.nan if latest.get(site.id) is None else latest[site.id] for site in sites], dtype=np.float32)
+        assessed = ~np.isnan(scores)
+        meshes = []
+        
+        if assessed.any():
+            positions, triangles = cls.boxes(origins[assessed], room[assessed])
+            mesh = cls.mesh(f'Rooms ({int(assessed.sum())} assessed)', positions, triangles, None, 0.45)
+            mesh.update({
+                'intensity': cls.encode(np.repeat(scores[assessed], len(cls.BOX_CORNERS)), '<f4'),
+                'colorscale': cls.CONFORMITY_COLORSCALE,
+                'cmin': 0,
+                'cmax': 100,
+                'colorbar_title': 'Conformity %'
+            })
+            meshes.append(mesh)
+        if (~assessed).any():
+            meshes.append(cls.mesh(f'Rooms ({int((~assessed).sum())} not assessed)',
+                                   *cls.boxes(origins[~assessed], room[~assessed]), '#9ca3af', 0.3))
+        
+        meshes.append(cls.mesh('Required Space', *cls.boxes(origins, required), 'red', 0.12))
+        scanner_origins = origins + np.column_stack([(room[:, 0] - footprint[:, 0]) / 2,
+                                                     (room[:, 1] - footprint[:, 1]) / 2,
+                                                     np.zeros(len(sites))]).astype(np.float32)
+        meshes.append(cls.mesh('Scanners', *cls.boxes(scanner_origins, footprint), '#1e3a8a', 0.85))
+        
+        label_positions = origins + np.column_stack([room[:, 0] / 2, room[:, 1] / 2, room[:, 2] + 0.4])
+        labels = [f'{site.site_name} ({score:.0f}%)' if ok else f'{site.site_name} (n/a)'
+                  for site, score, ok in zip(sites, scores, assessed)]
+        
+        return {
+            'format': cls.FORMAT,
+            'units': 'm',
+            'title': f'{project.name} - Facility Overview ({len(sites)} rooms)',
+            'meshes': meshes,
+            'labels': {'count': len(labels), 'positions': cls.encode(label_positions, '<f4'), 'text': labels}
+        }
+    
+    CLIENT_SCRIPT = """
+    <script>
+    window.PromamecGeometry = window.PromamecGeometry || {
+        decode: function(b64, ArrayType) {
+            const binary = atob(b64);
+            const bytes = new Uint8Array(binary.length);
+            for (let n = 0; n < binary.length; n++) bytes[n] = binary.charCodeAt(n);
+            return new ArrayType(bytes.buffer);
+        },
+        trace: function(mesh) {
+            const positions = this.decode(mesh.positions, Float32Array);
+            const indices = this.decode(mesh.indices, Uint32Array);
+            const x = new Float32Array(mesh.vertex_count), y = new Float32Array(mesh.vertex_count), z = new Float32Array(mesh.vertex_count);
+            for (let v = 0; v < mesh.vertex_count; v++) {
+                x[v] = positions[3 * v]; y[v] = positions[3 * v + 1]; z[v] = positions[3 * v + 2];
+            }
+            const i = new Uint32Array(mesh.triangle_count), j = new Uint32Array(mesh.triangle_count), k = new Uint32Array(mesh.triangle_count);
+            for (let t = 0; t < mesh.triangle_count; t++) {
+                i[t] = indices[3 * t]; j[t] = indices[3 * t + 1]; k[t] = indices[3 * t + 2];
+            }
+            const trace = {type: 'mesh3d', name: mesh.name, x: x, y: y, z: z, i: i, j: j, k: k,
+                           opacity: mesh.opacity, flatshading: true, showlegend: true};
+            if (mesh.intensity) {
+                trace.intensity = this.decode(mesh.intensity, Float32Array);
+                trace.colorscale = mesh.colorscale;
+                trace.cmin = mesh.cmin;
+                trace.cmax = mesh.cmax;
+                trace.colorbar = {title: mesh.colorbar_title || ''};
+            } else {
+                trace.color = mesh.color;
+            }
+            return trace;
+        },
+        render: function(elementId, url, height) {
+            const self = this;
+            return fetch(url, {credentials: 'same-origin'}).then(r => r.json()).then(function(geometry) {
+                const traces = geometry.meshes.map(m => self.trace(m));
+                if (geometry.labels) {
+                    const p = self.decode(geometry.labels.positions, Float32Array);
+                    const n = geometry.labels.count;
+                    const x = new Float32Array(n), y = new Float32Array(n), z = new Float32Array(n);
+                    for (let v = 0; v < n; v++) { x[v] = p[3 * v]; y[v] = p[3 * v + 1]; z[v] = p[3 * v + 2]; }
+                    traces.push({type: 'scatter3d', mode: 'text', x: x, y: y, z: z, text: geometry.labels.text,
+                                 textfont: {size: 10, color: '#1f2937'}, hoverinfo: 'text', showlegend: false});
+                }
+                Plotly.newPlot(elementId, traces, {
+                    title: geometry.title,
+                    height: height || 600,
+                    scene: {aspectmode: 'data', camera: {eye: {x: 1.5, y: 1.5, z: 1.5}},
+                            xaxis: {title: 'Length (m)'}, yaxis: {title: 'Width (m)'}, zaxis: {title: 'Height (m)'}},
+                    font: {family: 'Inter', size: 12}
+                }, {responsive: true});
+            });
+        }
+    };
+    </script>
+    """
+
+# ===== PRECOMPUTED REPORT FIGURES =====
+
+class ReportFigureStore:
+    """Figure JSON computed once per report revision and served from the database"""
+    
+    KINDS = ('dashboard', 'room_model')
+    
+    # Columns each figure is drawn from; edits to anything else leave stored figures valid
+    REPORT_FIELDS = ('conformity_score', 'risk_assessment', 'estimated_cost', 'modification_timeline', 'revision_number')
+    SITE_FIELDS = ('site_name', 'room_length', 'room_width', 'room_height', 'scanner_model_id')
+    
+    @staticmethod
+    def inputs(report, kind):
+        if kind == 'dashboard':
+            return (report.conformity_score, report.risk_assessment, report.estimated_cost, report.modification_timeline)
+        
+        site_spec = report.site_specification
+        scanner = site_spec.scanner_model
+        return (site_spec.site_name, site_spec.room_length, site_spec.room_width, site_spec.room_height,
+                scanner.manufacturer, scanner.model_name,
+                scanner.min_room_length, scanner.min_room_width, scanner.min_room_height)
+    
+    @classmethod
+    def revision_key(cls, report, kind):
+        digest = hashlib.sha1(repr(cls.inputs(report, kind)).encode('utf-8')).hexdigest()[:16]
+        return f'r{report.revision_number or 1}-{digest}'
+    
+    @staticmethod
+    def build(report, kind):
+        if kind == 'dashboard':
+            fig = Advanced3DVisualizationEngine.dashboard_figure(report)
+        else:
+            fig = Advanced3DVisualizationEngine.room_model_figure(report.site_specification)
+        return Advanced3DVisualizationEngine.figure_json(fig)
+    
+    @classmethod
+    def _store(cls, report, kind, stored=None):
+        key = cls.revision_key(report, kind)
+        figure_json = cls.build(report, kind)
+        if stored is None:
+            stored = ReportFigure.query.filter_by(report_id=report.id, kind=kind).first()
+        if stored:
+            stored.revision_key = key
+            stored.figure_json = figure_json
+            stored.created_at = datetime.utcnow()
+        else:
+            db.session.add(ReportFigure(report_id=report.id, kind=kind, revision_key=key, figure_json=figure_json))
+        return figure_json
+    
+    @classmethod
+    def refresh(cls, report, kinds=KINDS):
+        """Compute and store every figure for the report's current revision (caller commits)"""
+        for kind in kinds:
+            cls._store(report, kind)
+    
+    @classmethod
+    def get(cls, report, kind):
+        """Stored figure JSON for the current revision; built (not stored) when missing or stale
+        
+        Read paths never write: figures are stored by refresh() where reports and sites are written.
+        """
+        stored = ReportFigure.query.filter_by(report_id=report.id, kind=kind).first()
+        if stored and stored.revision_key == cls.revision_key(report, kind):
+            return stored.figure_json
+        return cls.build(report, kind)
+
+def _changed(target, fields):
+    state = db.inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+@event.listens_for(ConformityReport, 'after_update')
+def discard_stale_dashboard_figure(mapper, connection, target):
+    if _changed(target, ReportFigureStore.REPORT_FIELDS):
+        connection.execute(ReportFigure.__table__.delete().where(
+            ReportFigure.kind == 'dashboard', ReportFigure.report_id == target.id))
+
+@event.listens_for(SiteSpecification, 'after_update')
+def discard_stale_room_figures(mapper, connection, target):
+    if _changed(target, ReportFigureStore.SITE_FIELDS):
+        report_ids = db.select(ConformityReport.id).where(ConformityReport.site_specification_id == target.id)
+        connection.execute(ReportFigure.__table__.delete().where(
+            ReportFigure.kind == 'room_model', ReportFigure.report_id.in_(report_ids)))
 
 # ===== ENHANCED EMAIL NOTIFICATION SYSTEM =====
 
@@ -2394,6 +3487,26 @@ class ProfessionalEmailService:
         self.sender_email = os.environ.get('EMAIL_USER', 'solutions@promamec.com')
         self.sender_password = os.environ.get('EMAIL_PASSWORD', 'demo-password')
     
+    # 57 raw bytes encode to one 76-character MIME line
+    ATTACHMENT_CHUNK = 57 * 1024
+    
+    @classmethod
+    def _base64_payload(cls, pdf_source):
+        """Base64 text of an open file or buffer, encoded in MIME-line chunks (the raw bytes are never read whole)"""
+        if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+            view = memoryview(pdf_source)
+            read = lambda offset: view[offset:offset + cls.ATTACHMENT_CHUNK]
+            return ''.join(base64.encodebytes(read(offset)).decode('ascii')
+                           for offset in range(0, len(view), cls.ATTACHMENT_CHUNK))
+        
+        pdf_source.seek(0)
+        lines = []
+        chunk = pdf_source.read(cls.ATTACHMENT_CHUNK)
+        while chunk:
+            lines.append(base64.encodebytes(chunk).decode('ascii'))
+            chunk = pdf_source.read(cls.ATTACHMENT_CHUNK)
+        return ''.join(lines)
+    
     def send_professional_notification(self, report, recipients, pdf_buffer=None, include_dashboard=True):
         """Send professional email notification"""
         try:
@@ -2438,10 +3551,9 @@ Email: solutions@promamec.com
             
             # Attach PDF if provided
             if pdf_buffer:
-                pdf_buffer.seek(0)
                 part = MIMEBase('application', 'octet-stream')
-                part.set_payload(pdf_buffer.read())
-                encoders.encode_base64(part)
+                part.set_payload(self._base64_payload(pdf_buffer))
+                part['Content-Transfer-Encoding'] = 'base64'
                 part.add_header(
                     'Content-Disposition',
                     f'attachment; filename=Promamec_Professional_Analysis_{report.report_number}.pdf'
@@ -2454,7 +3566,7 @@ Email: solutions@promamec.com
             logger.info("Professional email notification system ready for production deployment")
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"Email notification failed: {e}")
             return False
@@ -2709,6 +3821,14 @@ class ProfessionalConformityReportAdminView(ProfessionalRoleRequiredMixin, Model
         'pdf_generated': lambda v, c, m, p: '✓' if m.pdf_generated else '✗',
         'email_sent': lambda v, c, m, p: '✓' if m.email_sent else '✗'
     }
+    
+    def after_model_change(self, form, model, is_created):
+        try:
+            ReportFigureStore.refresh(model)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Figure refresh failed for {model.report_number}: {e}")
 
 class ProfessionalManualRoomAdminView(ProfessionalRoleRequiredMixin, ModelView):
     column_list = ['site_name', 'project', 'engineer', 'assessment_completeness', 'assessment_confidence', 'created_at']
@@ -2722,6 +3842,15 @@ class ProfessionalSiteSpecAdminView(ProfessionalRoleRequiredMixin, ModelView):
     column_list = ['site_name', 'project', 'scanner_model', 'room_length', 'room_width', 'room_height', 'created_at']
     column_searchable_list = ['site_name', 'address']
     column_filters = ['project', 'scanner_model', 'has_hvac', 'accessibility_compliance']
+    
+    def after_model_change(self, form, model, is_created):
+        try:
+            for report in model.conformity_reports:
+                ReportFigureStore.refresh(report, kinds=('room_model',))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Room figure refresh failed for {model.site_name}: {e}")
 
 # ===== MAIN APPLICATION ROUTES =====
 
@@ -3764,10 +4893,10 @@ def ai_analysis():
             )
             
             # Continuing from where the code left off...
-
+            
             # Add NeuViz-specific analysis
             # Continuing from where the code left off...
-
+            
             # Add NeuViz-specific analysis
             if site_spec.scanner_model.is_neuviz:
                 report.neuviz_specific_analysis = f"NeuViz {site_spec.scanner_model.model_name} compliance analysis completed per {site_spec.scanner_model.neuviz_manual_ref}. Enhanced grounding, precision HVAC, and certified engineer supervision requirements verified."
@@ -3775,39 +4904,36 @@ def ai_analysis():
             db.session.add(report)
             db.session.commit()
             
-            # Generate PDF if requested
+            # Precompute dashboard figures for this revision
+            try:
+                ReportFigureStore.refresh(report)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Figure precompute failed for {report.report_number}: {e}")
+            
+            recipients = []
+            if form.send_email.data and form.email_recipients.data:
+                recipients = [email.strip() for email in form.email_recipients.data.split(',')]
+            
+            # Render the PDF in the worker pool; the email goes out with it when it is ready
             if form.generate_pdf.data:
                 try:
-                    pdf_generator = ProfessionalPDFReportGenerator()
-                    pdf_buffer = pdf_generator.generate_comprehensive_report(report, form.include_3d_visualization.data)
-                    
-                    # Save PDF
-                    pdf_filename = f"reports/Promamec_Analysis_{report.report_number}.pdf"
-                    os.makedirs('reports', exist_ok=True)
-                    
-                    with open(pdf_filename, 'wb') as f:
-                        f.write(pdf_buffer.getvalue())
-                    
-                    report.pdf_generated = True
-                    report.pdf_path = pdf_filename
-                    
+                    PDFRenderQueue.submit(report, form.include_3d_visualization.data,
+                                          recipients, form.include_3d_visualization.data)
+                    flash('Professional PDF report is rendering in the background.', 'info')
+                    recipients = []
                 except Exception as e:
-                    logger.error(f"PDF generation failed: {e}")
+                    logger.error(f"PDF job submission failed: {e}")
                     flash('Analysis completed, but PDF generation failed. Please try again.', 'warning')
             
-            # Send email if requested
-            if form.send_email.data and form.email_recipients.data:
+            # Send email now when no PDF is attached
+            if recipients:
                 try:
                     email_service = ProfessionalEmailService()
-                    recipients = [email.strip() for email in form.email_recipients.data.split(',')]
-                    
-                    pdf_buffer = None
-                    if report.pdf_generated and report.pdf_path and os.path.exists(report.pdf_path):
-                        with open(report.pdf_path, 'rb') as f:
-                            pdf_buffer = io.BytesIO(f.read())
                     
                     email_success = email_service.send_professional_notification(
-                        report, recipients, pdf_buffer, form.include_3d_visualization.data
+                        report, recipients, None, form.include_3d_visualization.data
                     )
                     
                     if email_success:
@@ -3970,8 +5096,39 @@ def view_report(report_id):
     """View comprehensive conformity report"""
     report = ConformityReport.query.get_or_404(report_id)
     
-    # Generate interactive dashboard
-    dashboard_html = Advanced3DVisualizationEngine.create_comprehensive_dashboard(report)
+    # Interactive dashboard from the stored figure for this revision
+    try:
+        dashboard_html = PlotlyAsset.script_tag() + Advanced3DVisualizationEngine.embed_json(
+            ReportFigureStore.get(report, 'dashboard'), f'dashboard-{report.id}')
+    except Exception as e:
+        logger.error(f"Dashboard generation failed: {e}")
+        dashboard_html = "<div class='alert alert-warning'>Interactive dashboard temporarily unavailable</div>"
+    
+    # Background PDF render still in progress
+    pdf_job = PDFRenderQueue.latest_for_report(report.id)
+    pdf_job_html = ''
+    if pdf_job and pdf_job['status'] in ('queued', 'running'):
+        pdf_job_html = f'''
+        <div class="alert alert-info" id="pdfJobStatus">
+            <i class="fas fa-spinner fa-spin"></i> Rendering professional PDF report...
+        </div>
+        <script>
+            (function poll() {{
+                fetch('/api/pdf-jobs/{pdf_job['job_id']}').then(r => r.json()).then(job => {{
+                    const box = document.getElementById('pdfJobStatus');
+                    if (job.status === 'completed') {{
+                        box.className = 'alert alert-success';
+                        box.innerHTML = '<i class="fas fa-check"></i> PDF ready - <a href="/download-report/{report.id}">download</a>';
+                    }} else if (job.status === 'failed') {{
+                        box.className = 'alert alert-warning';
+                        box.textContent = 'PDF generation failed - please try again.';
+                    }} else {{
+                        setTimeout(poll, 2000);
+                    }}
+                }});
+            }})();
+        </script>
+        '''
     
     content = f'''
     <div class="container-fluid">
@@ -3980,7 +5137,7 @@ def view_report(report_id):
                 <div class="d-flex justify-content-between align-items-center mb-4">
                     <h2 class="mb-0"><i class="fas fa-file-alt"></i> Professional Analysis Report</h2>
                     <div class="btn-group">
-                        {f'<a href="/download-report/{report.id}" class="btn btn-success"><i class="fas fa-download"></i> Download PDF</a>' if report.pdf_generated else ''}
+                        {f'<a href="{ArtifactDelivery.download_url(report)}" class="btn btn-success"><i class="fas fa-download"></i> Download PDF</a>' if report.pdf_generated else ''}
                         <a href="/ai-analysis" class="btn btn-promamec-secondary">
                             <i class="fas fa-plus"></i> New Analysis
                         </a>
@@ -3989,6 +5146,8 @@ def view_report(report_id):
             </div>
         </div>
         
+        {pdf_job_html}
+        
         <!-- Report Header -->
         <div class="row mb-4">
             <div class="col-12">
@@ -4088,12 +5247,231 @@ def download_report(report_id):
         flash('PDF report not available. Please regenerate the report.', 'error')
         return redirect(url_for('view_report', report_id=report_id))
     
-    return send_file(
-        report.pdf_path,
-        as_attachment=True,
-        download_name=f'Promamec_Professional_Analysis_{report.report_number}.pdf'
+    return ArtifactDelivery.send(report.pdf_path, f'Promamec_Professional_Analysis_{report.report_number}.pdf')
+
+@app.route('/download-project-reports/<int:project_id>')
+@login_required
+def download_project_reports(project_id):
+    """Stream every report PDF of a project as one ZIP bundle"""
+    project = Project.query.get_or_404(project_id)
+    
+    if current_user.role not in ['Admin', 'Engineer'] and project.client_email != current_user.email:
+        flash('Access denied.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    filename = secure_filename(f'Promamec_{project.name}_Reports.zip') or f'Promamec_Project_{project.id}_Reports.zip'
+    logger.info(f"Streaming report bundle for project {project.name}")
+    return Response(
+        stream_with_context(ProjectReportBundle.stream(project)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
     )
 
+@app.route('/api/artifacts/metrics')
+@login_required
+def api_artifact_metrics():
+    """Disk usage and dedupe metrics of the report artifact store"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify(ArtifactStore.metrics())
+
+@app.route('/api/artifacts/gc', methods=['POST'])
+@login_required
+def api_artifact_gc():
+    """Garbage-collect orphaned report artifacts (dry run unless dry_run is false)"""
+    if current_user.role != 'Admin':
+        return jsonify({'error': 'Access denied'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        return jsonify(ArtifactStore.gc(dry_run=data.get('dry_run', True) is not False))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Artifact GC failed: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/visualization-dashboard/<int:report_id>')
+@login_required
+def visualization_dashboard(report_id):
+    """Interactive dashboard and 3D room model served from precomputed figures"""
+    report = ConformityReport.query.get_or_404(report_id)
+    engine = Advanced3DVisualizationEngine
+    
+    try:
+        dashboard_html = engine.embed_json(ReportFigureStore.get(report, 'dashboard'), 'analysisDashboard')
+        geometry_url = url_for('api_site_geometry', site_id=report.site_specification_id)
+        room_model_html = f"""
+        <div id="roomModel"></div>
+        <script>PromamecGeometry.render('roomModel', '{geometry_url}', 600);</script>
+        """
+    except Exception as e:
+        logger.error(f"Visualization dashboard failed for {report.report_number}: {e}")
+        flash('Interactive visualizations are temporarily unavailable.', 'warning')
+        return redirect(url_for('view_report', report_id=report.id))
+    
+    content = f'''
+    {PlotlyAsset.script_tag()}
+    {RoomGeometry.CLIENT_SCRIPT}
+    <div class="container-fluid">
+        <div class="d-flex justify-content-between align-items-center mb-4">
+            <h2 class="mb-0"><i class="fas fa-cube"></i> Interactive Analysis - Report #{report.report_number}</h2>
+            <a href="{url_for('view_report', report_id=report.id)}" class="btn btn-promamec-secondary">
+                <i class="fas fa-arrow-left"></i> Back to Report
+            </a>
+        </div>
+        
+        <div class="row mb-4">
+            <div class="col-12">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-chart-line"></i> Analysis Dashboard</h5>
+                    </div>
+                    <div class="card-body">
+                        {dashboard_html}
+                    </div>
+                </div>
+            </div>
+        </div>
+        
+        <div class="row mb-4">
+            <div class="col-12">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-cube"></i> 3D Room Model - {report.site_specification.site_name}</h5>
+                    </div>
+                    <div class="card-body">
+                        {room_model_html}
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    '''
+    
+    return render_professional_page(content)
+
+@app.route('/api/site-specifications/<int:site_id>/geometry')
+@login_required
+def api_site_geometry(site_id):
+    """Room, clearance and scanner meshes as base64 float32/uint32 buffers"""
+    site_spec = SiteSpecification.query.get_or_404(site_id)
+    if current_user.role not in ['Admin', 'Engineer'] and site_spec.project.client_email != current_user.email:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    signature = RoomGeometry.signature(site_spec)
+    if request.if_none_match.contains(signature):
+        response = Response(status=304)
+        response.set_etag(signature)
+        return response
+    
+    response = jsonify(RoomGeometry.for_site(site_spec))
+    response.set_etag(signature)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/api/projects/<int:project_id>/facility-geometry')
+@login_required
+def api_facility_geometry(project_id):
+    """Every room of a project as batched, conformity-coloured mesh buffers"""
+    project = Project.query.get_or_404(project_id)
+    if current_user.role not in ['Admin', 'Engineer'] and project.client_email != current_user.email:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    sites, latest = RoomGeometry.project_sites(project.id)
+    signature = RoomGeometry.facility_signature(sites, latest)
+    if request.if_none_match.contains(signature):
+        response = Response(status=304)
+        response.set_etag(signature)
+        return response
+    
+    response = jsonify(RoomGeometry.for_project(project, sites, latest))
+    response.set_etag(signature)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/facility-overview/<int:project_id>')
+@login_required
+def facility_overview(project_id):
+    """Single 3D view of every room in a project"""
+    project = Project.query.get_or_404(project_id)
+    if current_user.role not in ['Admin', 'Engineer'] and project.client_email != current_user.email:
+        flash('Access denied.', 'error')
+        return redirect(url_for('dashboard'))
+    
+    geometry_url = url_for('api_facility_geometry', project_id=project.id)
+    content = f'''
+    {PlotlyAsset.script_tag()}
+    {RoomGeometry.CLIENT_SCRIPT}
+    <div class="container-fluid">
+        <div class="d-flex justify-content-between align-items-center mb-4">
+            <h2 class="mb-0"><i class="fas fa-hospital"></i> Facility Overview - {project.name}</h2>
+            <a href="{url_for('download_project_reports', project_id=project.id)}" class="btn btn-success">
+                <i class="fas fa-file-archive"></i> Download All Reports
+            </a>
+        </div>
+        
+        <div class="row mb-4">
+            <div class="col-12">
+                <div class="promamec-card">
+                    <div class="promamec-card-header">
+                        <h5 class="mb-0"><i class="fas fa-cubes"></i> Rooms coloured by conformity score</h5>
+                    </div>
+                    <div class="card-body">
+                        <div id="facilityModel"></div>
+                        <script>PromamecGeometry.render('facilityModel', '{geometry_url}', 750);</script>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+    '''
+    
+    return render_professional_page(content)
+
+@app.route('/assets/plotly-<fingerprint>.min.js')
+def plotly_asset(fingerprint):
+    """Fingerprinted plotly.js bundle shared by every dashboard"""
+    return PlotlyAsset.response(fingerprint)
+
+@app.route('/api/reports/<int:report_id>/figures/dashboard')
+@login_required
+def api_dashboard_figure(report_id):
+    """Analysis dashboard as compact Plotly figure JSON"""
+    report = ConformityReport.query.get_or_404(report_id)
+    return Response(ReportFigureStore.get(report, 'dashboard'), mimetype='application/json')
+
+@app.route('/api/reports/<int:report_id>/figures/room-model')
+@login_required
+def api_room_model_figure(report_id):
+    """3D room model as compact Plotly figure JSON"""
+    report = ConformityReport.query.get_or_404(report_id)
+    return Response(ReportFigureStore.get(report, 'room_model'), mimetype='application/json')
+
+@app.route('/api/pdf-jobs/<job_id>')
+@login_required
+def api_pdf_job_status(job_id):
+    """Status of a background PDF render"""
+    job = PDFRenderQueue.status(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown PDF job'}), 404
+    
+    report = ConformityReport.query.get_or_404(job['report_id'])
+    if current_user.role not in ['Admin', 'Engineer'] and report.project.client_email != current_user.email:
+        return jsonify({'error': 'Access denied'}), 403
+    return jsonify({k: v for k, v in job.items() if k not in PDFRenderQueue.PRIVATE_FIELDS})
+
+@app.route('/api/reports/<int:report_id>/chart-benchmark')
+@login_required
+def api_chart_benchmark(report_id):
+    """Compare the vector and matplotlib conformity gauge for one report"""
+    if current_user.role not in ['Admin', 'Engineer']:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    report = ConformityReport.query.get_or_404(report_id)
+    runs = max(1, min(request.args.get('runs', 5, type=int), 20))
+    generator = ProfessionalPDFReportGenerator()
+    return jsonify(ReportChartRenderer.benchmark(report, generator._generate_conformity_chart, runs=runs))
+
 @app.route('/scanner-comparison')
 @login_required
 def scanner_comparison():
@@ -4684,7 +6062,7 @@ COMPLIANCE STATUS: 85% - Minor modifications required for full certification""",
         logger.info("✅ Comprehensive sample data created successfully")
         flash('Professional sample data created successfully! You can now explore all features with realistic data.', 'success')
         return redirect(url_for('index'))
-        
+    
     except Exception as e:
         db.session.rollback()
         logger.error(f"Sample data creation failed: {e}")
@@ -4794,7 +6172,7 @@ if __name__ == '__main__':
             debug=True,
             threaded=True
         )
-        
+    
     except Exception as e:
         logger.error(f"❌ Application startup failed: {e}")
         sys.exit(1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+PROMAMEC CT Scanner - Report Charts
+ReportLab-native vector charts shared by the PDF report generators
+"""
+
+# ===== IMPORTS & DEPENDENCIES =====
+import io
+import os
+import math
+import time
+import threading
+
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from reportlab.graphics.shapes import Drawing, Wedge, Line, String, Rect, Circle
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics import renderPDF
+
+# ===== VECTOR CHARTS =====
+
+class ReportChartRenderer:
+    """ReportLab-native vector charts for PDF reports (matplotlib remains the fallback)"""
+    
+    BACKEND = os.environ.get('PDF_CHART_BACKEND', 'vector')  # 'vector' or 'matplotlib'
+    
+    # pyplot keeps global figure state; only one request thread may use it at a time
+    PYPLOT_LOCK = threading.Lock()
+    
+    GAUGE_BANDS = [(0, 50, '#dc2626', 'Critical'), (50, 85, '#d97706', 'Modification'), (85, 100, '#059669', 'Conforming')]
+    RISK_LEVELS = [('Low', '#059669'), ('Medium', '#d97706'), ('High', '#ea580c'), ('Critical', '#dc2626')]
+    COST_COLORS = ['#1e3a8a', '#2563eb', '#0891b2', '#059669', '#94a3b8', '#64748b']
+    TIMELINE_PHASES = [('Design & Permits', 0.25, '#1e3a8a'), ('Construction', 0.40, '#2563eb'),
+                       ('Installation', 0.20, '#0891b2'), ('Commissioning', 0.15, '#059669')]
+    
+    WIDTH = 6 * inch
+    
+    @classmethod
+    def gauge(cls, score, bands=None):
+        """Semicircular conformity gauge with a needle at the score"""
+        bands = bands or cls.GAUGE_BANDS
+        score = max(0, min(100, score or 0))
+        drawing = Drawing(cls.WIDTH, 2.4 * inch)
+        cx, cy, radius = cls.WIDTH / 2, 0.5 * inch, 1.6 * inch
+        
+        drawing.add(String(cx, 2.2 * inch, 'CT Scanner Conformity Assessment',
+                           fontName='Helvetica-Bold', fontSize=12, textAnchor='middle'))
+        for low, high, color, label in bands:
+            # Score 0 sits at 180 degrees, score 100 at 0 degrees
+            drawing.add(Wedge(cx, cy, radius, 180 - high * 1.8, 180 - low * 1.8,
+                              radius1=radius * 0.6, annular=True,
+                              fillColor=colors.HexColor(color), strokeColor=colors.white))
+            mid = math.radians(180 - (low + high) * 0.9)
+            drawing.add(String(cx + math.cos(mid) * radius * 1.12, cy + math.sin(mid) * radius * 1.12,
+                               label, fontName='Helvetica', fontSize=7, textAnchor='middle'))
+        
+        angle = math.radians(180 - score * 1.8)
+        drawing.add(Line(cx, cy, cx + math.cos(angle) * radius * 0.9, cy + math.sin(angle) * radius * 0.9,
+                         strokeColor=colors.HexColor('#111827'), strokeWidth=2.5))
+        drawing.add(Circle(cx, cy, 4, fillColor=colors.HexColor('#111827'), strokeColor=None))
+        drawing.add(String(cx, cy - 0.35 * inch, f'Conformity Score: {score:.1f}%',
+                           fontName='Helvetica-Bold', fontSize=12, textAnchor='middle'))
+        return drawing
+    
+    @classmethod
+    def risk_bar(cls, risk_level):
+        """Segmented risk scale with the assessed level highlighted"""
+        drawing = Drawing(cls.WIDTH, 0.9 * inch)
+        segment = cls.WIDTH / len(cls.RISK_LEVELS)
+        
+        drawing.add(String(0, 0.75 * inch, 'Risk Assessment', fontName='Helvetica-Bold', fontSize=10))
+        for i, (level, color) in enumerate(cls.RISK_LEVELS):
+            active = (risk_level or '').lower() == level.lower()
+            drawing.add(Rect(i * segment, 0.25 * inch, segment - 2, 0.35 * inch,
+                             fillColor=colors.HexColor(color) if active else colors.HexColor('#e5e7eb'),
+                             strokeColor=colors.HexColor('#111827') if active else None,
+                             strokeWidth=1.5))
+            drawing.add(String(i * segment + segment / 2, 0.37 * inch, level,
+                               fontName='Helvetica-Bold' if active else 'Helvetica', fontSize=9,
+                               fillColor=colors.white if active else colors.HexColor('#6b7280'),
+                               textAnchor='middle'))
+        return drawing
+    
+    @classmethod
+    def cost_pie(cls, total_cost, cost_split, base_cost):
+        """Breakdown of the modification budget; cost_split is the report's own [(label, share), ...]"""
+        drawing = Drawing(cls.WIDTH, 2.4 * inch)
+        modification_cost = max(0, (total_cost or base_cost) - base_cost)
+        
+        drawing.add(String(0, 2.2 * inch, 'Modification Budget Breakdown', fontName='Helvetica-Bold', fontSize=10))
+        if not modification_cost:
+            drawing.add(String(cls.WIDTH / 2, 1.1 * inch, 'No modification costs estimated',
+                               fontName='Helvetica', fontSize=9, textAnchor='middle'))
+            return drawing
+        
+        pie = Pie()
+        pie.x, pie.y = 0.3 * inch, 0.1 * inch
+        pie.width = pie.height = 1.9 * inch
+        pie.data = [share for _, share in cost_split]
+        pie.slices.strokeColor = colors.white
+        for i in range(len(cost_split)):
+            pie.slices[i].fillColor = colors.HexColor(cls.COST_COLORS[i % len(cls.COST_COLORS)])
+        drawing.add(pie)
+        
+        for i, (label, share) in enumerate(cost_split):
+            y = 1.85 * inch - i * 0.3 * inch
+            drawing.add(Rect(2.6 * inch, y, 10, 10, strokeColor=None,
+                             fillColor=colors.HexColor(cls.COST_COLORS[i % len(cls.COST_COLORS)])))
+            drawing.add(String(2.6 * inch + 16, y + 1, f'{label}: ${modification_cost * share:,.0f}',
+                               fontName='Helvetica', fontSize=9))
+        return drawing
+    
+    @classmethod
+    def timeline(cls, total_days):
+        """Phased modification timeline as a proportional Gantt strip"""
+        drawing = Drawing(cls.WIDTH, 1.1 * inch)
+        total_days = total_days or 0
+        
+        drawing.add(String(0, 0.95 * inch, f'Modification Timeline ({total_days} days)',
+                           fontName='Helvetica-Bold', fontSize=10))
+        if not total_days:
+            drawing.add(String(cls.WIDTH / 2, 0.45 * inch, 'No modifications scheduled',
+                               fontName='Helvetica', fontSize=9, textAnchor='middle'))
+            return drawing
+        
+        x = 0
+        for label, share, color in cls.TIMELINE_PHASES:
+            width = cls.WIDTH * share
+            drawing.add(Rect(x, 0.4 * inch, width - 2, 0.3 * inch,
+                             fillColor=colors.HexColor(color), strokeColor=None))
+            drawing.add(String(x + width / 2, 0.5 * inch, f'{max(1, round(total_days * share))}d',
+                               fontName='Helvetica-Bold', fontSize=8, fillColor=colors.white, textAnchor='middle'))
+            drawing.add(String(x + width / 2, 0.2 * inch, label,
+                               fontName='Helvetica', fontSize=7, textAnchor='middle'))
+            x += width
+        return drawing
+    
+    @classmethod
+    def report_charts(cls, report, cost_split, base_cost, bands=None):
+        """All vector charts for a report, in document order"""
+        return [
+            cls.gauge(report.conformity_score, bands),
+            cls.risk_bar(report.risk_assessment),
+            cls.cost_pie(report.estimated_cost, cost_split, base_cost),
+            cls.timeline(report.modification_timeline)
+        ]
+    
+    @staticmethod
+    def _page_bytes(draw=None):
+        """Size of a one-page PDF with (or without) a chart placed on it"""
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer, invariant=1)
+        if draw:
+            draw(pdf)
+        pdf.showPage()
+        pdf.save()
+        return len(buffer.getvalue())
+    
+    @classmethod
+    def benchmark(cls, report, raster_gauge, bands=None, runs=5):
+        """Vector vs matplotlib conformity gauge: build + place on a PDF page, bytes over an empty page"""
+        empty_page = cls._page_bytes()
+        
+        started = time.perf_counter()
+        for _ in range(runs):
+            drawing = cls.gauge(report.conformity_score, bands)
+            vector_bytes = cls._page_bytes(lambda pdf: renderPDF.draw(drawing, pdf, 0, 0))
+        vector_ms = (time.perf_counter() - started) * 1000 / runs
+        
+        started = time.perf_counter()
+        for _ in range(runs):
+            png_buffer = raster_gauge(report)
+            raster_bytes = cls._page_bytes(
+                lambda pdf: pdf.drawImage(ImageReader(png_buffer), 0, 0, width=4 * inch, height=3 * inch))
+        raster_ms = (time.perf_counter() - started) * 1000 / runs
+        
+        return {
+            'report_number': report.report_number,
+            'chart': 'conformity_gauge',
+            'runs': runs,
+            'vector': {'render_ms': round(vector_ms, 2), 'bytes': vector_bytes - empty_page},
+            'matplotlib': {'render_ms': round(raster_ms, 2), 'bytes': raster_bytes - empty_page},
+            'speedup': round(raster_ms / vector_ms, 1) if vector_ms else None
+        }
@@ -0,0 +1,148 @@
+"""
+PROMAMEC CT Scanner - Test Fixtures
+Each application module is loaded once against an in-memory database
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='promamec-tests-')
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['ARTIFACT_ROOT'] = os.path.join(WORKDIR, 'artifacts')
+os.environ['PDF_CACHE_DIR'] = os.path.join(WORKDIR, 'pdf_cache')
+sys.path.insert(0, ROOT)
+
+def load_module(name, filename):
+    """Import an application file by path (the app/ package shadows app.py as a module name)"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def fresh_database(module):
+    """App context over an empty schema; process-wide caches are reset so tests do not share state"""
+    with module.app.app_context():
+        module.db.drop_all()
+        module.db.create_all()
+        yield module.db
+        module.db.session.remove()
+
+@pytest.fixture(scope='session', autouse=True)
+def workdir():
+    """The apps log, render and store files relative to the working directory; keep all of it out of the checkout"""
+    previous = os.getcwd()
+    os.chdir(WORKDIR)
+    yield WORKDIR
+    os.chdir(previous)
+
+@pytest.fixture(scope='session')
+def ct():
+    return load_module('promamec_app', 'app.py')
+
+@pytest.fixture
+def ct_db(ct):
+    ct.ScannerCatalog.mark_stale()
+    ct.ScannerRecommender._catalog = {'version': None, 'columns': None}
+    ct.ScannerSimilarityIndex._index = {'signature': None}
+    ct.ShieldingCalculator._cache.clear()
+    ct.DeliveryRouteEngine._cache.clear()
+    ct.CostTableStore._versions.clear()
+    ct.CostTableStore._active = None
+    yield from fresh_database(ct)
+
+@pytest.fixture
+def ct_site(ct, ct_db):
+    """One engineer, project, scanner, surveyed room and the site specification joining them"""
+    user = ct.User(username='engineer', email='engineer@example.com', password_hash='x',
+                   first_name='Test', last_name='Engineer', role='Engineer')
+    project = ct.Project(name='Test Project', client_name='Test Client', budget=2_000_000)
+    scanner = ct.ScannerModel(
+        manufacturer='NeuViz', model_name='128', slice_count=128, weight=2000,
+        dimensions='2.2 x 1.0 x 1.9 m', min_room_length=6.5, min_room_width=4.5, min_room_height=2.7,
+        required_power='380V 3-phase 80 kVA', power_consumption=80, power_factor_requirement=0.9,
+        heat_dissipation=6.0, is_neuviz=True, radiation_shielding='2.0 mm Pb at 140 kVp',
+        environmental_specs='18-24°C, 30-70% RH', price_range_min=600_000, price_range_max=900_000,
+        installation_complexity='Medium'
+    )
+    ct_db.session.add_all([user, project, scanner])
+    ct_db.session.flush()
+    
+    room = ct.ManualRoomEntry(
+        project_id=project.id, entered_by=user.id, site_name='Scan Room 1',
+        room_length=7.0, room_width=5.0, room_height=3.0, door_width=1.4, door_height=2.2,
+        corridor_width=2.4, ceiling_clearance=2.8, floor_type='concrete', floor_load_capacity=2500,
+        available_power='380V 3-phase 100 kVA', electrical_panel_distance=30, electrical_panel_capacity=250,
+        has_hvac=True, hvac_capacity='15 kW', air_changes_per_hour=8, staff_count=2,
+        patient_volume=40, operating_hours='08:00-18:00'
+    )
+    ct_db.session.add(room)
+    ct_db.session.flush()
+    
+    site = ct.SiteSpecification(
+        project_id=project.id, scanner_model_id=scanner.id, manual_room_id=room.id, site_name='Scan Room 1',
+        room_length=7.0, room_width=5.0, room_height=3.0, door_width=1.4, door_height=2.2,
+        available_power='380V 3-phase 100 kVA', has_hvac=True, hvac_capacity='15 kW',
+        floor_type='concrete', floor_load_capacity=2500
+    )
+    ct_db.session.add(site)
+    ct_db.session.commit()
+    return SimpleNamespace(user=user, project=project, scanner=scanner, room=room, site=site)
+
+@pytest.fixture(scope='session')
+def backup():
+    return load_module('promamec_backupapp', 'backupapp.py')
+
+@pytest.fixture
+def backup_db(backup):
+    backup.ProfessionalPDFReportGenerator.clear_section_cache()
+    yield from fresh_database(backup)
+
+@pytest.fixture(scope='session')
+def appbuilder():
+    module = load_module('promamec_appbuilder', 'app_flask_appbuilder_backup.py')
+    module.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'  # this app hard-codes its database file
+    return module
+
+@pytest.fixture
+def appbuilder_db(appbuilder):
+    yield from fresh_database(appbuilder)
+
+@pytest.fixture
+def backup_site(backup, backup_db):
+    """One project with a NeuViz scan room and two assessed reports"""
+    user = backup.User(username='engineer', email='engineer@example.com', password_hash='x',
+                       first_name='Eve', last_name='Engineer', role='Engineer')
+    project = backup.Project(name='Test Project', client_name='Test Clinic', budget=2_000_000)
+    scanner = backup.ScannerModel(
+        manufacturer='NeuViz', model_name='128', slice_count=128, weight=2000, dimensions='2.2 x 1.0 x 1.9 m',
+        min_room_length=6.5, min_room_width=4.5, min_room_height=2.7, required_power='380V 3-phase 80 kVA',
+        heat_dissipation=6.0, is_neuviz=True, radiation_shielding='2.0 mm Pb at 140 kVp',
+        price_range_min=600_000, price_range_max=900_000, installation_complexity='Medium'
+    )
+    backup_db.session.add_all([user, project, scanner])
+    backup_db.session.flush()
+    
+    site = backup.SiteSpecification(
+        project_id=project.id, scanner_model_id=scanner.id, site_name='Scan Room 1',
+        room_length=7.0, room_width=5.0, room_height=3.0, door_width=1.4, door_height=2.2,
+        available_power='380V 3-phase 100 kVA', has_hvac=True, hvac_capacity='15 kW',
+        floor_type='concrete', floor_load_capacity=2500
+    )
+    backup_db.session.add(site)
+    backup_db.session.flush()
+    
+    reports = [backup.ConformityReport(
+        project_id=project.id, site_specification_id=site.id, report_number=f'CT-{i}',
+        overall_status='CONFORMING', conformity_score=90.0, risk_assessment='Low', estimated_cost=25_000,
+        modification_timeline=4, ai_analysis='Room meets every requirement.', recommendations='Proceed.'
+    ) for i in (1, 2)]
+    backup_db.session.add_all(reports)
+    backup_db.session.commit()
+    return SimpleNamespace(user=user, project=project, scanner=scanner, site=site, reports=reports)
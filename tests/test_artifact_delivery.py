@@ -0,0 +1,96 @@
+"""ArtifactDelivery: ETags, conditional and ranged downloads, cache headers and the nginx offload"""
+
+import hashlib
+import os
+
+import pytest
+
+CONTENT = b'%PDF-1.4 ' + b'report body ' * 200
+
+@pytest.fixture
+def delivery(backup, backup_db, backup_site, tmp_path, monkeypatch):
+    """CT-1 stored as a content-addressed object, and a client logged in as the engineer"""
+    monkeypatch.setitem(backup.app.config, 'ARTIFACT_ROOT', str(tmp_path / 'artifacts'))
+    monkeypatch.setattr(backup.ArtifactDelivery, '_hashes', {})
+    os.makedirs(backup.app.config['ARTIFACT_ROOT'])
+    staged = backup.ArtifactStore.staging_path('render.pdf')
+    with open(staged, 'wb') as f:
+        f.write(CONTENT)
+    report = backup_site.reports[0]
+    report.pdf_path = backup.ArtifactStore.put_file(staged)
+    report.pdf_generated = True
+    backup_db.session.commit()
+    
+    client = backup.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(backup_site.user.id)
+    return client, report.id, report.pdf_path
+
+def test_content_hash(backup, tmp_path, delivery):
+    _, _, path = delivery
+    assert backup.ArtifactDelivery.content_hash(path) == hashlib.sha256(CONTENT).hexdigest()
+    
+    # Files outside the object store are hashed and cached until they change
+    legacy = tmp_path / 'report_CT-1.pdf'
+    legacy.write_bytes(b'%PDF legacy')
+    assert backup.ArtifactDelivery.content_hash(str(legacy)) == hashlib.sha256(b'%PDF legacy').hexdigest()
+    legacy.write_bytes(b'%PDF legacy, edited')
+    assert backup.ArtifactDelivery.content_hash(str(legacy)) == hashlib.sha256(b'%PDF legacy, edited').hexdigest()
+
+def test_download_carries_a_strong_etag(backup, delivery):
+    client, report_id, _ = delivery
+    response = client.get(f'/download-report/{report_id}')
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['ETag'] == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+    assert 'Promamec_Professional_Analysis_CT-1.pdf' in response.headers['Content-Disposition']
+
+def test_matching_etag_answers_304(backup, delivery):
+    client, report_id, _ = delivery
+    etag = client.get(f'/download-report/{report_id}').headers['ETag']
+    cached = client.get(f'/download-report/{report_id}', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert client.get(f'/download-report/{report_id}', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+def test_range_request_answers_206(backup, delivery):
+    client, report_id, _ = delivery
+    response = client.get(f'/download-report/{report_id}', headers={'Range': 'bytes=0-7'})
+    assert response.status_code == 206
+    assert response.data == CONTENT[:8]
+    assert response.headers['Content-Range'] == f'bytes 0-7/{len(CONTENT)}'
+
+def test_only_versioned_urls_are_cached_immutably(backup, backup_db, delivery):
+    client, report_id, _ = delivery
+    with backup.app.test_request_context():
+        url = backup.ArtifactDelivery.download_url(backup_db.session.get(backup.ConformityReport, report_id))
+    assert url == f'/download-report/{report_id}?v={hashlib.sha256(CONTENT).hexdigest()[:16]}'
+    
+    versioned = client.get(url).headers['Cache-Control']
+    assert versioned == f"private, max-age={backup.app.config['ARTIFACT_MAX_AGE']}, immutable"
+    assert client.get(f'/download-report/{report_id}').headers['Cache-Control'] == 'private, no-cache'
+    # A version that no longer matches the content must revalidate
+    assert client.get(f'/download-report/{report_id}?v=0000').headers['Cache-Control'] == 'private, no-cache'
+
+def test_x_accel_hands_the_file_to_nginx(backup, delivery, monkeypatch):
+    client, report_id, path = delivery
+    monkeypatch.setitem(backup.app.config, 'ARTIFACT_SENDFILE_MODE', 'x-accel')
+    response = client.get(f'/download-report/{report_id}')
+    assert response.status_code == 200
+    assert response.data == b''
+    relative = os.path.relpath(path, backup.app.config['ARTIFACT_ROOT']).replace(os.sep, '/')
+    assert response.headers['X-Accel-Redirect'] == f'/protected-reports/{relative}'
+    
+    cached = client.get(f'/download-report/{report_id}', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+def test_x_accel_refuses_paths_outside_the_store(backup, backup_db, tmp_path, delivery, monkeypatch):
+    client, report_id, _ = delivery
+    monkeypatch.setitem(backup.app.config, 'ARTIFACT_SENDFILE_MODE', 'x-accel')
+    outside = tmp_path / 'elsewhere.pdf'
+    outside.write_bytes(b'%PDF elsewhere')
+    backup_db.session.get(backup.ConformityReport, report_id).pdf_path = str(outside)
+    backup_db.session.commit()
+    response = client.get(f'/download-report/{report_id}')
+    assert response.status_code == 404
+    assert 'X-Accel-Redirect' not in response.headers
@@ -0,0 +1,146 @@
+"""ArtifactStore: content-addressed report files, the manifest table and garbage collection"""
+
+import os
+import time
+from unittest import mock
+
+import flask_sqlalchemy
+import pytest
+
+@pytest.fixture
+def store(backup, backup_db, tmp_path, monkeypatch):
+    monkeypatch.setitem(backup.app.config, 'ARTIFACT_ROOT', str(tmp_path / 'artifacts'))
+    os.makedirs(backup.app.config['ARTIFACT_ROOT'])
+    return backup.ArtifactStore
+
+def staged(store, content, name='render.pdf'):
+    path = store.staging_path(name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+def write(path, content, age=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    if age:
+        then = time.time() - age
+        os.utime(path, (then, then))
+    return path
+
+def snapshot(root):
+    return sorted(os.path.relpath(os.path.join(dirpath, name), root)
+                  for dirpath, _, names in os.walk(root) for name in names)
+
+def test_put_file_stores_identical_renders_once(backup, backup_db, store):
+    first = store.put_file(staged(store, b'%PDF same', 'a.pdf'))
+    second = store.put_file(staged(store, b'%PDF same', 'b.pdf'))
+    other = store.put_file(staged(store, b'%PDF other', 'c.pdf'))
+    backup_db.session.commit()
+    
+    assert first == second != other
+    sha256 = os.path.basename(first)[:-4]
+    assert first == os.path.join(store.objects_dir(), sha256[:2], sha256[2:4], f'{sha256}.pdf')
+    assert os.listdir(os.path.join(store.root(), 'staging')) == []
+    
+    artifacts = {a.path: a for a in backup.ReportArtifact.query}
+    assert (artifacts[first].store_count, artifacts[first].size_bytes) == (2, 9)
+    assert artifacts[other].store_count == 1
+
+def test_put_file_survives_a_concurrent_insert(backup, backup_db, store):
+    path = staged(store, b'%PDF raced')
+    backup_db.session.add(backup.ReportArtifact(sha256=store.file_sha256(path), path='elsewhere', size_bytes=10))
+    backup_db.session.commit()
+    
+    # The first update misses, as if the other worker had not committed yet; the insert then collides
+    real_update = flask_sqlalchemy.BaseQuery.update
+    calls = []
+    
+    def racy_update(self, *args, **kwargs):
+        calls.append(args)
+        return 0 if len(calls) == 1 else real_update(self, *args, **kwargs)
+    
+    with mock.patch.object(flask_sqlalchemy.BaseQuery, 'update', racy_update):
+        dest = store.put_file(path)
+    backup_db.session.commit()
+    
+    assert len(calls) == 2
+    artifact = backup.ReportArtifact.query.one()
+    assert (artifact.store_count, artifact.path) == (2, dest)
+
+def test_is_object(store):
+    sha256 = 'ab' * 32
+    assert store.is_object(store.object_path(sha256))
+    assert not store.is_object(os.path.join(store.root(), f'{sha256}.pdf'))
+    assert not store.is_object(store.object_path('not-a-hash'))
+    assert not store.is_object(os.path.join(store.root(), 'report_AI-1.pdf'))
+
+@pytest.fixture
+def cluttered_store(backup, backup_db, backup_site, store):
+    """A store with one file of every kind gc() handles"""
+    old = store.GC_GRACE_SECONDS + 60
+    referenced = store.put_file(staged(store, b'%PDF referenced'))
+    unreferenced = store.put_file(staged(store, b'%PDF unreferenced'))
+    in_flight = store.put_file(staged(store, b'%PDF just rendered'))
+    for path in (referenced, unreferenced):
+        os.utime(path, (time.time() - old,) * 2)
+    orphan = write(store.object_path('cd' * 32), b'%PDF orphan', age=old)
+    leftover = write(store.staging_path('crashed.pdf'), b'%PDF partial', age=old)
+    legacy = write(os.path.join(store.root(), 'report_AI-1.pdf'), b'%PDF legacy', age=old)
+    loose = write(os.path.join(store.root(), 'report_AI-2.pdf'), b'%PDF loose', age=old)
+    
+    reports = backup_site.reports
+    reports[0].pdf_path = referenced
+    reports[1].pdf_path = legacy
+    dangling = backup.ConformityReport(project_id=backup_site.project.id, site_specification_id=backup_site.site.id,
+                                       report_number='CT-3', pdf_path=os.path.join(store.root(), 'gone.pdf'),
+                                       pdf_generated=True)
+    backup_db.session.add(dangling)
+    backup_db.session.commit()
+    return dict(referenced=referenced, unreferenced=unreferenced, in_flight=in_flight, orphan=orphan,
+                leftover=leftover, legacy=legacy, loose=loose, legacy_report=reports[1], dangling=dangling)
+
+def test_gc_dry_run_reports_what_a_real_run_does(backup, backup_db, store, cluttered_store):
+    before = snapshot(store.root())
+    dry = store.gc(dry_run=True)
+    assert snapshot(store.root()) == before
+    assert cluttered_store['dangling'].pdf_path is not None
+    
+    real = store.gc(dry_run=False)
+    assert dry.pop('dry_run') and not real.pop('dry_run')
+    assert dry == real
+    freed = [b'%PDF unreferenced', b'%PDF orphan', b'%PDF partial', b'%PDF legacy', b'%PDF loose']
+    assert real == {'adopted': 1, 'dangling_cleared': 1, 'artifacts_deleted': 1, 'orphans_deleted': 2,
+                    'loose_deleted': 2, 'bytes_freed': sum(len(content) for content in freed)}
+
+def test_gc_adopts_legacy_files_and_deletes_the_rest(backup, backup_db, store, cluttered_store):
+    store.gc(dry_run=False)
+    backup_db.session.expire_all()
+    
+    kept = ['referenced', 'in_flight']
+    removed = ['unreferenced', 'orphan', 'leftover', 'legacy', 'loose']
+    assert all(os.path.exists(cluttered_store[name]) for name in kept)
+    assert not any(os.path.exists(cluttered_store[name]) for name in removed)
+    
+    adopted = cluttered_store['legacy_report']
+    assert store.is_object(adopted.pdf_path)
+    with open(adopted.pdf_path, 'rb') as f:
+        assert f.read() == b'%PDF legacy'
+    
+    dangling = cluttered_store['dangling']
+    assert (dangling.pdf_path, dangling.pdf_generated) == (None, False)
+    assert {a.path for a in backup.ReportArtifact.query} == {cluttered_store['referenced'],
+                                                            cluttered_store['in_flight'], adopted.pdf_path}
+    
+    # A second pass finds nothing left to do
+    again = store.gc(dry_run=True)
+    assert sum(value for key, value in again.items() if key != 'dry_run') == 0
+
+def test_metrics(backup, backup_db, store):
+    for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+        store.put_file(staged(store, b'%PDF twice', name))
+    backup_db.session.commit()
+    metrics = store.metrics()
+    assert (metrics['manifest_artifacts'], metrics['manifest_bytes']) == (1, 10)
+    assert metrics['dedupe_bytes_saved'] == 20
+    assert metrics['files']['objects'] == {'count': 1, 'bytes': 10}
@@ -0,0 +1,40 @@
+"""Chart benchmark endpoint: vector vs matplotlib conformity gauge timings"""
+
+import pytest
+
+@pytest.mark.parametrize('runs, expected', [(0, 1), (-3, 1), (2, 2), (500, 20)])
+def test_runs_are_clamped(backup, backup_site, runs, expected, monkeypatch):
+    # The timing loop is what is bounded; a tiny stand-in gauge keeps it fast
+    monkeypatch.setattr(backup.ReportChartRenderer, '_page_bytes', staticmethod(lambda draw=None: 1000))
+    client = backup.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(backup_site.user.id)
+    
+    response = client.get(f'/api/reports/{backup_site.reports[0].id}/chart-benchmark?runs={runs}')
+    assert response.status_code == 200
+    assert response.get_json()['runs'] == expected
+
+def test_appbuilder_runs_are_clamped(appbuilder, appbuilder_db, monkeypatch):
+    monkeypatch.setattr(appbuilder.ReportChartRenderer, '_page_bytes', staticmethod(lambda draw=None: 1000))
+    user = appbuilder.User(username='engineer', email='engineer@example.com', password_hash='x',
+                           first_name='Eve', last_name='Engineer', role='Engineer')
+    scanner = appbuilder.ScannerModel(manufacturer='GE', model_name='A', min_room_length=6, min_room_width=4,
+                                      min_room_height=2.7, required_power='400V')
+    project = appbuilder.Project(name='p', client_name='c')
+    appbuilder_db.session.add_all([user, scanner, project])
+    appbuilder_db.session.flush()
+    site = appbuilder.SiteSpecification(project_id=project.id, scanner_model_id=scanner.id, site_name='s',
+                                        room_length=7, room_width=5, room_height=3)
+    appbuilder_db.session.add(site)
+    appbuilder_db.session.flush()
+    report = appbuilder.ConformityReport(project_id=project.id, site_specification_id=site.id, report_number='R1',
+                                         conformity_score=70.0)
+    appbuilder_db.session.add(report)
+    appbuilder_db.session.commit()
+    
+    client = appbuilder.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+    response = client.get(f'/api/reports/{report.id}/chart-benchmark?runs=0')
+    assert response.status_code == 200
+    assert response.get_json()['runs'] == 1
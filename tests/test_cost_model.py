@@ -0,0 +1,159 @@
+"""CostTableStore, CostModel and BulkRecostingJob: versioned rates and deterministic re-costing"""
+
+import json
+
+import pytest
+
+COMPLIANT_ROOM = dict(room_length=[7.0], room_width=[5.0], room_height=[3.0],
+                      min_room_length=[6.5], min_room_width=[4.5], min_room_height=[2.7],
+                      power_match=[True], has_hvac=[True], is_neuviz=[False], floor_adequate=[True],
+                      existing_shielding=[False], score=[90.0], status=['CONFORMING'],
+                      extensive=[False], minimal=[False])
+
+def inputs(ct, rows=1, **overrides):
+    """Model inputs for `rows` compliant, non-NeuViz rooms with the given columns overridden"""
+    columns = {name: value * rows for name, value in COMPLIANT_ROOM.items()}
+    columns.update(overrides)
+    return ct.CostModel.build_inputs(**columns)
+
+def add_reports(ct, ct_db, ct_site, count):
+    reports = [ct.ConformityReport(project_id=ct_site.project.id, site_specification_id=ct_site.site.id,
+                                   report_number=f'CT-{i}', conformity_score=60.0 + i,
+                                   overall_status='REQUIRES_MODIFICATION', estimated_cost=1.0)
+               for i in range(count)]
+    ct_db.session.add_all(reports)
+    ct_db.session.commit()
+    return [r.id for r in reports]
+
+def test_validate_rates_merges_over_the_defaults(ct):
+    rates = ct.CostTableStore.validate_rates({'base_assessment': 9000, 'floor_load_factor': 2,
+                                              'score_multipliers': [[50, 1.3], [85, 0.6]]})
+    assert rates['base_assessment'] == 9000
+    assert rates['electrical_upgrade'] == ct.DEFAULT_COST_RATES['electrical_upgrade']
+    assert 'floor_load_factor' not in rates  # Retired keys are dropped, not rejected
+    assert rates['score_multipliers'] == [[85, 0.6], [50, 1.3]]
+
+@pytest.mark.parametrize('rates, message', [
+    ({'bogus_rate': 1}, 'Unknown cost rates: bogus_rate'),
+    ({'base_assessment': '8000'}, "'base_assessment' must be numeric"),
+    ({'base_assessment': True}, "'base_assessment' must be numeric"),
+    ({'score_multipliers': []}, 'score_multipliers'),
+    ({'score_multipliers': [[85]]}, 'score_multipliers'),
+    ({'status_multipliers': {'CONFORMING': 'half'}}, 'status_multipliers'),
+])
+def test_validate_rates_rejects(ct, rates, message):
+    with pytest.raises(ValueError, match=message):
+        ct.CostTableStore.validate_rates(rates)
+
+def test_active_falls_back_to_the_built_in_rates(ct, ct_db):
+    version, rates = ct.CostTableStore.active()
+    assert version == 0
+    assert rates == ct.CostTableStore.validate_rates({})
+
+def test_publish_activates_a_new_version(ct, ct_db):
+    store = ct.CostTableStore
+    first = store.publish({}, label='Baseline')
+    second = store.publish({'base_assessment': 9000})
+    assert (first.version, second.version) == (1, 2)
+    assert [t.version for t in ct.CostTable.query.filter_by(is_active=True)] == [2]
+    assert second.label == 'Cost table v2'
+    assert json.loads(second.rates)['base_assessment'] == 9000
+    
+    assert store.active() == (2, store.get(2))
+    assert store.resolve(1)[1]['base_assessment'] == ct.DEFAULT_COST_RATES['base_assessment']
+    with pytest.raises(ValueError):
+        store.get(99)
+
+def test_active_table_is_rechecked_after_the_ttl(ct, ct_db, monkeypatch):
+    store = ct.CostTableStore
+    store.publish({})
+    assert store.active()[0] == 1
+    
+    # Published by another process: this one's cached answer holds until the TTL lapses
+    ct.CostTable.query.update({'is_active': False})
+    ct_db.session.add(ct.CostTable(version=2, rates=json.dumps({'base_assessment': 9000}), is_active=True))
+    ct_db.session.commit()
+    assert store.active()[0] == 1
+    
+    monkeypatch.setattr(store, 'ACTIVE_TTL_SECONDS', 0)
+    version, rates = store.active()
+    assert (version, rates['base_assessment']) == (2, 9000)
+
+def test_compute_compliant_room(ct):
+    rates = ct.CostTableStore.validate_rates({})
+    # Assessment plus flat shielding, scaled by the >= 85 score band and the CONFORMING status
+    expected = (8000 + 35000) * 0.6 * 0.5
+    assert ct.CostModel.compute(inputs(ct), rates).tolist() == [round(expected, -2)]
+
+def test_compute_room_needing_every_modification(ct):
+    rates = ct.CostTableStore.validate_rates({})
+    costs = ct.CostModel.compute(inputs(ct, room_length=[6.0], room_width=[4.0], room_height=[2.5],
+                                        power_match=[False], has_hvac=[False], is_neuviz=[True],
+                                        floor_adequate=[False], score=[40.0], status=['NON_CONFORMING'],
+                                        extensive=[True]), rates)
+    expansion = (6.5 * 4.5 * 2.7 - 6.0 * 4.0 * 2.5) * 20000 + 0.2 * 12000
+    additive = 8000 + expansion + 25000 + 45000 + 18000 + 35000 + (12000 + 25000 + 10000 + 8000)
+    assert costs[0] == round(additive * 1.8 * 1.6 * 1.4, -2)
+
+def test_compute_prices_calculated_lead_when_a_rate_is_set(ct):
+    rates = ct.CostTableStore.validate_rates({'shielding_lead_cost_per_m2_mm': 100})
+    parts = ct.CostModel.components(inputs(ct, rows=2, shielding_lead_m2_mm=[None, 250.0]), rates)
+    assert parts['shielding'].tolist() == [35000.0, 25000.0]  # Unknown lead keeps the flat fee
+
+def test_compute_batch_matches_single_rows(ct):
+    rates = ct.CostTableStore.validate_rates({})
+    rows = [(90.0, 'CONFORMING', True), (72.0, 'REQUIRES_MODIFICATION', False), (30.0, 'NON_CONFORMING', True)]
+    singles = [ct.CostModel.compute(inputs(ct, score=[score], status=[status], has_hvac=[hvac]), rates)[0]
+               for score, status, hvac in rows]
+    scores, statuses, hvac = zip(*rows)
+    batch = ct.CostModel.compute(inputs(ct, rows=3, score=scores, status=statuses, has_hvac=hvac), rates)
+    assert batch.tolist() == singles
+
+def test_bulk_recosting_runs_in_chunks(ct, ct_db, ct_site):
+    ids = add_reports(ct, ct_db, ct_site, 5)
+    ct.CostTableStore.publish({})
+    result = ct.BulkRecostingJob.run(chunk_size=2)
+    assert (result['processed'], result['updated'], result['chunks']) == (5, 5, 3)
+    
+    reports = ct.ConformityReport.query.order_by(ct.ConformityReport.id).all()
+    assert [r.id for r in reports] == ids
+    assert {r.cost_table_version for r in reports} == {1}
+    assert all(r.estimated_cost > 1.0 for r in reports)
+    assert ct.ReportFactor.query.filter_by(report_id=ids[0]).count() == len(ct.FactorBreakdown.FACTORS)
+    
+    # Each row matches the single-report cost path
+    expected = ct.AdvancedCTScannerAI._calculate_advanced_cost(ct_site.site, '', 60.0, 'REQUIRES_MODIFICATION', 1)
+    assert reports[0].estimated_cost == expected
+
+def test_bulk_recosting_only_bumps_changed_reports(ct, ct_db, ct_site):
+    add_reports(ct, ct_db, ct_site, 3)
+    ct.CostTableStore.publish({})
+    ct.BulkRecostingJob.run()
+    stamps = [r.updated_at for r in ct.ConformityReport.query.order_by(ct.ConformityReport.id)]
+    
+    assert ct.BulkRecostingJob.run()['updated'] == 0
+    ct_db.session.expire_all()
+    assert [r.updated_at for r in ct.ConformityReport.query.order_by(ct.ConformityReport.id)] == stamps
+    
+    ct.CostTableStore.publish({'base_assessment': 20000})
+    assert ct.BulkRecostingJob.run()['updated'] == 3
+    ct_db.session.expire_all()
+    reports = ct.ConformityReport.query.order_by(ct.ConformityReport.id).all()
+    assert {r.cost_table_version for r in reports} == {2}
+    assert all(r.updated_at > stamp for r, stamp in zip(reports, stamps))
+
+def test_cost_tables_page_counts_reports_per_version(ct, ct_db, ct_site):
+    add_reports(ct, ct_db, ct_site, 3)
+    ct.CostTableStore.publish({})
+    ct.BulkRecostingJob.run()
+    ct.CostTableStore.publish({'base_assessment': 9000})
+    ct_site.user.role = 'Admin'
+    ct_db.session.commit()
+    
+    client = ct.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(ct_site.user.id)
+    page = client.get('/cost-tables').get_data(as_text=True)
+    rows = [row for row in page.split('<tr>') if '<strong>v' in row]
+    assert [('v2' in row, '<td>0</td>' in row, '<td>3</td>' in row) for row in rows] == [
+        (True, True, False), (False, False, True)]
@@ -0,0 +1,89 @@
+"""DeliveryRouteEngine: door, corridor, ceiling and corner-turn feasibility"""
+
+import math
+
+import numpy as np
+import pytest
+
+SCANNER = {'dimensions': ['2.2 x 1.0 x 1.9 m'], 'weight': [2000]}
+
+def route(**overrides):
+    rooms = {'door_width': 2.1, 'door_height': 2.4, 'corridor_width': 2.5, 'ceiling_clearance': 2.8,
+             'floor_capacity': 2500, 'floor_type': 'concrete'}
+    rooms.update(overrides)
+    return {name: [value] for name, value in rooms.items()}
+
+def test_max_turn_length_matches_the_right_angle_corner_formula(ct):
+    engine = ct.DeliveryRouteEngine
+    # Equal widths a with a zero-width item: the minimum sits at 45° and equals 2√2·a
+    limit = engine.max_turn_length(np.array([2.0]), np.array([2.0]), np.array([0.0]))
+    assert limit[0] == pytest.approx(2 * math.sqrt(2) * 2.0, rel=1e-3)
+    
+    wider = engine.max_turn_length(np.array([2.0]), np.array([2.0]), np.array([1.0]))
+    assert wider[0] < limit[0]
+
+def test_clear_route_is_feasible_and_verified(ct):
+    result = ct.DeliveryRouteEngine.evaluate_matrix(route(), SCANNER)
+    assert result['feasible'][0, 0]
+    assert result['verified'][0, 0]
+    assert result['limiting'][0, 0] == ''
+    assert not result['floor_protection_required'][0, 0]
+
+def test_low_ceiling_blocks_the_gantry(ct):
+    result = ct.DeliveryRouteEngine.evaluate_matrix(route(ceiling_clearance=2.0), SCANNER)
+    assert result['door_height_ok'][0, 0]
+    assert not result['ceiling_ok'][0, 0]
+    assert not result['feasible'][0, 0]
+    assert result['limiting'][0, 0] == 'ceiling_clearance'
+
+def test_unknown_dimensions_are_unverified_not_failed(ct):
+    result = ct.DeliveryRouteEngine.evaluate_matrix(route(ceiling_clearance=None), SCANNER)
+    assert result['ceiling_ok'][0, 0]
+    assert result['feasible'][0, 0]
+    assert not result['verified'][0, 0]
+
+@pytest.mark.parametrize('overrides, limiting', [
+    ({'door_height': 1.9, 'ceiling_clearance': 1.9}, 'door_height'),
+    ({'door_width': 0.9}, 'door_width'),
+    ({'corridor_width': 0.9}, 'corridor_width'),
+    ({'corridor_width': 1.2, 'door_width': 1.2}, 'corner_turn'),
+])
+def test_limiting_constraint(ct, overrides, limiting):
+    result = ct.DeliveryRouteEngine.evaluate_matrix(route(**overrides), SCANNER)
+    assert not result['feasible'][0, 0]
+    assert result['limiting'][0, 0] == limiting
+
+def test_gantry_height_includes_dolly_and_clearance(ct):
+    engine = ct.DeliveryRouteEngine
+    needed = 1.9 + engine.DOLLY_HEIGHT + engine.CLEARANCE
+    just_enough = engine.evaluate_matrix(route(door_height=needed, ceiling_clearance=needed), SCANNER)
+    too_low = engine.evaluate_matrix(route(door_height=needed - 0.01, ceiling_clearance=needed - 0.01), SCANNER)
+    assert just_enough['feasible'][0, 0]
+    assert not too_low['door_height_ok'][0, 0] and not too_low['ceiling_ok'][0, 0]
+
+def test_skates_on_a_raised_floor_need_protection(ct):
+    result = ct.DeliveryRouteEngine.evaluate_matrix(route(floor_type='raised access floor'), SCANNER)
+    assert result['floor_protection_required'][0, 0]
+
+def test_for_room_reports_every_scanner_and_is_cached(ct, ct_db, ct_site):
+    engine = ct.DeliveryRouteEngine
+    small = ct.ScannerModel(manufacturer='GE', model_name='Compact', weight=1200, dimensions='1.9 x 0.9 x 1.8 m',
+                            min_room_length=5.5, min_room_width=4.0, min_room_height=2.5, required_power='400V')
+    ct_db.session.add(small)
+    ct_db.session.commit()
+    scanners = [ct_site.scanner, small]
+    
+    ct_site.room.door_height = 2.0
+    ct_site.room.ceiling_clearance = 2.0
+    ct_db.session.commit()
+    result = engine.for_room(ct_site.room, scanners)
+    assert [r['scanner_id'] for r in result] == [ct_site.scanner.id, small.id]
+    assert result[0]['ceiling_ok'] is False
+    assert result[0]['limiting_constraint'] == 'door_height'
+    assert result[1]['ceiling_ok'] is True
+    assert result[1]['feasible'] is True
+    assert engine.for_room(ct_site.room, scanners) is result
+    
+    ct_site.room.door_height = 2.4
+    ct_db.session.commit()
+    assert engine.for_room(ct_site.room, scanners)[0]['limiting_constraint'] == 'ceiling_clearance'
@@ -0,0 +1,126 @@
+"""ElectricalEngine: supply parsing, compatibility, feeder sizing and voltage drop"""
+
+import math
+
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize('text, expected', [
+    ('triphasé 380V', (380.0, 3, None)),
+    ('3-phase 400 V 150 kVA', (400.0, 3, 150.0)),
+    ('Three-Phase 480V', (480.0, 3, None)),
+    ('400V 3ph', (400.0, 3, None)),
+    ('3 φ 415V', (415.0, 3, None)),
+    ('single phase 230V', (230.0, 1, None)),
+    ('monophasé 220V 12.5 kVA', (220.0, 1, 12.5)),
+    ('1-ph 230V', (230.0, 1, None)),
+    ('400V', (400.0, 3, None)),
+    ('220V', (220.0, 1, None)),
+    ('TBD', (None, None, None)),
+])
+def test_power_parsing(ct, text, expected):
+    assert ct.SpecParser.power(text) == expected
+
+@pytest.mark.parametrize('text', ['electrical distribution 220V', 'distribution board 230V'])
+def test_phase_keywords_must_be_whole_words(ct, text):
+    """'tri' inside 'electrical' or 'distribution' is not three-phase"""
+    assert ct.SpecParser.power(text)[1] == 1
+
+def test_compatible_voltage_tolerance_and_phases(ct):
+    engine = ct.ElectricalEngine
+    site_v, site_ph, _ = engine.parse_many(['380V 3-phase', '230V single phase', '400V 1-ph', '480V 3ph'])
+    scanner_v, scanner_ph, _ = engine.parse_many(['400V 3-phase'] * 4)
+    
+    # 380 V is within 10% of 400 V; 480 V and a single-phase supply are not
+    np.testing.assert_array_equal(engine.compatible(site_v, site_ph, scanner_v, scanner_ph),
+                                  [True, False, False, False])
+
+def test_unparseable_supplies_fall_back_to_text_equality(ct):
+    match = ct.ElectricalEngine.power_match(['Hospital grid', 'Hospital grid', '400V 3ph'],
+                                            ['Hospital grid', 'Dedicated feeder', '380V triphasé'])
+    np.testing.assert_array_equal(match, [True, False, True])
+
+def room_inputs(**overrides):
+    room = {'available_power': ['400V 3-phase'], 'panel_distance': [30.0], 'panel_capacity': [250.0],
+            'has_ups': [False], 'ups_kva': [None]}
+    room.update({name: [value] for name, value in overrides.items()})
+    return room
+
+def scanner_inputs(**overrides):
+    scanner = {'required_power': ['400V 3-phase'], 'power_kw': [80.0], 'power_factor': [0.9]}
+    scanner.update({name: [value] for name, value in overrides.items()})
+    return scanner
+
+def test_feeder_sizing_and_voltage_drop(ct):
+    engine = ct.ElectricalEngine
+    matrix = engine.evaluate_matrix(room_inputs(), scanner_inputs())
+    
+    kva = 80 / 0.9
+    current = kva * 1000 / (math.sqrt(3) * 400)
+    assert matrix['required_kva'][0, 0] == pytest.approx(kva)
+    assert matrix['current_a'][0, 0] == pytest.approx(current)
+    
+    # Smallest standard size carrying 125% of the running current
+    design = current * engine.CONTINUOUS_LOAD_FACTOR
+    size = engine.FEEDER_SIZES[np.argmax(engine.FEEDER_AMPACITY >= design)]
+    assert matrix['feeder_mm2'][0, 0] == size
+    
+    sin_phi = math.sqrt(1 - 0.9 ** 2)
+    drop = (math.sqrt(3) * current * 30 * (engine.COPPER_RESISTIVITY / size * 0.9 + engine.CABLE_REACTANCE * sin_phi)
+            / 400 * 100)
+    assert matrix['voltage_drop_pct'][0, 0] == pytest.approx(drop)
+    assert matrix['compatible'][0, 0]
+    assert matrix['panel_adequate'][0, 0]
+
+def test_long_runs_upsize_the_feeder_for_voltage_drop(ct):
+    engine = ct.ElectricalEngine
+    short = engine.evaluate_matrix(room_inputs(), scanner_inputs())
+    long = engine.evaluate_matrix(room_inputs(panel_distance=250.0), scanner_inputs())
+    
+    assert long['feeder_mm2'][0, 0] > short['feeder_mm2'][0, 0]
+    assert long['voltage_drop_pct'][0, 0] <= engine.MAX_VOLTAGE_DROP_PCT
+
+def test_no_standard_size_is_reported_as_unknown(ct):
+    engine = ct.ElectricalEngine
+    matrix = engine.evaluate_matrix(room_inputs(), scanner_inputs(power_kw=600.0))
+    assert np.isnan(matrix['feeder_mm2'][0, 0])
+    assert engine.pair_result(matrix, 0, 0)['feeder_mm2'] is None
+
+def test_single_phase_current(ct):
+    matrix = ct.ElectricalEngine.evaluate_matrix(room_inputs(available_power='230V single phase'),
+                                                 scanner_inputs(required_power='230V single phase', power_kw=9.0))
+    assert matrix['current_a'][0, 0] == pytest.approx(9.0 / 0.9 * 1000 / 230)
+
+def test_rated_kva_is_used_without_a_power_rating(ct):
+    matrix = ct.ElectricalEngine.evaluate_matrix(
+        room_inputs(), scanner_inputs(required_power='400V 3-phase 120 kVA', power_kw=None, power_factor=None))
+    assert matrix['required_kva'][0, 0] == 120.0
+
+def test_panel_and_ups_adequacy(ct):
+    engine = ct.ElectricalEngine
+    small_panel = engine.evaluate_matrix(room_inputs(panel_capacity=100.0), scanner_inputs())
+    unknown_panel = engine.evaluate_matrix(room_inputs(panel_capacity=None), scanner_inputs())
+    assert not small_panel['panel_adequate'][0, 0]
+    assert unknown_panel['panel_adequate'][0, 0]
+    
+    no_ups = engine.evaluate_matrix(room_inputs(has_ups=False, ups_kva=200.0), scanner_inputs())
+    big_ups = engine.evaluate_matrix(room_inputs(has_ups=True, ups_kva=100.0), scanner_inputs())
+    small_ups = engine.evaluate_matrix(room_inputs(has_ups=True, ups_kva=50.0), scanner_inputs())
+    assert not no_ups['ups_adequate'][0, 0]
+    assert big_ups['ups_adequate'][0, 0]
+    assert not small_ups['ups_adequate'][0, 0]
+
+def test_matrix_matches_pairwise_evaluation(ct):
+    engine = ct.ElectricalEngine
+    rooms = {'available_power': ['400V 3-phase', '230V single phase'], 'panel_distance': [30.0, 80.0],
+             'panel_capacity': [250.0, 63.0], 'has_ups': [True, False], 'ups_kva': [100.0, None]}
+    scanners = {'required_power': ['400V 3-phase', '380V triphasé 60 kVA', '230V single phase'],
+                'power_kw': [80.0, None, 9.0], 'power_factor': [0.9, None, 0.85]}
+    matrix = engine.evaluate_matrix(rooms, scanners)
+    assert matrix['current_a'].shape == (2, 3)
+    
+    for i in range(2):
+        for j in range(3):
+            pair = engine.evaluate_matrix({name: [values[i]] for name, values in rooms.items()},
+                                          {name: [values[j]] for name, values in scanners.items()})
+            assert engine.pair_result(matrix, i, j) == engine.pair_result(pair, 0, 0)
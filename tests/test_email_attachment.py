@@ -0,0 +1,32 @@
+"""ProfessionalEmailService._base64_payload: chunked base64 of the PDF attachment"""
+
+import base64
+import io
+import os
+
+import pytest
+
+SIZES = [0, 1, 57, 57 * 1024, 57 * 1024 * 3 + 5]
+
+def content(size):
+    return os.urandom(size)
+
+@pytest.mark.parametrize('size', SIZES)
+def test_file_payload_matches_encodebytes(backup, tmp_path, size):
+    data = content(size)
+    path = tmp_path / 'report.pdf'
+    path.write_bytes(data)
+    with open(path, 'rb') as pdf_file:
+        pdf_file.read(3)  # Already partly read: the payload starts from the beginning
+        assert backup.ProfessionalEmailService._base64_payload(pdf_file) == base64.encodebytes(data).decode('ascii')
+    assert backup.ProfessionalEmailService._base64_payload(io.BytesIO(data)) == base64.encodebytes(data).decode('ascii')
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('wrap', [bytes, bytearray, memoryview])
+def test_buffer_payload_matches_encodebytes(backup, size, wrap):
+    data = content(size)
+    assert backup.ProfessionalEmailService._base64_payload(wrap(data)) == base64.encodebytes(data).decode('ascii')
+
+def test_chunk_size_keeps_mime_lines_whole(backup):
+    # encodebytes wraps every 57 input bytes; a chunk that is not a multiple would split a line
+    assert backup.ProfessionalEmailService.ATTACHMENT_CHUNK % 57 == 0
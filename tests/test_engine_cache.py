@@ -0,0 +1,24 @@
+"""EngineResultCache: the LRU shared by the shielding and delivery route engines"""
+
+def test_get_put_and_miss(ct):
+    cache = ct.EngineResultCache(max_entries=4)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    cache.put('a', 2)
+    assert cache.get('a') == 2
+
+def test_least_recently_used_entry_is_evicted(ct):
+    cache = ct.EngineResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')  # 'b' is now the oldest
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+
+def test_clear(ct):
+    cache = ct.EngineResultCache()
+    cache.put(('site', 1), {'lead_mm': 2.0})
+    cache.clear()
+    assert cache.get(('site', 1)) is None
@@ -0,0 +1,103 @@
+"""RoomGeometry.for_project: every room of a project batched into a few conformity-coloured meshes"""
+
+import base64
+
+import numpy as np
+import pytest
+
+def decode(payload, dtype):
+    return np.frombuffer(base64.b64decode(payload), dtype=dtype)
+
+def add_room(backup, backup_db, backup_site, name, length, score=None):
+    site = backup.SiteSpecification(project_id=backup_site.project.id, scanner_model_id=backup_site.scanner.id,
+                                    site_name=name, room_length=length, room_width=5.0, room_height=3.0)
+    backup_db.session.add(site)
+    backup_db.session.flush()
+    if score is not None:
+        backup_db.session.add(backup.ConformityReport(project_id=backup_site.project.id, site_specification_id=site.id,
+                                                      report_number=f'{name}-1', conformity_score=score))
+    backup_db.session.commit()
+    return site
+
+@pytest.fixture
+def facility(backup, backup_db, backup_site):
+    """Scan Room 1 (90%) plus one more assessed room and two never assessed"""
+    add_room(backup, backup_db, backup_site, 'Room 2', 6.0, score=40.0)
+    add_room(backup, backup_db, backup_site, 'Room 3', 9.0)
+    add_room(backup, backup_db, backup_site, 'Room 4', 7.5)
+    sites, latest = backup.RoomGeometry.project_sites(backup_site.project.id)
+    return sites, latest, backup.RoomGeometry.for_project(backup_site.project, sites, latest)
+
+def test_project_sites_use_each_rooms_latest_score(backup, backup_db, backup_site):
+    report = backup_site.reports[1]
+    report.conformity_score = 70.0
+    report.created_at = backup_site.reports[0].created_at.replace(year=2100)
+    backup_db.session.commit()
+    sites, latest = backup.RoomGeometry.project_sites(backup_site.project.id)
+    assert [site.site_name for site in sites] == ['Scan Room 1']
+    assert latest == {backup_site.site.id: 70.0}
+
+def test_rooms_are_batched_by_assessment(backup, facility):
+    _, _, payload = facility
+    assert payload['title'] == 'Test Project - Facility Overview (4 rooms)'
+    names = [mesh['name'] for mesh in payload['meshes']]
+    assert names == ['Rooms (2 assessed)', 'Rooms (2 not assessed)', 'Required Space', 'Scanners']
+    
+    counts = [(mesh['vertex_count'], mesh['triangle_count']) for mesh in payload['meshes']]
+    assert counts == [(16, 24), (16, 24), (32, 48), (32, 48)]
+    assert payload['meshes'][1]['color'] == '#9ca3af'
+    assert 'intensity' not in payload['meshes'][1]
+
+def test_assessed_rooms_carry_one_score_per_vertex(backup, facility):
+    _, _, payload = facility
+    assessed = payload['meshes'][0]
+    intensity = decode(assessed['intensity'], '<f4')
+    assert len(intensity) == 8 * 2 == assessed['vertex_count']
+    assert intensity.tolist() == [90.0] * 8 + [40.0] * 8
+    assert (assessed['cmin'], assessed['cmax']) == (0, 100)
+    assert assessed['colorscale'] == backup.RoomGeometry.CONFORMITY_COLORSCALE
+
+def test_colour_scale_has_hard_bands_at_the_status_thresholds(backup):
+    scale = backup.RoomGeometry.CONFORMITY_COLORSCALE
+    
+    def colour(score):
+        position = score / 100
+        # Plotly takes the upper stop of a repeated position
+        return [stop_colour for stop, stop_colour in scale if stop <= position][-1]
+    
+    assert [colour(score) for score in (0, 49.9, 50, 84.9, 85, 100)] == [
+        '#dc2626', '#dc2626', '#d97706', '#d97706', '#059669', '#059669']
+    assert [stop for stop, _ in scale] == sorted(stop for stop, _ in scale)
+
+def test_rooms_sit_on_a_non_overlapping_grid(backup, facility):
+    sites, _, payload = facility
+    positions = decode(payload['meshes'][2]['positions'], '<f4').reshape(len(sites), 8, 3)
+    lows, highs = positions.min(axis=1), positions.max(axis=1)
+    for i in range(len(sites)):
+        for j in range(i + 1, len(sites)):
+            apart = np.any(lows[i, :2] >= highs[j, :2]) or np.any(lows[j, :2] >= highs[i, :2])
+            assert apart, (sites[i].site_name, sites[j].site_name)
+
+def test_labels(backup, facility):
+    sites, _, payload = facility
+    labels = payload['labels']
+    assert labels['count'] == len(sites)
+    assert labels['text'] == ['Scan Room 1 (90%)', 'Room 2 (40%)', 'Room 3 (n/a)', 'Room 4 (n/a)']
+    assert len(decode(labels['positions'], '<f4')) == 3 * len(sites)
+
+def test_signature_changes_with_a_new_score(backup, backup_db, backup_site, facility):
+    sites, latest, _ = facility
+    signature = backup.RoomGeometry.facility_signature(sites, latest)
+    backup_db.session.add(backup.ConformityReport(project_id=backup_site.project.id, site_specification_id=sites[2].id,
+                                                  report_number='Room 3-1', conformity_score=60.0))
+    backup_db.session.commit()
+    assert backup.RoomGeometry.facility_signature(*backup.RoomGeometry.project_sites(backup_site.project.id)) != signature
+
+def test_empty_project(backup, backup_db):
+    project = backup.Project(name='Empty', client_name='c')
+    backup_db.session.add(project)
+    backup_db.session.commit()
+    sites, latest = backup.RoomGeometry.project_sites(project.id)
+    payload = backup.RoomGeometry.for_project(project, sites, latest)
+    assert payload['meshes'] == []
+    assert payload['title'] == 'Empty - no rooms'
@@ -0,0 +1,97 @@
+"""FactorBreakdown: per-factor score and cost contributions stored for indexed filtering"""
+
+import pytest
+
+def add_report(ct, ct_db, ct_site, number, score, status='REQUIRES_MODIFICATION', **site_overrides):
+    site = ct_site.site
+    if site_overrides:
+        columns = dict(project_id=ct_site.project.id, scanner_model_id=ct_site.scanner.id, site_name=number,
+                       room_length=7.0, room_width=5.0, room_height=3.0, available_power='380V 3-phase 100 kVA',
+                       has_hvac=True, floor_type='concrete', floor_load_capacity=2500, existing_shielding=True)
+        columns.update(site_overrides)
+        site = ct.SiteSpecification(**columns)
+        ct_db.session.add(site)
+        ct_db.session.flush()
+    report = ct.ConformityReport(project_id=ct_site.project.id, site_specification_id=site.id,
+                                 report_number=number, conformity_score=score, overall_status=status)
+    ct_db.session.add(report)
+    ct_db.session.flush()
+    ct.FactorBreakdown.store_for_report(report)
+    ct_db.session.commit()
+    return report.id
+
+def stored(ct, report_id):
+    return {f.factor: f for f in ct.ReportFactor.query.filter_by(report_id=report_id)}
+
+@pytest.mark.parametrize('score, status', [
+    (77.0, 'REQUIRES_MODIFICATION'),  # AI-extracted score
+    (100.0, 'CONFORMING'),            # Deterministic score, clipped
+    (42.5, 'NON_CONFORMING'),
+])
+def test_score_deltas_sum_to_the_persisted_score(ct, ct_db, ct_site, score, status):
+    factors = stored(ct, add_report(ct, ct_db, ct_site, 'CT-1', score, status))
+    assert set(factors) == set(ct.FactorBreakdown.FACTORS)
+    assert ct.ScoreModel.BASE_SCORE + sum(f.score_delta for f in factors.values()) == pytest.approx(score)
+
+def test_deterministic_rows_and_cost_deltas(ct, ct_db, ct_site):
+    factors = stored(ct, add_report(ct, ct_db, ct_site, 'CT-1', 77.0))
+    # 7 x 5 x 3 m against 6.5 x 4.5 x 2.7 m is over 120% of the required volume
+    assert (factors['dimensions'].passed, factors['dimensions'].score_delta) == (True, 20)
+    assert (factors['power'].passed, factors['power'].score_delta) == (True, 15)
+    assert (factors['hvac'].passed, factors['hvac'].score_delta) == (True, 10)
+    assert (factors['floor_load'].passed, factors['floor_load'].score_delta) == (True, 10)
+    assert factors['status'].score_delta == 77.0 - 105
+    
+    rates = ct.CostTableStore.validate_rates({})
+    assert factors['power'].cost_delta == 0
+    assert factors['neuviz_extras'].cost_delta == (rates['neuviz_engineer'] + rates['neuviz_grounding'] +
+                                                  rates['neuviz_transport'] + rates['neuviz_monitoring'])
+    assert factors['score_band'].multiplier == 0.8  # 77 falls in the >= 70 band
+    assert factors['status'].multiplier == rates['status_multipliers']['REQUIRES_MODIFICATION']
+    assert factors['score_band'].passed is None
+
+def test_storing_again_replaces_the_rows(ct, ct_db, ct_site):
+    report_id = add_report(ct, ct_db, ct_site, 'CT-1', 77.0)
+    report = ct_db.session.get(ct.ConformityReport, report_id)
+    ct.FactorBreakdown.store_for_report(report)
+    ct_db.session.commit()
+    assert ct.ReportFactor.query.filter_by(report_id=report_id).count() == len(ct.FactorBreakdown.FACTORS)
+
+@pytest.fixture
+def failing_reports(ct, ct_db, ct_site):
+    """Reports failing on power alone, on power and HVAC, and on nothing"""
+    return {
+        'power': add_report(ct, ct_db, ct_site, 'P', 70.0, available_power='230V single phase 20 kVA'),
+        'power_hvac': add_report(ct, ct_db, ct_site, 'PH', 50.0, available_power='230V single phase 20 kVA',
+                                 has_hvac=False),
+        'none': add_report(ct, ct_db, ct_site, 'N', 95.0)
+    }
+
+def test_failing_reports_query(ct, failing_reports):
+    def failing(factor, only=False):
+        return sorted(r for (r,) in ct.FactorBreakdown.failing_reports_query(factor, only))
+    
+    assert failing('power') == sorted([failing_reports['power'], failing_reports['power_hvac']])
+    assert failing('power', only=True) == [failing_reports['power']]
+    assert failing('hvac') == [failing_reports['power_hvac']]
+    assert failing('hvac', only=True) == []
+    assert failing('dimensions') == []
+
+def test_summary_counts_failures_per_factor(ct, failing_reports):
+    summary = ct.FactorBreakdown.summary()
+    assert (summary['power']['failing'], summary['power']['reports']) == (2, 3)
+    assert summary['hvac']['failing'] == 1
+    assert summary['power']['avg_cost_delta'] == pytest.approx(2 * 25000 / 3, abs=0.01)
+
+def test_factors_endpoint(ct, ct_site, failing_reports):
+    client = ct.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(ct_site.user.id)
+    
+    only = client.get('/api/reports/factors?failing=power&only=1').get_json()
+    assert [r['id'] for r in only['reports']] == [failing_reports['power']]
+    assert only['reports'][0]['factor_cost'] == 25000
+    
+    both = client.get('/api/reports/factors?failing=power&limit=0').get_json()
+    assert len(both['reports']) == 1  # The limit is clamped to at least one row
+    assert client.get('/api/reports/factors?failing=bogus').status_code == 400
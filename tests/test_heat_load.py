@@ -0,0 +1,81 @@
+"""HeatLoadCalculator: scan-room cooling requirement, shortfall and stored assessments"""
+
+import numpy as np
+import pytest
+
+def test_cooling_capacity_units(ct):
+    parser = ct.SpecParser
+    assert parser.cooling_kw('15 kW cooling') == 15
+    assert parser.cooling_kw('36,000 BTU/h') == pytest.approx(36000 / parser.BTU_PER_KW)
+    assert parser.cooling_kw('10 tons') == pytest.approx(10 * parser.KW_PER_REFRIGERATION_TON)
+    assert parser.cooling_kw('split unit') is None
+    assert parser.cooling_kw(None) is None
+
+def test_compute_batch_sums_every_load(ct):
+    calculator = ct.HeatLoadCalculator
+    batch = calculator.compute_batch([6.0], [7.0], [5.0], [3.0], [8], [2], [15.0])
+    
+    occupant = 3 * calculator.PERSON_LOAD_KW  # Two staff and the patient
+    lighting = 35 * calculator.LIGHTING_W_PER_M2 / 1000
+    ventilation = (calculator.AIR_DENSITY * calculator.AIR_SPECIFIC_HEAT * 8 * 105 / 3600 *
+                   calculator.FRESH_AIR_FRACTION * calculator.OUTDOOR_DELTA_T)
+    required = (6.0 + occupant + lighting + ventilation) * calculator.SAFETY_FACTOR
+    
+    assert batch['occupant_kw'][0] == pytest.approx(occupant)
+    assert batch['lighting_kw'][0] == pytest.approx(lighting)
+    assert batch['ventilation_kw'][0] == pytest.approx(ventilation)
+    assert batch['required_kw'][0] == pytest.approx(required)
+    assert batch['shortfall_kw'][0] == 0.0
+
+def test_compute_batch_defaults_and_shortfall(ct):
+    calculator = ct.HeatLoadCalculator
+    batch = calculator.compute_batch([6.0, 6.0, None], [7.0] * 3, [5.0] * 3, [3.0] * 3,
+                                     [None, 0, 6], [None, 5, 2], [None, np.nan, 1.0])
+    
+    # Unknown or zero air changes use the default; staff is capped at the scan-room maximum
+    np.testing.assert_allclose(batch['ventilation_kw'][:2], batch['ventilation_kw'][2])
+    np.testing.assert_allclose(batch['occupant_kw'], (calculator.MAX_STAFF_IN_SCAN_ROOM + 1) * calculator.PERSON_LOAD_KW)
+    assert batch['equipment_kw'][2] == 0.0
+    
+    # Unparseable capacity counts as no cooling at all
+    np.testing.assert_allclose(batch['available_kw'], [0.0, 0.0, 1.0])
+    np.testing.assert_allclose(batch['shortfall_kw'][:2], batch['required_kw'][:2])
+    assert batch['shortfall_kw'][2] == pytest.approx(batch['required_kw'][2] - 1.0)
+
+def test_assess_stores_and_reuses_assessments(ct, ct_db, ct_site):
+    calculator = ct.HeatLoadCalculator
+    assessment, = calculator.assess([ct_site.site])
+    assert assessment.id is not None
+    assert assessment.available_kw == 15.0
+    assert assessment.adequate == (assessment.shortfall_kw == 0)
+    
+    computed_at = assessment.computed_at
+    assert calculator.assess([ct_site.site])[0].computed_at == computed_at
+    
+    ct_site.site.hvac_capacity = '2 kW'
+    ct_db.session.commit()
+    reassessed, = calculator.assess([ct_site.site])
+    assert reassessed.id == assessment.id
+    assert reassessed.available_kw == 2.0
+    assert not reassessed.adequate
+    assert ct.HeatLoadAssessment.query.count() == 1
+
+def test_assess_without_commit_leaves_the_transaction_to_the_caller(ct, ct_db, ct_site):
+    """Read paths compute on the fly; nothing is written unless the caller commits"""
+    assessment, = ct.HeatLoadCalculator.assess([ct_site.site], commit=False)
+    assert assessment.required_kw > 0
+    
+    ct_db.session.rollback()
+    assert ct.HeatLoadAssessment.query.count() == 0
+
+def test_assess_project_covers_every_site(ct, ct_db, ct_site):
+    second = ct.SiteSpecification(project_id=ct_site.project.id, scanner_model_id=ct_site.scanner.id,
+                                  site_name='Scan Room 2', room_length=6.0, room_width=4.5, room_height=2.8,
+                                  has_hvac=False)
+    ct_db.session.add(second)
+    ct_db.session.commit()
+    
+    assessments = ct.HeatLoadCalculator.assess_project(ct_site.project)
+    assert [a.site_specification_id for a in assessments] == [ct_site.site.id, second.id]
+    assert assessments[1].available_kw == 0.0
+    assert assessments[1].shortfall_kw == assessments[1].required_kw
@@ -0,0 +1,126 @@
+"""PDFCache: rendered report PDFs on disk, keyed by revision and invalidated on commit"""
+
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+@pytest.fixture
+def cache(appbuilder, tmp_path, monkeypatch):
+    monkeypatch.setattr(appbuilder.PDFCache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    return appbuilder.PDFCache
+
+@pytest.fixture
+def renders(appbuilder, monkeypatch):
+    """Report ids rendered, with the ReportLab generator replaced by a stub PDF"""
+    renders = []
+    
+    def render(self, report, include_3d=True, include_charts=True):
+        renders.append(report.id)
+        return io.BytesIO(b'%PDF-1.4 report ' + str(report.id).encode())
+    
+    monkeypatch.setattr(appbuilder.EnhancedPDFReportGenerator, 'generate_enhanced_report', render)
+    return renders
+
+@pytest.fixture
+def site(appbuilder, appbuilder_db):
+    scanner = appbuilder.ScannerModel(manufacturer='GE', model_name='A', min_room_length=6, min_room_width=4,
+                                      min_room_height=2.7, required_power='400V')
+    project = appbuilder.Project(name='p', client_name='c')
+    appbuilder_db.session.add_all([scanner, project])
+    appbuilder_db.session.flush()
+    site = appbuilder.SiteSpecification(project_id=project.id, scanner_model_id=scanner.id, site_name='s',
+                                        room_length=7, room_width=5, room_height=3)
+    appbuilder_db.session.add(site)
+    appbuilder_db.session.flush()
+    report = appbuilder.ConformityReport(project_id=project.id, site_specification_id=site.id, report_number='R1')
+    appbuilder_db.session.add(report)
+    appbuilder_db.session.commit()
+    return site
+
+def cached_file(cache, report_id):
+    os.makedirs(cache.CACHE_DIR, exist_ok=True)
+    path = cache.path(report_id, 'abc')
+    with open(path, 'wb') as f:
+        f.write(b'%PDF')
+    return path
+
+def test_get_or_render_renders_each_revision_once(appbuilder, appbuilder_db, site, cache, renders):
+    report = site.conformity_reports[0]
+    path = cache.get_or_render(report)
+    assert cache.get_or_render(report) == path
+    assert renders == [report.id]
+    
+    # Options are part of the key; each report keeps one file on disk
+    other = cache.get_or_render(report, include_3d=False)
+    assert other != path
+    assert os.listdir(cache.CACHE_DIR) == [os.path.basename(other)]
+    
+    # A new revision replaces every older file of the same report
+    report.updated_at = datetime.utcnow() + timedelta(seconds=1)
+    appbuilder_db.session.commit()
+    new_path = cache.get_or_render(report)
+    assert new_path != path
+    assert os.listdir(cache.CACHE_DIR) == [os.path.basename(new_path)]
+
+def test_site_change_invalidates_only_after_commit(appbuilder, appbuilder_db, site, cache):
+    path = cached_file(cache, site.conformity_reports[0].id)
+    appbuilder_db.session.expire_all()
+    
+    site = appbuilder_db.session.get(appbuilder.SiteSpecification, site.id)
+    site.room_length = 8
+    appbuilder_db.session.flush()
+    assert os.path.exists(path)
+    appbuilder_db.session.rollback()
+    assert os.path.exists(path)
+    
+    site = appbuilder_db.session.get(appbuilder.SiteSpecification, site.id)
+    site.room_length = 8
+    appbuilder_db.session.commit()
+    assert not os.path.exists(path)
+
+def test_scanner_change_invalidates_every_report(appbuilder, appbuilder_db, site, cache):
+    paths = [cached_file(cache, report_id) for report_id in (site.conformity_reports[0].id, 999)]
+    scanner = appbuilder_db.session.get(appbuilder.ScannerModel, site.scanner_model_id)
+    scanner.model_name = 'B'
+    appbuilder_db.session.commit()
+    assert not any(os.path.exists(path) for path in paths)
+
+def test_invalidate_one_report(appbuilder, cache):
+    keep, drop = cached_file(cache, 1), cached_file(cache, 2)
+    cache.invalidate(2)
+    assert os.path.exists(keep) and not os.path.exists(drop)
+    cache.invalidate(3)  # Nothing cached for it
+
+def test_invalidate_tolerates_files_that_cannot_be_removed(appbuilder, cache, monkeypatch):
+    path = cached_file(cache, 1)
+    
+    def fail(path):
+        raise PermissionError(path)
+    
+    monkeypatch.setattr(os, 'remove', fail)
+    cache.invalidate(1)
+    cache.invalidate()
+    assert os.path.exists(path)
+
+def test_invalidate_without_a_cache_directory(appbuilder, cache):
+    cache.invalidate()
+    cache.invalidate(1)
+    assert not os.path.exists(cache.CACHE_DIR)
+
+def test_eviction_drops_least_recently_served_files(appbuilder, cache, monkeypatch):
+    os.makedirs(cache.CACHE_DIR)
+    now = time.time()
+    for age, name in enumerate(['newest', 'middle', 'oldest']):
+        path = os.path.join(cache.CACHE_DIR, f'report_{name}_x.pdf')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 100)
+        os.utime(path, (now - age * 60, now - age * 60))
+    with open(os.path.join(cache.CACHE_DIR, 'report_1_x.pdf.tmp'), 'wb') as f:
+        f.write(b'x' * 1000)  # In-flight renders are not counted
+    
+    monkeypatch.setattr(cache, 'MAX_BYTES', 200)
+    cache._evict()
+    assert sorted(os.listdir(cache.CACHE_DIR)) == ['report_1_x.pdf.tmp', 'report_middle_x.pdf', 'report_newest_x.pdf']
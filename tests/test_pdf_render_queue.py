@@ -0,0 +1,111 @@
+"""PDFRenderQueue: picklable report snapshots, job completion and the job table, on a synchronous executor"""
+
+import os
+import pickle
+from concurrent.futures import Future
+
+import pytest
+
+class SyncExecutor:
+    """Runs queued jobs inline when drained, after submit() has returned as it does with the real pool"""
+    
+    def __init__(self):
+        self.pending = []
+    
+    def submit(self, fn, *args):
+        future = Future()
+        self.pending.append((future, fn, args))
+        return future
+    
+    def drain(self):
+        while self.pending:
+            future, fn, args = self.pending.pop(0)
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+@pytest.fixture
+def queue(backup, backup_db, tmp_path, monkeypatch):
+    monkeypatch.setitem(backup.app.config, 'ARTIFACT_ROOT', str(tmp_path / 'artifacts'))
+    monkeypatch.setattr(backup.PDFRenderQueue, '_executor', SyncExecutor())
+    monkeypatch.setattr(backup.PDFRenderQueue, '_jobs', {})
+    return backup.PDFRenderQueue
+
+def stub_worker(snapshot, include_visualizations, output_path):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(b'%PDF-1.4 ' + snapshot.report_number.encode())
+    return {'path': output_path, 'bytes': os.path.getsize(output_path), 'render_seconds': 0.0}
+
+def test_snapshot_survives_pickling(backup, backup_site):
+    snapshot = pickle.loads(pickle.dumps(backup.PDFRenderQueue.snapshot(backup_site.reports[0])))
+    assert (snapshot.report_number, snapshot.conformity_score) == ('CT-1', 90.0)
+    assert snapshot.project.name == 'Test Project'
+    assert snapshot.site_specification.site_name == 'Scan Room 1'
+    assert snapshot.site_specification.scanner_model.model_name == '128'
+
+def test_completed_job_stores_the_pdf_on_the_report(backup, backup_db, backup_site, queue):
+    report_id = backup_site.reports[0].id
+    job_id = queue.submit(backup_site.reports[0], include_visualizations=False)
+    assert queue.status(job_id)['status'] == 'running'
+    queue._executor.drain()
+    job = queue.status(job_id)
+    assert job['status'] == 'completed'
+    assert job['error'] is None and job['bytes'] > 0
+    
+    # Completion runs in its own app context, as on the pool's callback thread
+    report = backup_db.session.get(backup.ConformityReport, report_id)
+    assert report.pdf_generated
+    assert report.pdf_path == job['pdf_path']
+    assert backup.ArtifactStore.is_object(report.pdf_path)
+    with open(report.pdf_path, 'rb') as f:
+        assert f.read(4) == b'%PDF'
+
+def test_failed_render_is_recorded(backup, backup_db, backup_site, queue, monkeypatch):
+    def broken(snapshot, include_visualizations, output_path):
+        raise RuntimeError('renderer crashed')
+    
+    monkeypatch.setattr(backup, 'render_pdf_worker', broken)
+    job_id = queue.submit(backup_site.reports[0])
+    queue._executor.drain()
+    job = queue.status(job_id)
+    assert (job['status'], job['error']) == ('failed', 'renderer crashed')
+    assert job['finished_at'] is not None
+    assert not backup_db.session.get(backup.ConformityReport, backup_site.reports[0].id).pdf_generated
+
+def test_job_table_prunes_only_finished_jobs(backup, backup_db, backup_site, queue, monkeypatch):
+    monkeypatch.setattr(backup, 'render_pdf_worker', stub_worker)
+    monkeypatch.setattr(queue, 'MAX_TRACKED_JOBS', 2)
+    report_id = backup_site.reports[0].id
+    finished = []
+    for _ in range(3):
+        finished.append(queue.submit(backup_db.session.get(backup.ConformityReport, report_id)))
+        queue._executor.drain()
+    assert list(queue._jobs) == finished[1:]
+    
+    # Jobs still running are never dropped, even past the limit
+    report = backup_db.session.get(backup.ConformityReport, report_id)
+    pending = [queue.submit(report) for _ in range(3)]
+    assert list(queue._jobs) == pending
+    assert queue.latest_for_report(report_id)['job_id'] == pending[-1]
+
+def test_status_endpoint_checks_access_and_hides_internals(backup, backup_db, backup_site, queue, monkeypatch):
+    monkeypatch.setattr(backup, 'render_pdf_worker', stub_worker)
+    user_id, project_id = backup_site.user.id, backup_site.project.id
+    job_id = queue.submit(backup_site.reports[0])
+    queue._executor.drain()
+    client = backup.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+    
+    job = client.get(f'/api/pdf-jobs/{job_id}').get_json()
+    assert job['status'] == 'completed'
+    assert not set(job) & {'pdf_path', 'error'}
+    assert client.get('/api/pdf-jobs/unknown').status_code == 404
+    
+    backup_db.session.get(backup.User, user_id).role = 'Client'
+    backup_db.session.get(backup.Project, project_id).client_email = 'someone-else@example.com'
+    backup_db.session.commit()
+    denied = client.get(f'/api/pdf-jobs/{job_id}')
+    assert (denied.status_code, denied.get_json()) == (403, {'error': 'Access denied'})
@@ -0,0 +1,99 @@
+"""PlacementSolver: gantry/table layouts with service clearances and the door keep-out"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+SCANNER = '2.2 x 1.0 x 1.9 m'
+
+def room_rects(ct, layout, gantry_width, system_length):
+    """Room-frame clearance rectangles of a solved layout"""
+    solver = ct.PlacementSolver
+    local, _ = solver._local_rects(gantry_width, system_length)
+    gx, gy = layout['gantry_center']
+    return solver._rotate(local, layout['rotation_deg']) + [gx, gx, gy, gy]
+
+def test_unparseable_scanner_dimensions(ct):
+    result = ct.PlacementSolver.solve(8.0, 6.0, 1.2, 'see brochure')
+    assert result['feasible'] is None
+    assert result['layouts'] == []
+
+def test_minimal_room_covers_every_clearance(ct):
+    solver = ct.PlacementSolver
+    result = solver.solve(8.0, 6.0, 1.2, SCANNER)
+    assert (result['gantry_width'], result['system_length']) == (1.0, 2.2)
+    
+    # Rear service + gantry depth + table + foot clearance, by gantry width + side service
+    table_length = 2.2 - solver.GANTRY_DEPTH
+    length = (solver.GANTRY_SERVICE_CLEARANCE + solver.GANTRY_DEPTH + table_length + solver.TABLE_FOOT_CLEARANCE)
+    width = 1.0 + 2 * solver.GANTRY_SERVICE_CLEARANCE
+    assert result['minimal_room'] == {'length': round(length, 2), 'width': round(width, 2), 'rotation_deg': 0}
+
+def test_layouts_fit_the_room_and_avoid_the_door(ct):
+    solver = ct.PlacementSolver
+    result = solver.solve(8.0, 6.0, 1.2, SCANNER, top=4)
+    assert result['feasible']
+    assert len(result['layouts']) == 4
+    scores = [layout['score'] for layout in result['layouts']]
+    assert scores == sorted(scores, reverse=True)
+    
+    keepout = (8.0 / 2 - 0.6, 8.0 / 2 + 0.6, 0.0, solver.DOOR_KEEPOUT_DEPTH)
+    for layout in result['layouts']:
+        rects = room_rects(ct, layout, 1.0, 2.2)
+        assert np.all(rects[:, 0] >= -1e-9) and np.all(rects[:, 1] <= 8.0 + 1e-9)
+        assert np.all(rects[:, 2] >= -1e-9) and np.all(rects[:, 3] <= 6.0 + 1e-9)
+        overlaps = ((rects[:, 0] < keepout[1]) & (rects[:, 1] > keepout[0]) &
+                    (rects[:, 2] < keepout[3]) & (rects[:, 3] > keepout[2]))
+        assert not overlaps.any()
+        assert layout['margin_m'] >= 0
+
+def test_table_sits_along_the_patient_axis(ct):
+    solver = ct.PlacementSolver
+    result = solver.solve(8.0, 6.0, 1.2, SCANNER, top=4)
+    offset = solver.GANTRY_DEPTH / 2 + (2.2 - solver.GANTRY_DEPTH) / 2
+    for layout in result['layouts']:
+        dx, dy = solver._rotate_point(offset, layout['rotation_deg'])
+        gx, gy = layout['gantry_center']
+        assert layout['table_center'] == pytest.approx([gx + dx, gy + dy], abs=0.011)
+
+def test_door_keepout_removes_positions(ct):
+    def valid_positions(door_width):
+        layouts = ct.PlacementSolver.solve(6.0, 4.5, door_width, SCANNER, top=4)['layouts']
+        return {layout['rotation_deg']: layout['valid_positions'] for layout in layouts}
+    
+    without_door, with_door = valid_positions(None), valid_positions(1.4)
+    assert all(with_door.get(rotation, 0) < count for rotation, count in without_door.items())
+
+def test_room_smaller_than_the_minimal_envelope_is_infeasible(ct):
+    result = ct.PlacementSolver.solve(3.5, 2.8, 0.9, SCANNER)
+    assert result['feasible'] is False
+    assert result['layouts'] == []
+    assert result['minimal_room']['length'] > 3.5
+
+def test_for_site_spec_uses_the_catalog_dimensions(ct):
+    site = SimpleNamespace(room_length=8.0, room_width=6.0, door_width=1.2,
+                           catalog_scanner=SimpleNamespace(dimensions=SCANNER))
+    assert ct.PlacementSolver.for_site_spec(site, top=2) == ct.PlacementSolver.solve(8.0, 6.0, 1.2, SCANNER, top=2)
+
+@pytest.mark.parametrize('length, width', [(0.0, 6.0), (8.0, -1.0), (None, 6.0)])
+def test_non_positive_room_dimensions(ct, length, width):
+    result = ct.PlacementSolver.solve(length, width, 1.2, SCANNER)
+    assert result['feasible'] is None
+    assert result['layouts'] == []
+
+def test_placement_endpoint_bounds(ct, ct_db, ct_site):
+    client = ct.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(ct_site.user.id)
+    url = f'/api/site-specs/{ct_site.site.id}/placement'
+    
+    assert len(client.get(f'{url}?top=0').get_json()['layouts']) == 1
+    assert len(client.get(f'{url}?top=-2').get_json()['layouts']) == 1
+    assert len(client.get(f'{url}?top=99').get_json()['layouts']) <= len(ct.PlacementSolver.ROTATIONS)
+    
+    ct_site.site.room_width = 0.0
+    ct_db.session.commit()
+    response = client.get(url)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Room length and width must be positive'}
@@ -0,0 +1,45 @@
+"""PlotlyAsset and embed_json: plotly.js as a fingerprinted, immutable asset and safely embedded figure JSON"""
+
+import json
+
+import plotly.graph_objects as go
+
+def test_url_carries_the_content_fingerprint(backup):
+    asset = backup.PlotlyAsset
+    assert asset.url() == f'/assets/plotly-{asset.fingerprint()}.min.js'
+    assert asset.script_tag() == f'<script src="{asset.url()}"></script>'
+    assert len(asset.fingerprint()) == 12
+
+def test_stale_fingerprint_redirects_to_the_current_url(backup):
+    response = backup.app.test_client().get('/assets/plotly-000000000000.min.js')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(backup.PlotlyAsset.url())
+
+def test_asset_is_immutable_and_revalidates_by_etag(backup):
+    client = backup.app.test_client()
+    response = client.get(backup.PlotlyAsset.url())
+    assert response.status_code == 200
+    assert response.mimetype == 'application/javascript'
+    assert response.headers['Cache-Control'] == f'public, max-age={backup.PlotlyAsset.MAX_AGE}, immutable'
+    assert response.headers['ETag'] == f'"{backup.PlotlyAsset.fingerprint()}"'
+    assert b'plotly' in response.data[:2000].lower()
+    
+    cached = client.get(backup.PlotlyAsset.url(), headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+def test_embed_json_keeps_user_text_inside_the_script(backup):
+    # Plotly's own JSON already escapes '<'; stored figure JSON from json.dumps does not
+    figure_json = json.dumps({'data': [], 'layout': {'title': {'text': 'Room </script><script>alert(1)</script>'}}})
+    html = backup.Advanced3DVisualizationEngine.embed_json(figure_json, 'dashboard-1')
+    assert html.count('</script>') == 1
+    assert '<\\/script><script>alert(1)<\\/script>' in html
+    assert '<div id="dashboard-1"></div>' in html
+    
+    # The escape is still valid JSON for the same figure
+    embedded = html.split('const figure = ', 1)[1].split(';\n', 1)[0]
+    assert json.loads(embedded) == json.loads(figure_json)
+
+def test_figure_json_is_already_script_safe(backup):
+    fig = go.Figure(layout=go.Layout(title='Room </script>'))
+    assert '</' not in backup.Advanced3DVisualizationEngine.figure_json(fig)
@@ -0,0 +1,105 @@
+"""ScannerRecommender: budget-aware scoring of the whole catalog for one room"""
+
+import pytest
+
+def add_scanner(ct, ct_db, name, **overrides):
+    columns = dict(manufacturer='GE', model_name=name, weight=2000, dimensions='2.2 x 1.0 x 1.9 m',
+                   min_room_length=6.5, min_room_width=4.5, min_room_height=2.7,
+                   required_power='380V 3-phase 80 kVA', radiation_shielding='2.0 mm Pb at 140 kVp',
+                   price_range_min=600_000, price_range_max=900_000, installation_complexity='Medium')
+    columns.update(overrides)
+    scanner = ct.ScannerModel(**columns)
+    ct_db.session.add(scanner)
+    ct_db.session.commit()
+    return scanner.id
+
+def by_id(result):
+    return {r['scanner_id']: r for r in result['recommendations']}
+
+def test_ranking_is_sorted_and_bounded(ct, ct_db, ct_site):
+    for i in range(6):
+        add_scanner(ct, ct_db, f'M{i}', min_room_length=5.5 + i * 0.4, installation_complexity=['Low', 'High'][i % 2])
+    result = ct.ScannerRecommender.recommend(ct_site.room, budget=2_000_000, k=3)
+    
+    assert result['catalog_size'] == 7
+    scores = [r['score'] for r in result['recommendations']]
+    assert len(scores) == 3
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 <= score <= 100 for score in scores)
+    assert len(ct.ScannerRecommender.recommend(ct_site.room, k=50)['recommendations']) == 7
+
+def test_fit_margin_component(ct, ct_db, ct_site):
+    recommender = ct.ScannerRecommender
+    result = recommender.recommend(ct_site.room, budget=2_000_000)
+    top = by_id(result)[ct_site.scanner.id]
+    
+    # 7.0 m against a 6.5 m minimum is the tightest dimension
+    margin = 7.0 / 6.5 - 1
+    assert top['fit_margin_pct'] == round(margin * 100, 1)
+    expected = (margin + recommender.FIT_MARGIN_TARGET) / (2 * recommender.FIT_MARGIN_TARGET)
+    assert top['components']['fit'] == round(expected, 3)
+    assert top['explanations'][0] == f'Room exceeds the minimum length by {margin * 100:.0f}%'
+
+def test_scanners_needing_site_work_rank_lower(ct, ct_db, ct_site):
+    reference = add_scanner(ct, ct_db, 'Reference')
+    too_big = add_scanner(ct, ct_db, 'Too big', min_room_length=9.0)
+    single_phase = add_scanner(ct, ct_db, 'Single phase', required_power='230V single phase 20 kVA')
+    result = by_id(ct.ScannerRecommender.recommend(ct_site.room, budget=2_000_000, k=10))
+    baseline = result[reference]
+    
+    assert result[too_big]['score'] < baseline['score']
+    assert result[too_big]['fit_margin_pct'] < 0
+    assert result[too_big]['modification_cost'] > baseline['modification_cost']
+    
+    assert 'Electrical upgrade required' in result[single_phase]['explanations']
+    assert result[single_phase]['modification_cost'] > baseline['modification_cost']
+    assert result[single_phase]['score'] < baseline['score']
+
+def test_budget_drives_the_price_component(ct, ct_db, ct_site):
+    recommender = ct.ScannerRecommender
+    roomy = recommender.recommend(ct_site.room, budget=5_000_000)['recommendations'][0]
+    tight = recommender.recommend(ct_site.room, budget=500_000)['recommendations'][0]
+    assert roomy['components']['price'] == 1.0 and roomy['within_budget'] is True
+    assert tight['components']['price'] == 0.0 and tight['within_budget'] is False
+    assert any(reason.startswith('Price $600,000 - $900,000 exceeds') for reason in tight['explanations'])
+
+def test_without_a_budget_price_is_neutral(ct, ct_db, ct_site):
+    add_scanner(ct, ct_db, 'Unpriced', price_range_min=None, price_range_max=None)
+    result = ct.ScannerRecommender.recommend(ct_site.room, budget=0)
+    for recommendation in result['recommendations']:
+        assert recommendation['components']['price'] == 0.5
+        assert recommendation['within_budget'] is None
+
+def test_project_budget_is_the_default(ct, ct_db, ct_site):
+    assert ct.ScannerRecommender.recommend(ct_site.room)['budget'] == ct_site.project.budget
+
+def test_catalog_columns_follow_the_snapshot(ct, ct_db, ct_site):
+    recommender = ct.ScannerRecommender
+    columns = recommender.catalog_columns()
+    assert recommender.catalog_columns() is columns
+    
+    ct_site.scanner.min_room_length = 6.0
+    ct_db.session.commit()
+    rebuilt = recommender.catalog_columns()
+    assert rebuilt is not columns
+    assert rebuilt['min_dimensions'][0, 0] == 6.0
+
+def test_empty_catalog(ct, ct_db):
+    user = ct.User(username='u', email='u@example.com', password_hash='x', first_name='a', last_name='b')
+    project = ct.Project(name='Empty', client_name='c')
+    ct_db.session.add_all([user, project])
+    ct_db.session.flush()
+    room = ct.ManualRoomEntry(project_id=project.id, entered_by=user.id, site_name='R',
+                              room_length=7.0, room_width=5.0, room_height=3.0)
+    ct_db.session.add(room)
+    ct_db.session.commit()
+    result = ct.ScannerRecommender.recommend(room)
+    assert result['catalog_size'] == 0
+    assert result['recommendations'] == []
+
+@pytest.mark.parametrize('complexity, expected', [('Low', 1.0), ('Medium', 0.5), ('High', 0.0)])
+def test_complexity_component(ct, ct_db, ct_site, complexity, expected):
+    ct_site.scanner.installation_complexity = complexity
+    ct_db.session.commit()
+    top = by_id(ct.ScannerRecommender.recommend(ct_site.room))[ct_site.scanner.id]
+    assert top['components']['complexity'] == expected
@@ -0,0 +1,85 @@
+"""ProjectReportBundle: a project's report PDFs streamed as one ZIP"""
+
+import io
+import zipfile
+
+import pytest
+
+@pytest.fixture
+def stub_render(backup, monkeypatch):
+    """Replace ReportLab rendering with a small PDF per report; report numbers in `failing` raise"""
+    failing = set()
+    
+    def render(self, report, include_visualizations=True, output=None):
+        if report.report_number in failing:
+            raise RuntimeError('render exploded')
+        output.write(b'%PDF-1.4 ' + report.report_number.encode() * 1000)
+        return output
+    
+    monkeypatch.setattr(backup.ProfessionalPDFReportGenerator, 'generate_comprehensive_report', render)
+    return failing
+
+def bundle(backup, project):
+    chunks = list(backup.ProjectReportBundle.stream(project))
+    return chunks, zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+
+def test_zip_chunk_sink_drains_what_was_written(backup):
+    sink = backup.ZipChunkSink()
+    sink.write(b'ab')
+    sink.write(memoryview(b'cd'))
+    assert sink.drain() == b'abcd'
+    assert sink.drain() == b''
+
+def test_bundle_holds_the_index_and_every_report(backup, backup_site, stub_render):
+    chunks, archive = bundle(backup, backup_site.project)
+    assert archive.testzip() is None
+    assert archive.namelist() == ['00_Report_Index.pdf',
+                                  'Promamec_Professional_Analysis_CT-1.pdf',
+                                  'Promamec_Professional_Analysis_CT-2.pdf']
+    assert archive.read('00_Report_Index.pdf').startswith(b'%PDF')
+    assert archive.read('Promamec_Professional_Analysis_CT-2.pdf') == b'%PDF-1.4 ' + b'CT-2' * 1000
+    assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+    assert len(chunks) > 3  # Streamed member by member, not built in one piece
+
+def test_stored_pdf_is_streamed_from_disk(backup, backup_db, backup_site, stub_render, tmp_path, monkeypatch):
+    monkeypatch.setattr(backup.ProjectReportBundle, 'CHUNK_SIZE', 1024)
+    stored = tmp_path / 'stored.pdf'
+    stored.write_bytes(b'%PDF-1.4 stored' * 500)
+    backup_site.reports[0].pdf_path = str(stored)
+    backup_db.session.commit()
+    
+    assert list(backup.ProjectReportBundle.pdf_chunks(backup_site.reports[0]))[0] == stored.read_bytes()[:1024]
+    _, archive = bundle(backup, backup_site.project)
+    assert archive.read('Promamec_Professional_Analysis_CT-1.pdf') == stored.read_bytes()
+
+def test_failed_render_leaves_only_an_error_note(backup, backup_site, stub_render):
+    stub_render.add('CT-1')
+    _, archive = bundle(backup, backup_site.project)
+    assert archive.testzip() is None
+    assert archive.namelist() == ['00_Report_Index.pdf', 'CT-1_ERROR.txt',
+                                  'Promamec_Professional_Analysis_CT-2.pdf']
+    assert archive.read('CT-1_ERROR.txt') == b'PDF generation failed: render exploded'
+
+def test_report_deleted_while_streaming(backup, backup_db, backup_site, stub_render, monkeypatch):
+    rows = backup.ProjectReportBundle.index_rows(backup_site.project.id)
+    backup_db.session.delete(backup_site.reports[1])
+    backup_db.session.commit()
+    monkeypatch.setattr(backup.ProjectReportBundle, 'index_rows', staticmethod(lambda project_id: rows))
+    
+    _, archive = bundle(backup, backup_site.project)
+    assert archive.namelist() == ['00_Report_Index.pdf', 'Promamec_Professional_Analysis_CT-1.pdf', 'CT-2_ERROR.txt']
+    assert b'deleted' in archive.read('CT-2_ERROR.txt')
+
+def test_index_rows_are_columns_only(backup, backup_site):
+    rows = backup.ProjectReportBundle.index_rows(backup_site.project.id)
+    assert [(row.report_number, row.site_name, row.model_name) for row in rows] == [
+        ('CT-1', 'Scan Room 1', '128'), ('CT-2', 'Scan Room 1', '128')]
+
+def test_bundle_renders_real_pdfs(backup, backup_site):
+    _, archive = bundle(backup, backup_site.project)
+    assert archive.testzip() is None
+    assert archive.namelist() == ['00_Report_Index.pdf',
+                                  'Promamec_Professional_Analysis_CT-1.pdf',
+                                  'Promamec_Professional_Analysis_CT-2.pdf']
+    for name in archive.namelist():
+        assert archive.read(name).startswith(b'%PDF'), name
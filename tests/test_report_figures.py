@@ -0,0 +1,81 @@
+"""ReportFigureStore: figure JSON stored per report revision on write paths and served on read paths"""
+
+import pytest
+
+def kinds(backup, report_id):
+    return sorted(f.kind for f in backup.ReportFigure.query.filter_by(report_id=report_id))
+
+@pytest.fixture
+def stored(backup, backup_db, backup_site):
+    """Both figures of both reports stored for their current revision"""
+    for report in backup_site.reports:
+        backup.ReportFigureStore.refresh(report)
+    backup_db.session.commit()
+    return backup_site
+
+def test_get_serves_the_stored_revision(backup, stored, monkeypatch):
+    report = stored.reports[0]
+    expected = backup.ReportFigure.query.filter_by(report_id=report.id, kind='dashboard').one().figure_json
+    monkeypatch.setattr(backup.ReportFigureStore, 'build', staticmethod(lambda report, kind: pytest.fail('rebuilt')))
+    assert backup.ReportFigureStore.get(report, 'dashboard') == expected
+
+def test_get_builds_a_missing_figure_without_writing(backup, backup_db, backup_site, monkeypatch):
+    report = backup_site.reports[0]
+    monkeypatch.setattr(backup_db.session, 'commit', lambda: pytest.fail('a read committed'))
+    figure_json = backup.ReportFigureStore.get(report, 'room_model')
+    assert figure_json == backup.ReportFigureStore.build(report, 'room_model')
+    assert not backup_db.session.new
+    assert kinds(backup, report.id) == []
+
+def test_figure_endpoints_do_not_store(backup, backup_site):
+    client = backup.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(backup_site.user.id)
+    report_id = backup_site.reports[0].id
+    for kind in ('dashboard', 'room-model'):
+        response = client.get(f'/api/reports/{report_id}/figures/{kind}')
+        assert (response.status_code, response.mimetype) == (200, 'application/json')
+    assert backup.ReportFigure.query.count() == 0
+
+def test_report_edit_discards_only_its_dashboard(backup, backup_db, stored):
+    edited, other = stored.reports
+    edited.recommendations = 'Proceed with care.'  # Not drawn
+    backup_db.session.commit()
+    assert kinds(backup, edited.id) == ['dashboard', 'room_model']
+    
+    edited.conformity_score = 70.0
+    backup_db.session.commit()
+    assert kinds(backup, edited.id) == ['room_model']
+    assert kinds(backup, other.id) == ['dashboard', 'room_model']
+
+def test_site_edit_discards_the_room_models_of_its_reports(backup, backup_db, stored):
+    site = stored.site
+    site.available_power = '400V 3-phase 120 kVA'  # Not drawn
+    backup_db.session.commit()
+    assert backup.ReportFigure.query.count() == 4
+    
+    site.room_length = 8.0
+    backup_db.session.commit()
+    for report in stored.reports:
+        assert kinds(backup, report.id) == ['dashboard']
+
+def test_stale_figure_is_rebuilt_until_refreshed(backup, backup_db, stored):
+    report = stored.reports[0]
+    original = backup.ReportFigureStore.get(report, 'dashboard')
+    figure = backup.ReportFigure.query.filter_by(report_id=report.id, kind='dashboard').one()
+    figure.revision_key = 'r0-stale'
+    backup_db.session.commit()
+    assert backup.ReportFigureStore.get(report, 'dashboard') == original
+    
+    backup.ReportFigureStore.refresh(report, kinds=('dashboard',))
+    backup_db.session.commit()
+    assert figure.revision_key == backup.ReportFigureStore.revision_key(report, 'dashboard')
+
+def test_site_admin_edit_stores_fresh_room_models(backup, backup_db, stored):
+    site = stored.site
+    site.room_length = 8.0
+    backup_db.session.commit()
+    backup.ProfessionalSiteSpecAdminView.after_model_change(None, None, site, False)
+    for report in stored.reports:
+        figure = backup.ReportFigure.query.filter_by(report_id=report.id, kind='room_model').one()
+        assert figure.revision_key == backup.ReportFigureStore.revision_key(report, 'room_model')
@@ -0,0 +1,130 @@
+"""RoomGeometry: room, clearance and scanner meshes encoded as typed binary buffers"""
+
+import base64
+
+import numpy as np
+import pytest
+
+def decode(payload, dtype):
+    return np.frombuffer(base64.b64decode(payload), dtype=dtype)
+
+def closed_and_outward(positions, triangles):
+    """Every edge is shared by exactly two faces and the signed volume is positive"""
+    edges = np.sort(np.vstack([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]]), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    a, b, c = (positions[triangles[:, n]].astype(np.float64) for n in range(3))
+    return np.all(counts == 2), np.einsum('ij,ij->i', a, np.cross(b, c)).sum() / 6
+
+def test_box(backup):
+    geometry = backup.RoomGeometry
+    positions, triangles = geometry.box((1, 2, 0), (7, 5, 3))
+    assert positions.dtype == np.float32 and triangles.dtype == np.uint32
+    assert positions.min(axis=0).tolist() == [1, 2, 0]
+    assert positions.max(axis=0).tolist() == [8, 7, 3]
+    closed, volume = closed_and_outward(positions, triangles)
+    assert closed and volume == pytest.approx(105)
+
+def test_boxes_offsets_indices_per_box(backup):
+    geometry = backup.RoomGeometry
+    positions, triangles = geometry.boxes([[0, 0, 0], [10, 0, 0], [0, 10, 0]], [[1, 1, 1], [2, 2, 2], [3, 3, 3]])
+    assert positions.shape == (24, 3) and triangles.shape == (36, 3)
+    np.testing.assert_array_equal(triangles[12:24], geometry.BOX_TRIANGLES + 8)
+    single, _ = geometry.box((10, 0, 0), (2, 2, 2))
+    np.testing.assert_array_equal(positions[8:16], single)
+
+def test_ring_is_a_closed_annulus(backup):
+    geometry = backup.RoomGeometry
+    positions, triangles = geometry.ring((0, 0, 0), 1.0, 0.5, 0.8, segments=64)
+    assert positions.shape == (4 * 64, 3) and triangles.shape == (8 * 64, 3)
+    assert positions[:, 0].min() == pytest.approx(-0.4) and positions[:, 0].max() == pytest.approx(0.4)
+    closed, volume = closed_and_outward(positions, triangles)
+    exact = np.pi * (1.0 ** 2 - 0.5 ** 2) * 0.8
+    assert closed and volume == pytest.approx(exact, rel=0.01)
+
+def test_merge_shifts_indices_by_preceding_vertices(backup):
+    geometry = backup.RoomGeometry
+    ring = geometry.ring((0, 0, 0), 1.0, 0.5, 0.8, segments=8)
+    box = geometry.box((0, 0, 0), (1, 1, 1))
+    positions, triangles = geometry.merge([ring, box])
+    assert len(positions) == 32 + 8
+    np.testing.assert_array_equal(triangles[-12:], geometry.BOX_TRIANGLES + 32)
+    assert triangles.max() == len(positions) - 1
+
+def test_encode_round_trips_little_endian_buffers(backup):
+    geometry = backup.RoomGeometry
+    positions = np.array([[0.5, 1.25, -3.0]], dtype='>f8')  # Big-endian doubles are converted
+    assert decode(geometry.encode(positions, '<f4'), '<f4').tolist() == [0.5, 1.25, -3.0]
+    assert base64.b64decode(geometry.encode([1], '<u4')) == b'\x01\x00\x00\x00'
+
+def test_mesh_counts(backup):
+    geometry = backup.RoomGeometry
+    mesh = geometry.mesh('Room', *geometry.box((0, 0, 0), (1, 2, 3)), 'lightblue', 0.3)
+    assert (mesh['vertex_count'], mesh['triangle_count']) == (8, 12)
+    assert decode(mesh['positions'], '<f4').reshape(-1, 3).max(axis=0).tolist() == [1, 2, 3]
+    assert decode(mesh['indices'], '<u4').reshape(-1, 3).tolist() == geometry.BOX_TRIANGLES.tolist()
+
+def test_for_site(backup, backup_site):
+    payload = backup.RoomGeometry.for_site(backup_site.site)
+    assert payload['format'] == backup.RoomGeometry.FORMAT
+    assert payload['title'] == 'Scan Room 1 - NeuViz 128'
+    assert payload['bounds']['max'] == [7.0, 5.0, 3.0]
+    assert [mesh['name'] for mesh in payload['meshes']] == ['Actual Room', 'Required Space', 'NeuViz 128']
+    
+    # The scanner stays inside the room
+    scanner = decode(payload['meshes'][2]['positions'], '<f4').reshape(-1, 3)
+    assert scanner.min() >= 0
+    assert np.all(scanner.max(axis=0) <= [7.0, 5.0, 3.0])
+
+def test_signature_follows_everything_drawn(backup, backup_db, backup_site):
+    geometry = backup.RoomGeometry
+    site = backup_site.site
+    signature = geometry.signature(site)
+    site.available_power = '400V'  # Not drawn
+    assert geometry.signature(site) == signature
+    site.site_name = 'Scan Room 2'  # In the title
+    renamed = geometry.signature(site)
+    assert renamed != signature
+    site.room_length = 8.0
+    assert geometry.signature(site) != renamed
+
+def test_geometry_endpoint_answers_304_without_building_the_payload(backup, backup_db, backup_site, monkeypatch):
+    site_id, user_id = backup_site.site.id, backup_site.user.id
+    client = backup.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+    url = f'/api/site-specifications/{site_id}/geometry'
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    
+    def rebuilt(site_spec):
+        raise AssertionError('payload was rebuilt')
+    
+    monkeypatch.setattr(backup.RoomGeometry, 'for_site', rebuilt)
+    cached = client.get(url, headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    monkeypatch.undo()
+    
+    backup_site.site.site_name = 'Renamed'
+    backup_db.session.commit()
+    renamed = client.get(url, headers={'If-None-Match': etag})
+    assert renamed.status_code == 200
+    assert renamed.get_json()['title'] == 'Renamed - NeuViz 128'
+
+def test_geometry_endpoint_checks_project_access(backup, backup_db, backup_site):
+    site_id, user_id = backup_site.site.id, backup_site.user.id
+    backup_site.user.role = 'Client'
+    backup_site.project.client_email = 'other-client@example.com'
+    backup_db.session.commit()
+    client = backup.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+    url = f'/api/site-specifications/{site_id}/geometry'
+    
+    denied = client.get(url)
+    assert (denied.status_code, denied.get_json()) == (403, {'error': 'Access denied'})
+    
+    backup_db.session.get(backup.Project, backup_site.project.id).client_email = 'engineer@example.com'
+    backup_db.session.commit()
+    assert client.get(url).status_code == 200
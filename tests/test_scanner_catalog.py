@@ -0,0 +1,86 @@
+"""ScannerCatalog: one shared snapshot, refreshed on commit and on writes from other processes"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.exceptions import NotFound
+
+def add_scanner(ct, ct_db, name='A'):
+    scanner = ct.ScannerModel(manufacturer='GE', model_name=name, min_room_length=6.5, min_room_width=4.5,
+                              min_room_height=2.7, required_power='400V 3-phase 80 kVA')
+    ct_db.session.add(scanner)
+    ct_db.session.commit()
+    return scanner.id
+
+def test_snapshot_is_shared_until_the_catalog_changes(ct, ct_db):
+    catalog = ct.ScannerCatalog
+    scanner_id = add_scanner(ct, ct_db)
+    snapshot = catalog.current()
+    assert catalog.current() is snapshot
+    assert [s.model_name for s in catalog.all()] == ['A']
+    assert catalog.get(scanner_id) is snapshot.by_id[scanner_id]
+    
+    with pytest.raises(TypeError):
+        snapshot.by_id[scanner_id + 1] = None
+    with pytest.raises(AttributeError):
+        snapshot.scanners[0].model_name = 'B'
+
+def test_get_with_an_unknown_or_bad_id(ct, ct_db):
+    add_scanner(ct, ct_db)
+    assert ct.ScannerCatalog.get(9999) is None
+    assert ct.ScannerCatalog.get('abc') is None
+    assert ct.ScannerCatalog.get(None) is None
+
+def test_flushed_writes_do_not_go_stale_until_commit(ct, ct_db):
+    catalog = ct.ScannerCatalog
+    scanner_id = add_scanner(ct, ct_db)
+    version = catalog.version()
+    
+    scanner = ct_db.session.get(ct.ScannerModel, scanner_id)
+    scanner.model_name = 'B'
+    ct_db.session.flush()
+    assert not catalog._stale
+    ct_db.session.rollback()
+    assert not catalog._stale
+    assert catalog.version() == version
+    assert catalog.get(scanner_id).model_name == 'A'
+    
+    scanner = ct_db.session.get(ct.ScannerModel, scanner_id)
+    scanner.model_name = 'B'
+    ct_db.session.commit()
+    assert catalog._stale
+    assert catalog.version() != version
+    assert catalog.get(scanner_id).model_name == 'B'
+
+def test_inserts_and_deletes_refresh_the_snapshot(ct, ct_db):
+    catalog = ct.ScannerCatalog
+    first = add_scanner(ct, ct_db, 'A')
+    assert len(catalog.all()) == 1
+    
+    second = add_scanner(ct, ct_db, 'B')
+    assert [s.id for s in catalog.all()] == [first, second]
+    
+    ct_db.session.delete(ct_db.session.get(ct.ScannerModel, first))
+    ct_db.session.commit()
+    assert [s.id for s in catalog.all()] == [second]
+
+def test_writes_from_another_process_are_seen_after_the_stamp_ttl(ct, ct_db):
+    catalog = ct.ScannerCatalog
+    scanner_id = add_scanner(ct, ct_db)
+    snapshot = catalog.current()
+    
+    # A plain SQL update fires no ORM events, like a write made by another worker
+    ct_db.session.execute(ct.ScannerModel.__table__.update()
+                          .where(ct.ScannerModel.id == scanner_id)
+                          .values(model_name='Renamed elsewhere', updated_at=datetime.utcnow() + timedelta(seconds=1)))
+    ct_db.session.commit()
+    assert catalog.current() is snapshot
+    
+    catalog._checked_at -= catalog.STAMP_TTL
+    assert catalog.get(scanner_id).model_name == 'Renamed elsewhere'
+
+def test_get_or_404(ct, ct_db):
+    scanner_id = add_scanner(ct, ct_db)
+    assert ct.ScannerCatalog.get_or_404(scanner_id).id == scanner_id
+    with pytest.raises(NotFound):
+        ct.ScannerCatalog.get_or_404(9999)
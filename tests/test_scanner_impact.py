@@ -0,0 +1,98 @@
+"""ScannerImpactJob: re-scoring dependent reports and flagging status flips"""
+
+import numpy as np
+
+def add_report(ct, ct_db, ct_site, number, seed=True):
+    report = ct.ConformityReport(project_id=ct_site.project.id, site_specification_id=ct_site.site.id,
+                                 report_number=number, conformity_score=90, overall_status='CONFORMING')
+    ct_db.session.add(report)
+    ct_db.session.flush()
+    if seed:
+        ct.ScannerImpactJob.seed(report)
+    ct_db.session.commit()
+    return report.id
+
+def test_status_bands(ct):
+    statuses = ct.ScannerImpactJob.deterministic_status(np.array([100, 85, 84.9, 51, 50, 10]))
+    assert list(statuses) == ['CONFORMING', 'CONFORMING', 'REQUIRES_MODIFICATION',
+                              'REQUIRES_MODIFICATION', 'NON_CONFORMING', 'NON_CONFORMING']
+
+def test_seed_records_the_raw_score_baseline(ct, ct_db, ct_site):
+    report = ct_db.session.get(ct.ConformityReport, add_report(ct, ct_db, ct_site, 'CT-1'))
+    # Roomy dimensions (+20), matching power (+15), HVAC (+10) and an adequate floor (+10) on the base 50
+    assert report.deterministic_score == 105
+    assert report.deterministic_status == 'CONFORMING'
+    assert not report.status_flipped
+
+def test_dependents(ct, ct_db, ct_site):
+    report_id = add_report(ct, ct_db, ct_site, 'CT-1')
+    assert ct.ScannerImpactJob.dependents(ct_site.scanner.id) == {
+        'scanner_model_id': ct_site.scanner.id,
+        'site_specification_ids': [ct_site.site.id],
+        'report_ids': [report_id]
+    }
+
+def test_run_flags_flips_only_against_a_recorded_baseline(ct, ct_db, ct_site):
+    seeded = add_report(ct, ct_db, ct_site, 'CT-1')
+    unseeded = add_report(ct, ct_db, ct_site, 'CT-2', seed=False)
+    
+    # The room no longer meets the minimum volume: 105 -> 65
+    ct_site.scanner.min_room_length = 9.0
+    ct_db.session.commit()
+    result = ct.ScannerImpactJob.run(ct_site.scanner.id)
+    assert result['reports_rescored'] == 2
+    assert result['flipped_report_ids'] == [seeded]
+    
+    ct_db.session.expire_all()
+    flipped, baseline_only = (ct_db.session.get(ct.ConformityReport, i) for i in (seeded, unseeded))
+    assert (flipped.deterministic_status, flipped.status_flipped) == ('REQUIRES_MODIFICATION', True)
+    assert (baseline_only.deterministic_status, baseline_only.status_flipped) == ('REQUIRES_MODIFICATION', False)
+    assert flipped.deterministic_score == 65
+
+def test_flag_stays_raised_until_acknowledged(ct, ct_db, ct_site, monkeypatch):
+    report_id = add_report(ct, ct_db, ct_site, 'CT-1')
+    ct_site.scanner.min_room_length = 9.0
+    ct_db.session.commit()
+    ct.ScannerImpactJob.run(ct_site.scanner.id)
+    
+    # A re-run without further changes neither re-counts nor clears the flip
+    assert ct.ScannerImpactJob.run(ct_site.scanner.id)['status_flips'] == 0
+    ct_db.session.expire_all()
+    assert ct_db.session.get(ct.ConformityReport, report_id).status_flipped
+    
+    monkeypatch.setitem(ct.app.config, 'WTF_CSRF_ENABLED', False)
+    user_id = ct_site.user.id
+    client = ct.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+    response = client.post(f'/api/reports/{report_id}/acknowledge-status-flip')
+    assert response.status_code == 200
+    assert response.get_json() == {'report_id': report_id, 'deterministic_status': 'REQUIRES_MODIFICATION',
+                                   'status_flipped': False}
+    assert not ct_db.session.get(ct.ConformityReport, report_id).status_flipped
+
+def test_run_leaves_unchanged_prices_alone(ct, ct_db, ct_site):
+    report_id = add_report(ct, ct_db, ct_site, 'CT-1')
+    ct.CostTableStore.publish({})
+    ct.ScannerImpactJob.run(ct_site.scanner.id)
+    ct_db.session.expire_all()
+    report = ct_db.session.get(ct.ConformityReport, report_id)
+    # Unversioned reports record the active table they were priced with
+    assert report.cost_table_version == 1
+    cost, stamp = report.estimated_cost, report.updated_at
+    
+    # A change that moves neither the price nor the table keeps updated_at
+    ct_site.scanner.min_room_height = 2.8
+    ct_db.session.commit()
+    ct.ScannerImpactJob.run(ct_site.scanner.id)
+    ct_db.session.expire_all()
+    report = ct_db.session.get(ct.ConformityReport, report_id)
+    assert (report.estimated_cost, report.updated_at, report.cost_table_version) == (cost, stamp, 1)
+    
+    ct_site.scanner.min_room_length = 9.0
+    ct_db.session.commit()
+    ct.ScannerImpactJob.run(ct_site.scanner.id)
+    ct_db.session.expire_all()
+    report = ct_db.session.get(ct.ConformityReport, report_id)
+    assert report.estimated_cost != cost
+    assert report.updated_at > stamp
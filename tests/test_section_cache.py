@@ -0,0 +1,84 @@
+"""ProfessionalPDFReportGenerator section cache: flowables built once per section inputs"""
+
+import pytest
+from reportlab.platypus import Paragraph
+
+@pytest.fixture
+def generator(backup, backup_db):
+    return backup.ProfessionalPDFReportGenerator()
+
+def builder(generator, text):
+    calls = []
+    
+    def build():
+        calls.append(text)
+        return [Paragraph(text, generator.body_style)]
+    
+    return build, calls
+
+def test_same_inputs_build_once_and_return_copies(generator):
+    build, calls = builder(generator, 'Summary')
+    first = generator._section('summary', ('CONFORMING', 90.0), build)
+    second = generator._section('summary', ('CONFORMING', 90.0), build)
+    assert calls == ['Summary']
+    
+    # doc.build mutates flowables, so no two documents may share one
+    assert first[0] is not second[0]
+    assert first[0].text == second[0].text == 'Summary'
+
+def test_changed_inputs_rebuild(generator):
+    build, calls = builder(generator, 'Summary')
+    generator._section('summary', ('CONFORMING', 90.0), build)
+    generator._section('summary', ('CONFORMING', 80.0), build)
+    generator._section('cost', ('CONFORMING', 90.0), build)  # The section name is part of the key
+    assert len(calls) == 3
+
+def test_cache_is_shared_across_generators(backup, generator):
+    build, calls = builder(generator, 'Footer')
+    generator._section('footer', (), build)
+    backup.ProfessionalPDFReportGenerator()._section('footer', (), build)
+    assert calls == ['Footer']
+
+def test_least_recently_used_section_is_evicted(backup, generator, monkeypatch):
+    monkeypatch.setattr(backup.ProfessionalPDFReportGenerator, 'SECTION_CACHE_SIZE', 2)
+    build, calls = builder(generator, 'Section')
+    for inputs in [(1,), (2,), (1,), (3,)]:
+        generator._section('s', inputs, build)
+    assert len(backup.ProfessionalPDFReportGenerator._section_cache) == 2
+    
+    generator._section('s', (1,), build)  # Recently used: still cached
+    generator._section('s', (2,), build)  # Evicted by (3,)
+    assert len(calls) == 4
+
+def test_clear_section_cache(backup, generator):
+    build, calls = builder(generator, 'Section')
+    generator._section('s', (), build)
+    backup.ProfessionalPDFReportGenerator.clear_section_cache()
+    generator._section('s', (), build)
+    assert len(calls) == 2
+
+def test_report_renders_identically_from_cached_sections(backup, backup_site, monkeypatch):
+    generator = backup.ProfessionalPDFReportGenerator()
+    report = backup_site.reports[0]
+    first = generator.generate_comprehensive_report(report, include_visualizations=False).getvalue()
+    assert first.startswith(b'%PDF')
+    assert backup.ProfessionalPDFReportGenerator._section_cache
+    
+    def rebuilt(*args):
+        raise AssertionError('section was rebuilt')
+    
+    for name in ['_create_executive_summary', '_create_technical_analysis', '_create_cost_analysis',
+                 '_create_action_plan', '_create_neuviz_section', '_create_compliance_section']:
+        monkeypatch.setattr(generator, name, rebuilt)
+    second = generator.generate_comprehensive_report(report, include_visualizations=False).getvalue()
+    assert len(second) == len(first)
+
+@pytest.mark.parametrize('backend', ['vector', 'matplotlib'])
+def test_report_with_visualizations_renders_repeatedly(backup, backup_site, monkeypatch, backend):
+    monkeypatch.setattr(backup.ReportChartRenderer, 'BACKEND', backend)
+    generator = backup.ProfessionalPDFReportGenerator()
+    report = backup_site.reports[0]
+    first = generator.generate_comprehensive_report(report, True).getvalue()
+    second = generator.generate_comprehensive_report(report, True).getvalue()
+    assert first.startswith(b'%PDF') and second.startswith(b'%PDF')
+    assert not any(name == 'visual_analytics' for name, _ in backup.ProfessionalPDFReportGenerator._section_cache)
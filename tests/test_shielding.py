@@ -0,0 +1,121 @@
+"""ShieldingCalculator: NCRP 147 scatter barriers and the Archer transmission fit"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+def archer_transmission(thickness, alpha, beta, gamma):
+    """Forward Archer model, the function archer_thickness inverts"""
+    ratio = beta / alpha
+    return ((1 + ratio) * np.exp(alpha * gamma * thickness) - ratio) ** (-1 / gamma)
+
+def test_weekly_patients(ct):
+    calculator = ct.ShieldingCalculator
+    assert calculator.weekly_patients(40, '08:00-18:00') == 200
+    assert calculator.weekly_patients(40, '24/7') == 280
+    assert calculator.weekly_patients(None, None) == calculator.DEFAULT_DAILY_PATIENTS * 5
+
+def test_parse_kvp_and_lead_equivalent(ct):
+    calculator = ct.ShieldingCalculator
+    assert calculator.parse_kvp('2.0 mm Pb at 140 kVp') == 140
+    assert calculator.parse_kvp(None, 'Tube up to 135kV') == 135
+    assert calculator.parse_kvp(None, '') == calculator.DEFAULT_KVP
+    assert calculator.parse_lead_equivalent('2.5 mm of lead') == 2.5
+    assert calculator.parse_lead_equivalent('1.5mm Pb') == 1.5
+    assert calculator.parse_lead_equivalent(None) == 0.0
+
+@pytest.mark.parametrize('material', ['lead', 'concrete'])
+@pytest.mark.parametrize('kvp', [120, 140])
+def test_archer_thickness_inverts_the_transmission_model(ct, material, kvp):
+    calculator = ct.ShieldingCalculator
+    transmission = np.array([0.5, 0.1, 1e-2, 1e-4])
+    thickness = calculator.archer_thickness(transmission, kvp, material)
+    
+    alpha, beta, gamma = calculator.ARCHER[material][kvp]
+    np.testing.assert_allclose(archer_transmission(thickness, alpha, beta, gamma), transmission, rtol=1e-9)
+    assert calculator.archer_thickness(np.array([1.0]), kvp, material)[0] == 0.0
+
+def test_harder_beam_needs_more_lead(ct):
+    calculator = ct.ShieldingCalculator
+    assert calculator.archer_thickness(0.01, 140, 'lead') > calculator.archer_thickness(0.01, 120, 'lead')
+
+def test_compute_batch_applies_ncrp_geometry(ct):
+    calculator = ct.ShieldingCalculator
+    batch = calculator.compute_batch([7.0], [5.0], [3.0], [200], [120])
+    
+    # 40% head scans at 1200 mGy·cm, 60% body scans at 550 mGy·cm repeated 1.4× with contrast
+    kerma_per_patient = 0.4 * 9e-5 * 1200 + 0.6 * 3e-4 * 550 * 1.4
+    assert batch['kerma_1m'][0] == pytest.approx(200 * kerma_per_patient)
+    
+    # Length walls sit half the length away, width walls half the width, plus the 0.3 m clearance
+    assert batch['walls'] == ['control_room', 'adjacent_room', 'corridor', 'adjacent_office']
+    np.testing.assert_allclose(batch['distance'][0], [3.8, 3.8, 2.8, 2.8])
+    np.testing.assert_allclose(batch['wall_area'][0], [15.0, 15.0, 21.0, 21.0])
+    
+    goals = np.array([0.1, 0.02, 0.02, 0.02])
+    occupancy = np.array([1.0, 1.0, 0.2, 1.0])
+    expected = goals * batch['distance'][0] ** 2 / (occupancy * batch['kerma_1m'][0])
+    np.testing.assert_allclose(batch['transmission'][0], expected)
+
+def test_compute_batch_recommends_whole_lead_sheets(ct):
+    batch = ct.ShieldingCalculator.compute_batch([7.0], [5.0], [3.0], [200], [120])
+    lead, recommended = batch['lead_mm'][0], batch['recommended_lead_mm'][0]
+    
+    assert np.all(recommended >= lead)
+    assert np.all(recommended - lead < 0.5)
+    np.testing.assert_array_equal(recommended * 2, np.round(recommended * 2))
+    assert batch['lead_m2_mm'][0] == pytest.approx((recommended * batch['wall_area'][0]).sum())
+    
+    # A lightly occupied corridor needs less than the office at the same distance
+    corridor, office = lead[2], lead[3]
+    assert corridor < office
+
+def test_manufacturer_lead_equivalent_is_a_floor(ct):
+    batch = ct.ShieldingCalculator.compute_batch([7.0], [5.0], [3.0], [50], [120], [3.0])
+    assert np.all(batch['recommended_lead_mm'][0] >= 3.0)
+
+def test_batch_rows_match_single_room_results(ct):
+    calculator = ct.ShieldingCalculator
+    batch = calculator.compute_batch([7.0, 6.0], [5.0, 4.5], [3.0, 2.8], [200, 280], [120, 140], [0.0, 2.0])
+    for i, args in enumerate([([7.0], [5.0], [3.0], [200], [120], [0.0]),
+                              ([6.0], [4.5], [2.8], [280], [140], [2.0])]):
+        single = calculator.compute_batch(*args)
+        np.testing.assert_allclose(batch['lead_mm'][i], single['lead_mm'][0])
+        np.testing.assert_allclose(batch['lead_m2_mm'][i], single['lead_m2_mm'][0])
+
+def test_for_site_spec_is_cached_on_its_inputs(ct):
+    calculator = ct.ShieldingCalculator
+    calculator._cache.clear()
+    scanner = SimpleNamespace(radiation_shielding='2.0 mm Pb at 140 kVp', environmental_specs=None)
+    room = SimpleNamespace(patient_volume=40, operating_hours='24/7')
+    site = SimpleNamespace(id=1, room_length=7.0, room_width=5.0, room_height=3.0,
+                           catalog_scanner=scanner, manual_room=room)
+    
+    first = calculator.for_site_spec(site)
+    assert first['kvp'] == 140
+    assert first['weekly_patients'] == 280
+    assert first['manufacturer_lead_mm'] == 2.0
+    assert [wall['wall'] for wall in first['walls']] == [name for name, _, _, _ in calculator.WALLS]
+    assert calculator.for_site_spec(site) is first
+    
+    site.room_length = 8.0
+    resized = calculator.for_site_spec(site)
+    assert resized is not first
+    assert resized['walls'][0]['distance_m'] == 4.3
+
+def test_bulk_recosting_prices_shielding_like_a_single_report(ct, ct_db, ct_site):
+    """Both cost paths must feed the same calculated lead area into the cost model"""
+    report = ct.ConformityReport(project_id=ct_site.project.id, site_specification_id=ct_site.site.id,
+                                 report_number='CT-TEST-1', conformity_score=70,
+                                 overall_status='REQUIRES_MODIFICATION', ai_analysis='Minimal changes')
+    ct_db.session.add(report)
+    ct_db.session.commit()
+    
+    single = ct.CostModel.site_inputs(ct_site.site, report.ai_analysis, report.conformity_score, report.overall_status)
+    _, _, _, bulk = ct.BulkRecostingJob._rows_to_inputs(ct.BulkRecostingJob._chunk_query(0, 10))
+    
+    assert np.isfinite(single['shielding_lead_m2_mm'][0])
+    assert bulk['shielding_lead_m2_mm'][0] == pytest.approx(single['shielding_lead_m2_mm'][0])
+    _, rates = ct.CostTableStore.active()
+    assert ct.CostModel.compute(bulk, rates)[0] == ct.CostModel.compute(single, rates)[0]
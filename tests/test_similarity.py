@@ -0,0 +1,110 @@
+"""ScannerSimilarityIndex: normalized feature vectors, N-way comparison and nearest neighbours"""
+
+import numpy as np
+import pytest
+
+def add_scanners(ct, ct_db):
+    rows = [
+        dict(model_name='A', slice_count=64, weight=1800, price_range_min=400_000, price_range_max=600_000),
+        dict(model_name='B', slice_count=128, weight=2000, price_range_min=600_000, price_range_max=800_000),
+        dict(model_name='C', slice_count=128, weight=2100, price_range_min=650_000, price_range_max=850_000),
+        dict(model_name='D', slice_count=256, weight=3000, price_range_min=1_500_000, price_range_max=2_000_000),
+    ]
+    scanners = [ct.ScannerModel(manufacturer='GE', min_room_length=6.5, min_room_width=4.5, min_room_height=2.7,
+                                required_power='400V 3-phase 80 kVA', installation_complexity='Medium', **row)
+                for row in rows]
+    ct_db.session.add_all(scanners)
+    ct_db.session.commit()
+    return [s.id for s in scanners]
+
+def test_normalize_z_scores_with_unknowns_at_the_mean(ct):
+    raw = np.array([[1.0, 5.0, np.nan], [3.0, 5.0, 2.0], [np.nan, 5.0, 4.0]])
+    normalized = ct.ScannerSimilarityIndex.normalize(raw)
+    np.testing.assert_allclose(normalized[:, 0], [-1.0, 1.0, 0.0])
+    np.testing.assert_allclose(normalized[:, 1], [0.0, 0.0, 0.0])  # Constant column
+    np.testing.assert_allclose(normalized[:, 2], [0.0, -1.0, 1.0])
+
+def test_raw_features_fall_back_to_parsed_specs(ct):
+    scanner = ct.ScannerModel(slice_count=64, weight=1800, min_room_length=6, min_room_width=4, min_room_height=2.7,
+                              required_power='400V 3-phase 90 kVA', power_consumption=None,
+                              heat_dissipation=None, cooling_requirements='36000 BTU/h',
+                              price_range_min=500_000, price_range_max=None, installation_complexity='High')
+    features = ct.ScannerSimilarityIndex.raw_features(scanner)
+    assert features['power_kw'] == 90.0
+    assert features['heat_kw'] == pytest.approx(36000 / ct.SpecParser.BTU_PER_KW)
+    assert features['price'] == 500_000
+    assert features['complexity'] == 3
+
+def test_persist_stores_vectors_that_load_reuses(ct, ct_db, monkeypatch):
+    index = ct.ScannerSimilarityIndex
+    ids = add_scanners(ct, ct_db)
+    built = index.persist()
+    assert ct.ScannerFeatureVector.query.count() == len(ids)
+    assert {v.catalog_signature for v in ct.ScannerFeatureVector.query} == {ct.ScannerCatalog.version()}
+    assert ct_db.session.get(ct.ScannerFeatureVector, 1).weight == 1800
+    
+    # A new process starts with an empty in-memory index and reads the table instead of rebuilding
+    index._index = {'signature': None}
+    monkeypatch.setattr(index, 'rebuild', lambda snapshot=None: pytest.fail('index was rebuilt'))
+    loaded = index.load()
+    assert list(loaded['ids']) == ids
+    np.testing.assert_allclose(loaded['normalized'], built['normalized'], atol=1e-6)
+
+def test_reads_never_write_the_table(ct, ct_db, monkeypatch):
+    index = ct.ScannerSimilarityIndex
+    ids = add_scanners(ct, ct_db)
+    monkeypatch.setattr(ct_db.session, 'commit', lambda: pytest.fail('a read committed'))
+    index.compare(ids[:2])
+    index.similar(ids[0])
+    assert ct.ScannerFeatureVector.query.count() == 0
+
+def test_load_rebuilds_after_a_catalog_change(ct, ct_db):
+    index = ct.ScannerSimilarityIndex
+    ids = add_scanners(ct, ct_db)
+    first = index.load()['signature']
+    
+    scanner = ct_db.session.get(ct.ScannerModel, ids[0])
+    scanner.weight = 1500
+    ct_db.session.commit()
+    reloaded = index.load()
+    assert reloaded['signature'] != first
+    assert reloaded['raw'][0, index.FEATURES.index('weight')] == 1500
+
+def test_compare(ct, ct_db):
+    index = ct.ScannerSimilarityIndex
+    ids = add_scanners(ct, ct_db)
+    result = index.compare(ids[:3])
+    
+    similarity = np.array(result['similarity'])
+    np.testing.assert_allclose(np.diag(similarity), 1.0)
+    np.testing.assert_allclose(similarity, similarity.T)
+    assert similarity[1, 2] > similarity[0, 2]
+    
+    features = {f['feature']: f for f in result['features']}
+    assert features['slice_count']['best_scanner_id'] == ids[1]  # Higher is better; ties keep the first
+    assert features['weight']['best_scanner_id'] == ids[0]
+    assert features['weight']['values'] == [1800, 2000, 2100]
+    assert features['power_kw']['values'] == [80.0, 80.0, 80.0]
+    
+    with pytest.raises(ValueError):
+        index.compare([ids[0], 9999])
+
+def test_similar_returns_nearest_neighbours(ct, ct_db):
+    index = ct.ScannerSimilarityIndex
+    ids = add_scanners(ct, ct_db)
+    neighbours = index.similar(ids[1], k=5)
+    
+    assert [n['scanner_id'] for n in neighbours] == [ids[2], ids[0], ids[3]]
+    similarities = [n['similarity'] for n in neighbours]
+    assert similarities == sorted(similarities, reverse=True)
+    assert neighbours[-1]['differs_most_in'] == ['Weight (kg)', 'Price (mid-range)']
+    
+    with pytest.raises(ValueError):
+        index.similar(9999)
+
+def test_similar_in_a_single_scanner_catalog(ct, ct_db):
+    scanner = ct.ScannerModel(manufacturer='GE', model_name='Only', min_room_length=6, min_room_width=4,
+                              min_room_height=2.7, required_power='400V')
+    ct_db.session.add(scanner)
+    ct_db.session.commit()
+    assert ct.ScannerSimilarityIndex.similar(scanner.id) == []
@@ -0,0 +1,83 @@
+"""SpecColumns: numeric columns parsed from free-text specs on write, the startup backfill and range queries"""
+
+import pytest
+
+def add_room(ct, ct_db, ct_site, name, power, hvac='15 kW', temperature='20-22', humidity='40-60'):
+    room = ct.ManualRoomEntry(project_id=ct_site.project.id, entered_by=ct_site.user.id, site_name=name,
+                              room_length=7.0, room_width=5.0, room_height=3.0, available_power=power,
+                              hvac_capacity=hvac, current_temperature_range=temperature,
+                              current_humidity_range=humidity)
+    ct_db.session.add(room)
+    ct_db.session.commit()
+    return room
+
+def forget_parsing(ct, ct_db, model, **columns):
+    """Clear derived columns the way a pre-upgrade row has them, bypassing the ORM hooks"""
+    ct_db.session.execute(ct_db.update(model.__table__).values(specs_parsed_at=None, **columns))
+    ct_db.session.commit()
+    ct_db.session.expire_all()
+
+def test_columns_are_parsed_on_insert_and_update(ct, ct_db, ct_site):
+    scanner = ct_site.scanner
+    assert (scanner.power_voltage, scanner.power_phases, scanner.power_kva) == (380, 3, 80)
+    assert (scanner.temperature_min, scanner.temperature_max) == (18, 24)
+    assert (scanner.humidity_min, scanner.humidity_max) == (30, 70)
+    assert scanner.cooling_kw == 6.0  # No cooling text: the heat dissipation figure
+    assert scanner.specs_parsed_at is not None
+    
+    scanner.required_power = '400V 3-phase 120 kVA'
+    ct_db.session.commit()
+    assert (scanner.power_voltage, scanner.power_kva) == (400, 120)
+    assert ct_site.site.power_kva == 100
+    assert ct_site.room.hvac_kw == 15
+
+def test_backfill_restores_missing_columns(ct, ct_db, ct_site):
+    forget_parsing(ct, ct_db, ct.ScannerModel, power_voltage=None, power_phases=None, power_kva=None)
+    forget_parsing(ct, ct_db, ct.ManualRoomEntry)  # Parsed values still in place
+    room_stamp = ct_db.session.get(ct.ManualRoomEntry, ct_site.room.id).updated_at
+    
+    assert ct.SpecColumns.backfill() == 1
+    scanner = ct_db.session.get(ct.ScannerModel, ct_site.scanner.id)
+    assert (scanner.power_voltage, scanner.power_phases, scanner.power_kva) == (380, 3, 80)
+    assert scanner.specs_parsed_at is not None
+    
+    # Rows that only gain the parse stamp are not edits
+    room = ct_db.session.get(ct.ManualRoomEntry, ct_site.room.id)
+    assert room.specs_parsed_at is not None
+    assert room.updated_at == room_stamp
+
+def test_backfill_does_not_retry_unparseable_rows(ct, ct_db, ct_site, monkeypatch):
+    room = add_room(ct, ct_db, ct_site, 'Unknown supply', 'to be confirmed', hvac=None, temperature=None,
+                    humidity=None)
+    forget_parsing(ct, ct_db, ct.ManualRoomEntry)
+    ct.SpecColumns.backfill()
+    room = ct_db.session.get(ct.ManualRoomEntry, room.id)
+    assert room.power_voltage is None
+    assert room.specs_parsed_at is not None
+    
+    # The next startup finds nothing to parse
+    monkeypatch.setattr(ct.SpecColumns, 'values', lambda target: pytest.fail(f'{target} was parsed again'))
+    assert ct.SpecColumns.backfill() == 0
+
+@pytest.fixture
+def rooms(ct, ct_db, ct_site):
+    """The fixture room (380V 3-phase, 15 kW, no climate readings) plus four more"""
+    return {
+        'fixture': ct_site.room.id,
+        'single_phase': add_room(ct, ct_db, ct_site, 'Single phase', '380V single phase').id,
+        'low_voltage': add_room(ct, ct_db, ct_site, 'Low voltage', '230V 3-phase').id,
+        'small_hvac': add_room(ct, ct_db, ct_site, 'Small HVAC', '400V 3-phase', hvac='4 kW').id,
+        'hot': add_room(ct, ct_db, ct_site, 'Hot', '400V 3-phase', temperature='20-28').id
+    }
+
+def test_compatible_rooms_query(ct, ct_site, rooms):
+    def compatible(**options):
+        query = ct.SpecColumns.compatible_rooms_query(ct_site.scanner, **options)
+        return {name for name, room_id in rooms.items() if room_id in {r.id for r in query}}
+    
+    # 380V within the 10% tolerance of 400V; at least as many phases
+    assert compatible() == {'fixture', 'small_hvac', 'hot'}
+    assert compatible(hvac=True) == {'fixture', 'hot'}
+    # Rooms without climate readings fall out once the climate ranges are required
+    assert compatible(hvac=True, climate=True) == set()
+    assert compatible(climate=True) == {'small_hvac'}
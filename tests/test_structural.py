@@ -0,0 +1,77 @@
+"""StructuralEngine: distributed and gantry point loads against the floor rating"""
+
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize('text, expected', [
+    ('2.1m × 2.6m × 1.9m', (2.1, 2.6, 1.9)),
+    ('210 x 260 x 190 cm', (2.1, 2.6, 1.9)),
+    ('2100x2600x1900 mm', (2.1, 2.6, 1.9)),
+    ('2,1 x 2,6 x 1,9 m', (2.1, 2.6, 1.9)),
+    ('approx. 2 m long', (None, None, None)),
+    (None, (None, None, None)),
+])
+def test_dimension_parsing(ct, text, expected):
+    parsed = ct.SpecParser.dimensions(text)
+    if expected[0] is None:
+        assert parsed == expected
+    else:
+        assert parsed == pytest.approx(expected)
+
+def test_floor_properties(ct):
+    depth, weak = ct.StructuralEngine.floor_properties(
+        ['Reinforced Concrete', 'composite deck', 'steel', 'timber joists', 'raised access floor', None])
+    np.testing.assert_allclose(depth, [0.3, 0.2, 0.15, 0.05, 0.0, ct.StructuralEngine.DEFAULT_SPREAD_DEPTH])
+    np.testing.assert_array_equal(weak, [False, False, False, True, True, False])
+
+def test_loads_on_a_concrete_slab(ct):
+    engine = ct.StructuralEngine
+    result = engine.evaluate([2000], ['2.2 x 1.0 x 1.9 m'], [2500], ['concrete'])
+    
+    load = 2000 * engine.DYNAMIC_FACTOR
+    point_load = load * engine.GANTRY_WEIGHT_SHARE / engine.SUPPORT_POINTS
+    point_pressure = point_load / (engine.PAD_SIZE + 2 * 0.3) ** 2
+    assert result['footprint_m2'][0] == pytest.approx(2.2)
+    assert result['distributed_load'][0] == pytest.approx(load / 2.2)
+    assert result['point_load'][0] == pytest.approx(point_load)
+    assert result['point_pressure'][0] == pytest.approx(point_pressure)
+    assert result['utilization'][0] == pytest.approx(max(load / 2.2, point_pressure) / 2500)
+    assert result['adequate'][0] and not result['reinforcement_required'][0]
+
+def test_distributed_load_above_rating_needs_reinforcement(ct):
+    result = ct.StructuralEngine.evaluate([2000], ['2.2 x 1.0 x 1.9 m'], [900], ['concrete'])
+    assert not result['distributed_ok'][0]
+    assert result['point_ok'][0]
+    assert result['reinforcement_required'][0]
+
+def test_point_loads_spread_less_on_thin_floors(ct):
+    result = ct.StructuralEngine.evaluate([2000] * 2, ['2.2 x 1.0 x 1.9 m'] * 2, [1500] * 2, ['concrete', 'steel'])
+    assert result['point_pressure'][1] > result['point_pressure'][0]
+    assert result['point_ok'][0] and not result['point_ok'][1]
+
+def test_weak_floor_types_always_need_reinforcement(ct):
+    result = ct.StructuralEngine.evaluate([2000], ['2.2 x 1.0 x 1.9 m'], [50000], ['raised floor'])
+    assert result['distributed_ok'][0] and result['point_ok'][0]
+    assert not result['adequate'][0]
+
+def test_unknown_footprint_uses_the_legacy_capacity_rule(ct):
+    result = ct.StructuralEngine.evaluate([2000, 2000], ['n/a', 'n/a'], [4500, 3500], ['concrete', 'concrete'])
+    np.testing.assert_array_equal(result['adequate'], [True, False])
+
+def test_unknown_capacity_is_not_adequate(ct):
+    result = ct.StructuralEngine.evaluate([2000, 2000], ['2.2 x 1.0 x 1.9 m'] * 2, [None, 0], ['concrete'] * 2)
+    np.testing.assert_array_equal(result['adequate'], [False, False])
+
+def test_matrix_matches_pairwise_evaluation(ct):
+    engine = ct.StructuralEngine
+    rooms = {'floor_capacity': [2500, 900, 50000], 'floor_type': ['concrete', 'steel', 'raised floor']}
+    scanners = {'weight': [2000, 1200], 'dimensions': ['2.2 x 1.0 x 1.9 m', '1.9 x 0.9 x 1.8 m']}
+    matrix = engine.evaluate_matrix(rooms, scanners)
+    assert matrix['adequate'].shape == (3, 2)
+    
+    for i in range(3):
+        for j in range(2):
+            pair = engine.evaluate([scanners['weight'][j]], [scanners['dimensions'][j]],
+                                   [rooms['floor_capacity'][i]], [rooms['floor_type'][i]])
+            assert matrix['adequate'][i, j] == pair['adequate'][0]
+            assert matrix['utilization'][i, j] == pytest.approx(pair['utilization'][0])